@@ -0,0 +1,7 @@
+"""Benchmarks of pystatic's checking pipeline.
+
+- generate: create synthetic projects of a given shape.
+- timing: time every stage of a check.
+- run: command line entry, write results as json and compare them with a
+  stored baseline.
+"""
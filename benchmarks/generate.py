@@ -0,0 +1,107 @@
+"""Generate synthetic projects to benchmark pystatic"""
+
+import os
+from typing import List, NamedTuple
+
+PACKAGE = "benchproj"
+
+
+class ProjectShape(NamedTuple):
+    # number of modules in the package
+    modules: int = 10
+    # classes per module
+    classes: int = 5
+    # functions per module, each class has the same number of methods
+    functions: int = 5
+    # each module imports from this many previous modules
+    import_depth: int = 2
+    # define and use generic classes
+    generic: bool = True
+
+
+SHAPES = {
+    "small": ProjectShape(modules=5, classes=3, functions=3, import_depth=1),
+    "medium": ProjectShape(modules=30, classes=5, functions=5, import_depth=3),
+    "large": ProjectShape(modules=100, classes=8, functions=8, import_depth=5),
+}
+
+
+def module_source(index: int, shape: ProjectShape) -> str:
+    deps = list(range(max(0, index - shape.import_depth), index))
+    lines: List[str] = [
+        "from typing import Dict, List, Optional, Tuple, TypeVar, Generic",
+    ]
+    for dep in deps:
+        lines.append(f"from {PACKAGE}.mod{dep} import Class{dep}_0, func{dep}_0")
+    lines.append("")
+    lines.append('T = TypeVar("T")')
+    lines.append("")
+
+    for k in range(shape.classes):
+        base = f"Class{deps[-1]}_0" if deps and k == 0 else ""
+        if base:
+            lines.append(f"class Class{index}_{k}({base}):")
+        else:
+            lines.append(f"class Class{index}_{k}:")
+        lines.append("    count: int")
+        lines.append("    def __init__(self, value: int, name: str) -> None:")
+        lines.append("        self.value = value")
+        lines.append("        self.name = name")
+        for m in range(shape.functions):
+            lines.append(f"    def method{m}(self, x: int, y: str) -> int:")
+            lines.append("        z: int = x + self.value")
+            lines.append("        return z")
+        lines.append("")
+
+    if shape.generic:
+        lines.append(f"class Box{index}(Generic[T]):")
+        lines.append("    def __init__(self, item: T) -> None:")
+        lines.append("        self.item = item")
+        lines.append("    def get(self) -> T:")
+        lines.append("        return self.item")
+        lines.append("")
+
+    for f in range(shape.functions):
+        lines.append(f"def func{index}_{f}(a: int, b: List[int]) -> Optional[int]:")
+        lines.append("    c = a")
+        lines.append("    for x in b:")
+        lines.append("        c = c + x")
+        lines.append("    if c > 0:")
+        lines.append("        return c")
+        lines.append("    return None")
+        lines.append("")
+
+    lines.append(f"inst{index} = Class{index}_0(1, 'a')")
+    lines.append(f"res{index}: int = inst{index}.method0(1, 'b')")
+    lines.append(f"table{index}: Dict[str, List[int]] = {{}}")
+    lines.append(f"pair{index}: Tuple[int, str] = (1, 'a')")
+    lines.append("")
+    lines.append(f"def use_deps{index}() -> None:")
+    lines.append("    local: int = 0")
+    for dep in deps:
+        lines.append(f"    dep{dep} = Class{dep}_0(2, 'c')")
+        lines.append(f"    opt{dep}: Optional[int] = func{dep}_0(1, [1, 2])")
+    lines.append("")
+    if shape.generic:
+        lines.append(f"box{index} = Box{index}(1)")
+        lines.append(f"boxes{index}: List[Box{index}[int]] = []")
+    # one error per module so that messages are produced
+    lines.append(f"wrong{index}: str = 1")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def generate_project(root: str, shape: ProjectShape) -> List[str]:
+    """Write a project of the given shape under root, return paths of the modules"""
+    package_dir = os.path.join(root, PACKAGE)
+    os.makedirs(package_dir, exist_ok=True)
+    with open(os.path.join(package_dir, "__init__.py"), "w") as f:
+        f.write("")
+
+    paths = []
+    for i in range(shape.modules):
+        path = os.path.join(package_dir, f"mod{i}.py")
+        with open(path, "w") as f:
+            f.write(module_source(i, shape))
+        paths.append(path)
+    return paths
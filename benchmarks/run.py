@@ -0,0 +1,165 @@
+"""Run benchmarks and compare results with a baseline.
+
+Usage:
+    python -m benchmarks.run --output result.json
+    python -m benchmarks.run --baseline result.json --threshold 0.2
+
+With --baseline, the exit code is 1 if a stage of a case is slower than the
+baseline by more than threshold(relative) and min-time(absolute seconds).
+"""
+
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+from typing import Dict, List, Optional, Any
+from pystatic.config import Config
+from pystatic.manager import Manager
+from benchmarks.generate import SHAPES, ProjectShape, generate_project
+from benchmarks.timing import STAGES, StageTimer
+
+RESULT_VERSION = 1
+
+
+def run_case(
+    shape: ProjectShape, repeat: int, test_typeshed: bool
+) -> Dict[str, Any]:
+    """Check a generated project repeat times, keep the fastest time of each
+    stage.
+    """
+    root = tempfile.mkdtemp(prefix="pystatic_bench_")
+    try:
+        paths = generate_project(root, shape)
+        config = Config({"cwd": root, "test_typeshed": test_typeshed})
+
+        best: Dict[str, float] = {}
+        messages = 0
+        timer = StageTimer()
+        with timer.install():
+            for _ in range(repeat):
+                timer.reset()
+                begin = time.perf_counter()
+                manager = Manager(config)
+                startup = time.perf_counter() - begin
+
+                timer.reset()
+                begin = time.perf_counter()
+                for path in paths:
+                    manager.add_check_file(path)
+                manager.preprocess()
+                manager.infer()
+                total = time.perf_counter() - begin
+
+                messages = sum(len(manager.take_messages(path)) for path in paths)
+                cur = dict(timer.times, startup=startup, total=total)
+                for stage, seconds in cur.items():
+                    best[stage] = min(best.get(stage, seconds), seconds)
+
+        return {"shape": shape._asdict(), "stages": best, "messages": messages}
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def run(
+    shape_names: List[str], repeat: int, test_typeshed: bool = False
+) -> Dict[str, Any]:
+    return {
+        "version": RESULT_VERSION,
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "test_typeshed": test_typeshed,
+        "cases": {
+            name: run_case(SHAPES[name], repeat, test_typeshed)
+            for name in shape_names
+        },
+    }
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float,
+    min_time: float,
+) -> List[str]:
+    """Return descriptions of stages that got slower than the baseline"""
+    regressions = []
+    for name, base_case in baseline.get("cases", {}).items():
+        cur_case = current["cases"].get(name)
+        if not cur_case:
+            continue
+        for stage, base_time in base_case["stages"].items():
+            cur_time = cur_case["stages"].get(stage)
+            if cur_time is None:
+                continue
+            if (
+                cur_time > base_time * (1 + threshold)
+                and cur_time - base_time > min_time
+            ):
+                percent = (cur_time / base_time - 1) * 100 if base_time else 0
+                regressions.append(
+                    f"{name}.{stage}: {base_time:.4f}s -> {cur_time:.4f}s "
+                    f"(+{percent:.1f}%)"
+                )
+    return regressions
+
+
+def format_result(result: Dict[str, Any]) -> str:
+    columns = STAGES + ["startup", "total"]
+    lines = ["case".ljust(10) + "".join(col.rjust(18) for col in columns)]
+    for name, case in result["cases"].items():
+        stages = case["stages"]
+        lines.append(
+            name.ljust(10) + "".join(f"{stages[col]:18.4f}" for col in columns)
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser("pystatic benchmarks")
+    parser.add_argument(
+        "--shape",
+        nargs="*",
+        choices=sorted(SHAPES),
+        default=["small", "medium"],
+        help="shapes of generated projects",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="runs of each case")
+    parser.add_argument("--test-typeshed", action="store_true")
+    parser.add_argument("--output", type=str, help="file to write json result")
+    parser.add_argument("--baseline", type=str, help="json result to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="allowed relative slowdown of a stage",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.005,
+        help="slowdowns less than this(seconds) are ignored",
+    )
+    args = parser.parse_args(argv)
+
+    result = run(args.shape, args.repeat, args.test_typeshed)
+    print(format_result(result))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, result, args.threshold, args.min_time)
+        for regression in regressions:
+            print(f"regression: {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Time every stage of pystatic's pipeline.
+
+Stages are timed by wrapping the functions the pipeline calls, so pystatic
+itself needs no change to be benchmarked.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple, Any
+import pystatic.manager as manager_module
+import pystatic.preprocess.preprocessor as preprocessor_module
+from pystatic.infer.infer import InferStarter
+
+STAGES = [
+    "path2ast",
+    "get_definition",
+    "resolve_import",
+    "toposort_prepdef",
+    "resolve",
+    "InferStarter",
+]
+
+# (object, attribute, stage)
+_PATCH_POINTS: List[Tuple[Any, str, str]] = [
+    (manager_module, "path2ast", "path2ast"),
+    (preprocessor_module, "get_definition", "get_definition"),
+    (preprocessor_module, "get_definition_in_function", "get_definition"),
+    (preprocessor_module, "get_definition_in_method", "get_definition"),
+    (preprocessor_module, "resolve_import", "resolve_import"),
+    (preprocessor_module, "toposort_prepdef", "toposort_prepdef"),
+    (preprocessor_module, "resolve", "resolve"),
+    (InferStarter, "start_infer", "InferStarter"),
+]
+
+
+class StageTimer:
+    """Accumulate wall time spent in each stage"""
+
+    def __init__(self) -> None:
+        self.times: Dict[str, float] = {}
+        self.reset()
+
+    def reset(self):
+        self.times = {stage: 0.0 for stage in STAGES}
+
+    def wrap(self, func: Callable, stage: str) -> Callable:
+        def wrapper(*args, **kwargs):
+            begin = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.times[stage] += time.perf_counter() - begin
+
+        return wrapper
+
+    @contextmanager
+    def install(self):
+        """Wrap the stages while in the context"""
+        originals = []
+        for obj, attr, stage in _PATCH_POINTS:
+            original = getattr(obj, attr)
+            originals.append((obj, attr, original))
+            setattr(obj, attr, self.wrap(original, stage))
+        try:
+            yield self
+        finally:
+            for obj, attr, original in originals:
+                setattr(obj, attr, original)
@@ -0,0 +1,136 @@
+"""Measure how fast visitors dispatch nodes and how many nodes they visit.
+
+Usage:
+    python -m benchmarks.visitor --shape medium --repeat 5
+    python -m benchmarks.visitor --shape medium --visits
+
+Modules of a generated project are parsed once, then each visitor walks them
+repeat times. The best number of visits per second is reported.
+
+With --visits, the project is checked once and nodes visited per module by
+each visitor class are reported instead.
+"""
+
+import ast
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from typing import Dict, List, Optional
+from pystatic.config import Config
+from pystatic.manager import Manager
+from pystatic.visitor import BaseVisitor, NoGenVisitor
+from benchmarks.generate import SHAPES, ProjectShape, generate_project, module_source
+
+
+class _NameCounter(BaseVisitor):
+    """Walk the whole tree, most nodes go to generic_visit"""
+
+    def __init__(self) -> None:
+        self.visits = 0
+        self.names = 0
+
+    def visit(self, node, *args, **kwargs):
+        self.visits += 1
+        return super().visit(node, *args, **kwargs)
+
+    def visit_Name(self, node: ast.Name):
+        self.names += 1
+
+
+class _FirstName(NoGenVisitor):
+    """Find the first name of an expression, like the visitors that build
+    dependency graphs. Many expressions have no visit method.
+    """
+
+    def __init__(self) -> None:
+        self.visits = 0
+
+    def visit(self, node, *args, **kwargs):
+        self.visits += 1
+        return super().visit(node, *args, **kwargs)
+
+    def visit_missing(self, node, *args, **kwargs):
+        return None
+
+    def visit_Name(self, node: ast.Name):
+        return node.id
+
+    def visit_Attribute(self, node: ast.Attribute):
+        return self.visit(node.value)
+
+    def visit_Subscript(self, node: ast.Subscript):
+        return self.visit(node.value)
+
+
+def _walk_expressions(trees: List[ast.AST]) -> int:
+    visitor = _FirstName()
+    for tree in trees:
+        for node in ast.walk(tree):
+            if isinstance(node, ast.expr):
+                visitor.visit(node)
+    return visitor.visits
+
+
+def _walk_trees(trees: List[ast.AST]) -> int:
+    visitor = _NameCounter()
+    for tree in trees:
+        visitor.visit(tree)
+    return visitor.visits
+
+
+def run(shape: ProjectShape, repeat: int) -> Dict[str, float]:
+    """visitor -> visits per second"""
+    trees = [ast.parse(module_source(i, shape)) for i in range(shape.modules)]
+    result = {}
+    for name, walk in (("generic", _walk_trees), ("nogen", _walk_expressions)):
+        best = 0.0
+        for _ in range(repeat):
+            begin = time.perf_counter()
+            visits = walk(trees)
+            elapsed = time.perf_counter() - begin
+            best = max(best, visits / elapsed)
+        result[name] = best
+    return result
+
+
+def count_visits(shape: ProjectShape) -> Dict[str, float]:
+    """visitor class -> nodes visited per module in a check"""
+    root = tempfile.mkdtemp(prefix="pystatic_bench_")
+    try:
+        paths = generate_project(root, shape)
+        manager = Manager(Config({"cwd": root, "stats": True}))
+        for path in paths:
+            manager.add_check_file(path)
+        manager.preprocess()
+        manager.infer()
+        visits = manager.get_stats().visits
+        return {name: count / len(paths) for name, count in sorted(visits.items())}
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser("pystatic visitor benchmark")
+    parser.add_argument("--shape", choices=sorted(SHAPES), default="medium")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of each visitor")
+    parser.add_argument(
+        "--visits", action="store_true", help="count nodes visited per module"
+    )
+    args = parser.parse_args(argv)
+
+    if args.visits:
+        visits = count_visits(SHAPES[args.shape])
+        for name, count in visits.items():
+            print(f"{name.ljust(24)}{count:12.1f} visits/module")
+        print(f"{'total'.ljust(24)}{sum(visits.values()):12.1f} visits/module")
+        return 0
+
+    for name, rate in run(SHAPES[args.shape], args.repeat).items():
+        print(f"{name.ljust(10)}{rate:14.0f} visits/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
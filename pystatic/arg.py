@@ -72,6 +72,57 @@ def copy_argument(argument: Argument):
     return new_argument
 
 
+class MatchPlan:
+    """Shape of an Argument, used to tell whether a call can match it without
+    checking the types of the arguments.
+    """
+    __slots__ = [
+        "pos_names",
+        "pos_required",
+        "has_vararg",
+        "has_kwarg",
+        "kwonly_names",
+        "kwonly_required",
+    ]
+
+    def __init__(self, argument: Argument) -> None:
+        # names of positional parameters, None for positional only ones
+        self.pos_names: List[Optional[str]] = [None] * len(argument.posonlyargs)
+        self.pos_names.extend(arg.name for arg in argument.args)
+        self.pos_required: List[bool] = [
+            not arg.valid
+            for arg in itertools.chain(argument.posonlyargs, argument.args)
+        ]
+        self.has_vararg = argument.vararg is not None
+        self.has_kwarg = argument.kwarg is not None
+        self.kwonly_names = frozenset(arg.name for arg in argument.kwonlyargs)
+        self.kwonly_required = frozenset(
+            arg.name for arg in argument.kwonlyargs if not arg.valid)
+
+    def may_match(self, applyargs: "ApplyArgs") -> bool:
+        """False if match_argument would report missing or extra arguments"""
+        if applyargs.vararg or applyargs.varkwarg:
+            return True
+        n_pos = len(applyargs.args)
+        pos_names = self.pos_names
+        if n_pos > len(pos_names) and not self.has_vararg:
+            return False
+        kwargs = applyargs.kwargs
+        if not self.kwonly_required <= kwargs.keys():
+            return False
+
+        for i in range(n_pos, len(pos_names)):
+            name = pos_names[i]
+            if self.pos_required[i] and (name is None or name not in kwargs):
+                return False
+        if not self.has_kwarg:
+            rest_names = pos_names[n_pos:]
+            for name in kwargs:
+                if name not in self.kwonly_names and name not in rest_names:
+                    return False
+        return True
+
+
 def match_argument(argument: Argument, applyargs: "ApplyArgs",
                    callnode: Optional[ast.AST]) -> List[ErrorCode]:
     from pystatic.consistent import is_consistent
@@ -91,7 +142,8 @@ def match_argument(argument: Argument, applyargs: "ApplyArgs",
 
     for arg in argument.posonlyargs:
         if i_apply_arg >= len_apply_arg:
-            missing_args.append(arg.name)
+            if not arg.valid:
+                missing_args.append(arg.name)
         else:
             # match posonly arguments
             match_arg(arg, arg.name, args[i_apply_arg].value,
@@ -115,7 +167,7 @@ def match_argument(argument: Argument, applyargs: "ApplyArgs",
             i_apply_arg += 1
             i_param_arg += 1
 
-    kwargs = applyargs.kwargs
+    kwargs = dict(applyargs.kwargs)
     if i_param_arg >= len_param_arg:
         # args part of parameter argument list are all matched
         if i_apply_arg < len_apply_arg:
@@ -148,7 +200,7 @@ def match_argument(argument: Argument, applyargs: "ApplyArgs",
                     kwargs[cur_argname].node,
                 )
                 kwargs.pop(cur_argname)
-            else:
+            elif not param_args[i_param_arg].valid:
                 missing_args.append(cur_argname)
             i_param_arg += 1
 
@@ -158,7 +210,7 @@ def match_argument(argument: Argument, applyargs: "ApplyArgs",
             target_ins = kwargs[arg.name]
             match_arg(arg, arg.name, target_ins.value, target_ins.node)
             kwargs.pop(arg.name)
-        else:
+        elif not arg.valid:
             missing_args.append(arg.name)
 
     if len(kwargs):
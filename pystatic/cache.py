@@ -0,0 +1,301 @@
+import os
+import ast
+import sys
+import json
+import pickle
+import shutil
+import sqlite3
+import hashlib
+import tempfile
+from typing import Dict, List, Optional, Any, Sequence, Tuple, TYPE_CHECKING
+from pystatic.config import pystatic_dir
+from pystatic.fsys import FilePath
+
+if TYPE_CHECKING:
+    from pystatic.fsys import Filesys
+    from pystatic.config import Config
+    from pystatic.error.message import Message
+    from pystatic.symid import SymId
+
+# bump this when the layout of cache files changes
+CACHE_VERSION = 1
+
+AST_CACHE_DIR = "ast"
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha1(content.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def path_key(path: FilePath) -> str:
+    """Name of the cache file of a source file"""
+    return hashlib.sha1(os.path.normcase(path).encode("utf-8")).hexdigest()
+
+
+def code_fingerprint() -> str:
+    """Changes of pystatic's source invalidate caches"""
+    sha = hashlib.sha1()
+    for root, _, files in os.walk(pystatic_dir):
+        if "typeshed" in os.path.relpath(root, pystatic_dir):
+            continue
+        for filename in sorted(files):
+            if filename.endswith(".py"):
+                st = os.stat(os.path.join(root, filename))
+                sha.update(f"{filename}:{st.st_mtime_ns}:{st.st_size};".encode())
+    return sha.hexdigest()
+
+
+def typeshed_fingerprint(typeshed: Optional[FilePath]) -> str:
+    """Changes of stubs in typeshed invalidate results checked against them"""
+    sha = hashlib.sha1()
+    if typeshed:
+        for root, dirs, files in os.walk(typeshed):
+            dirs.sort()
+            for filename in sorted(files):
+                path = os.path.join(root, filename)
+                st = os.stat(path)
+                relpath = os.path.relpath(path, typeshed)
+                sha.update(f"{relpath}:{st.st_mtime_ns}:{st.st_size};".encode())
+    return sha.hexdigest()
+
+
+def read_source(path: FilePath) -> str:
+    with open(path, "r") as f:
+        return f.read()
+
+
+def load_pickle(path: FilePath) -> Optional[Any]:
+    """Load a pickled cache file, return None if it's missing or broken"""
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+
+
+def dump_pickle(path: FilePath, data: Any) -> bool:
+    """Write data to path atomically, return False on failure"""
+    dirname = os.path.dirname(path)
+    try:
+        os.makedirs(dirname, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=dirname, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return True
+    except (OSError, pickle.PicklingError, RecursionError):
+        return False
+
+
+def clear_cache_dir(cache_dir: FilePath):
+    if os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+class AstCache:
+    """Persistent cache of parsed module asts.
+
+    An entry is keyed by the file path and stores the mtime, size and content
+    hash of the source it was built from together with the running python
+    version. The mtime and size are checked first, the content hash is only
+    computed when they differ so touching a file doesn't invalidate its entry.
+    """
+
+    def __init__(self, cache_dir: FilePath) -> None:
+        self.cache_dir = os.path.join(cache_dir, AST_CACHE_DIR)
+        self.py_version = tuple(sys.version_info[:2])
+
+    def entry_path(self, path: FilePath) -> FilePath:
+        return os.path.join(self.cache_dir, path_key(path) + ".pickle")
+
+    def _load_entry(self, path: FilePath) -> Optional[dict]:
+        entry = load_pickle(self.entry_path(path))
+        if (
+            not isinstance(entry, dict)
+            or entry.get("version") != CACHE_VERSION
+            or entry.get("py_version") != self.py_version
+            or entry.get("path") != path
+        ):
+            return None
+        return entry
+
+    def _store_entry(self, path: FilePath, st: os.stat_result, digest: str, tree):
+        entry = {
+            "version": CACHE_VERSION,
+            "py_version": self.py_version,
+            "path": path,
+            "mtime": st.st_mtime_ns,
+            "size": st.st_size,
+            "hash": digest,
+            "ast": tree,
+        }
+        dump_pickle(self.entry_path(path), entry)
+
+    def parse(self, path: FilePath) -> ast.AST:
+        """Return the ast of path, load it from the cache if it's not stale"""
+        st = os.stat(path)
+        entry = self._load_entry(path)
+        if entry and entry["mtime"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            return entry["ast"]
+
+        content = read_source(path)
+        digest = content_hash(content)
+        if entry and entry["hash"] == digest:
+            # content unchanged, only refresh the stat information
+            tree = entry["ast"]
+            self._store_entry(path, st, digest, tree)
+            return tree
+
+        tree = ast.parse(content, type_comments=True)
+        # store before returning so later modification of the tree(reach,
+        # type...) won't be written to the cache
+        self._store_entry(path, st, digest, tree)
+        return tree
+
+    def clear(self):
+        clear_cache_dir(self.cache_dir)
+
+
+class ResultCache:
+    """Messages of checked modules from earlier runs, stored in one sqlite
+    database so that it can be kept between runs(and CI jobs).
+
+    An entry is keyed by the path of a module and stores the modules it
+    imports(directly or not, typeshed excluded) together with a hash of the
+    sources of the module and its imports and of everything else messages
+    depend on(pystatic itself, the path and the files of typeshed, python
+    version, reported levels and codes). Messages are replayed only if the
+    hash is the same.
+
+    The search paths of the run and what every symid imported by these
+    modules resolved to(found or not) are stored too, an entry is stale if
+    the search paths differ or any of the symids resolves to another file,
+    e.g. a module that was missing is created or a stub shadows a module.
+    """
+
+    def __init__(self, db_path: FilePath, config: "Config", fsys: "Filesys") -> None:
+        """
+        @param fsys: imports are resolved by it, its search paths must be
+        those of the run.
+        """
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # workers of a parallel check share the database
+        self.conn = sqlite3.connect(db_path, timeout=60)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results "
+            "(path TEXT PRIMARY KEY, symid TEXT, key TEXT, deps TEXT, messages BLOB)"
+        )
+        self.conn.commit()
+        self.env = "|".join(
+            [
+                str(CACHE_VERSION),
+                code_fingerprint(),
+                str(config.typeshed),
+                typeshed_fingerprint(config.typeshed),
+                str(tuple(sys.version_info[:2])),
+                config.level.name,
+                ",".join(sorted(config.disable_code)),
+            ]
+        )
+        # path -> content hash, None if it can't be read
+        self._hashes: Dict[FilePath, Optional[str]] = {}
+        self.fsys = fsys
+        # statements written in close, holding a write transaction during the
+        # run would lock out other workers
+        self._pending: List[Tuple[str, Tuple[Any, ...]]] = []
+
+    def file_hash(self, path: FilePath) -> Optional[str]:
+        if path not in self._hashes:
+            try:
+                self._hashes[path] = content_hash(read_source(path))
+            except (OSError, UnicodeDecodeError):
+                self._hashes[path] = None
+        return self._hashes[path]
+
+    def make_key(self, path: FilePath, deps: Sequence[FilePath]) -> Optional[str]:
+        """None if a file is missing"""
+        sha = hashlib.sha1(self.env.encode("utf-8"))
+        for cur_path in [path, *deps]:
+            digest = self.file_hash(cur_path)
+            if digest is None:
+                return None
+            sha.update(f"{cur_path}\0{digest}\0".encode("utf-8", "surrogatepass"))
+        return sha.hexdigest()
+
+    def resolve(self, symid: "SymId") -> Optional[FilePath]:
+        """File symid resolves to, empty for a namespace package and None if
+        it's not found
+        """
+        find_res = self.fsys.find_module(symid)
+        if not find_res:
+            return None
+        return find_res.analyse_path or ""
+
+    def lookup(self, path: FilePath) -> Optional[Tuple["SymId", List["Message"]]]:
+        """symid and messages of path if its entry is not stale"""
+        row = self.conn.execute(
+            "SELECT symid, key, deps, messages FROM results WHERE path = ?", (path,)
+        ).fetchone()
+        if not row:
+            return None
+        symid, key, deps, messages = row
+        deps = json.loads(deps)
+        if (
+            not isinstance(deps, dict)
+            or deps["search"] != self.fsys.search_paths()
+            or self.make_key(path, deps["files"]) != key
+            or any(
+                self.resolve(imported) != resolved
+                for imported, resolved in deps["imports"].items()
+            )
+        ):
+            return None
+        try:
+            return symid, pickle.loads(messages)
+        except (EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+
+    def store(
+        self,
+        path: FilePath,
+        symid: "SymId",
+        deps: Sequence[FilePath],
+        imports: Sequence["SymId"],
+        messages: Sequence["Message"],
+    ):
+        """
+        @param deps: files of the modules path imports.
+
+        @param imports: symids imported by path and deps, including those not
+        found.
+        """
+        key = self.make_key(path, deps)
+        if key is None:
+            return
+        data = pickle.dumps(list(messages), protocol=pickle.HIGHEST_PROTOCOL)
+        entry_deps = {
+            "files": list(deps),
+            "search": self.fsys.search_paths(),
+            "imports": {imported: self.resolve(imported) for imported in imports},
+        }
+        self._pending.append(
+            (
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (path, symid, key, json.dumps(entry_deps), data),
+            )
+        )
+
+    def remove(self, path: FilePath):
+        self._pending.append(("DELETE FROM results WHERE path = ?", (path,)))
+
+    def close(self):
+        """Write changes in one short transaction and close"""
+        with self.conn:
+            for sql, params in self._pending:
+                self.conn.execute(sql, params)
+        self._pending = []
+        self.conn.close()
@@ -3,6 +3,7 @@ import os
 from typing import List, Optional, Type, Tuple, Final
 
 from pystatic.sitepkg import get_sitepkg
+from pystatic.error.level import Level
 
 PY_VERSION = Tuple[int, int]
 
@@ -10,6 +11,8 @@ pystatic_dir: str = os.path.dirname(__file__)
 
 typeshed: Final[str] = 'faketypeshed'
 
+result_cache_file: Final[str] = 'results.sqlite'
+
 
 class Config:
     def __init__(self, config):
@@ -62,3 +65,39 @@ class Config:
         # no_typeshed: if true, then typeshed is not automatically loaded.
         # default: False.
         self.no_typeshed: bool = get('no_typeshed') or False
+
+        # lazy_typeshed: if true, modules imported by stub files are not loaded
+        # until they are used.
+        # default: False.
+        self.lazy_typeshed: bool = get('lazy_typeshed') or False
+
+        # stats: collect statistics of the run(see pystatic.stats).
+        # default: False.
+        self.stats: bool = bool(get('stats'))
+
+        # level: messages below this level(hint, warn or error) are not
+        # reported.
+        # default: hint
+        level = get('level', str)
+        self.level: Level = Level.__members__.get(level.upper() if level else '',
+                                                  Level.HINT)
+
+        # disable_code: names of error code classes(see pystatic.error.errorcode)
+        # that are not reported.
+        # default: []
+        self.disable_code: List[str] = get('disable_code', list) or []
+
+        # cache_dir: directory to store persistent caches(parsed asts, ...),
+        # relative paths are relative to cwd.
+        # default: None, which means nothing is cached.
+        self.cache_dir: Optional[str] = None
+        if (cache_dir := get('cache_dir', str)) and not get('no_cache', bool):
+            self.cache_dir = os.path.join(self.cwd, cache_dir)
+
+        # result_cache: sqlite database storing messages of checked modules,
+        # modules whose sources(and imports) are unchanged are not checked
+        # again. It lives in cache_dir.
+        # default: None, which means messages are not cached.
+        self.result_cache: Optional[str] = None
+        if self.cache_dir and get('result_cache', bool):
+            self.result_cache = os.path.join(self.cache_dir, result_cache_file)
@@ -1,13 +1,78 @@
-from pystatic.typesys import TypeClassTemp, INFINITE_ARITY
+import weakref
+from pystatic import stats
+from pystatic.typesys import TypeClassTemp, INFINITE_ARITY, get_hierarchy_epoch
 from pystatic.predefined import *
 
 
+# result, weak references to the left and right instances
+_ConsistentEntry = Tuple[bool, "weakref.ref[TypeIns]", "weakref.ref[TypeIns]"]
+
+
+class ConsistentCache:
+    """Results of is_consistent for pairs of interned instances(equal types
+    are the same object, see TypeTemp.get_interned).
+
+    The cache is shared by all managers, so it refers to the instances weakly
+    and keeps no types(and their symtables) alive. Results depend on the
+    class hierarchy, the cache is cleared when it changes.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        # (id of left, id of right) -> entry, the references tell whether the
+        # ids still belong to the same instances
+        self.table: Dict[Tuple[int, int], _ConsistentEntry] = {}
+        self.epoch = get_hierarchy_epoch()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, left: "TypeIns", right: "TypeIns") -> Optional[bool]:
+        if self.epoch != get_hierarchy_epoch():
+            self.clear()
+        res = None
+        entry = self.table.get((id(left), id(right)))
+        if entry and entry[1]() is left and entry[2]() is right:
+            res = entry[0]
+        if res is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        if stats.active:
+            stats.active.count_cache("consistent", res is not None)
+        return res
+
+    def put(self, left: "TypeIns", right: "TypeIns", res: bool):
+        key = (id(left), id(right))
+        if key not in self.table and len(self.table) >= self.maxsize:
+            # drop the oldest entry
+            del self.table[next(iter(self.table))]
+        self.table[key] = (res, weakref.ref(left), weakref.ref(right))
+
+    def clear(self):
+        self.table.clear()
+        self.epoch = get_hierarchy_epoch()
+
+
+consistent_cache = ConsistentCache(1 << 16)
+
+
 def is_consistent(left_ins: "TypeIns", right_ins: "TypeIns"):
     """Is "a = b" safe or not"""
     # TODO: protocol
     if left_ins == any_ins or right_ins == any_ins:
         return True
 
+    if not (left_ins.is_interned() and right_ins.is_interned()):
+        # an equal instance would be another key
+        return _is_consistent(left_ins, right_ins)
+    res = consistent_cache.get(left_ins, right_ins)
+    if res is None:
+        res = _is_consistent(left_ins, right_ins)
+        consistent_cache.put(left_ins, right_ins, res)
+    return res
+
+
+def _is_consistent(left_ins: "TypeIns", right_ins: "TypeIns") -> bool:
     if left_ins == none_ins:
         return nullable(right_ins)
     elif right_ins == none_ins:
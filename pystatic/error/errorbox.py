@@ -1,6 +1,28 @@
-from typing import List
+from typing import List, Optional, Sequence
 
 from pystatic.error.errorcode import ErrorCode, Sendable
+from pystatic.error.level import Level
+
+
+class ErrorFilter:
+    """Decide which errors are reported"""
+
+    __slots__ = ["level", "disabled"]
+
+    def __init__(self, level: Level = Level.HINT, disabled: Sequence[str] = ()):
+        """
+        @param level: errors below this level are dropped.
+
+        @param disabled: names of ErrorCode classes that are dropped.
+        """
+        self.level = level
+        self.disabled = frozenset(disabled)
+
+    def accept(self, error: ErrorCode) -> bool:
+        return (
+            error.level.value >= self.level.value
+            and error.__class__.__name__ not in self.disabled
+        )
 
 
 class ErrorBox(object):
@@ -11,9 +33,11 @@ class ErrorBox(object):
     def add_err(self, err: ErrorCode):
         self.error.append(err)
 
-    def release(self, mailman: Sendable):
+    def release(self, mailman: Sendable, error_filter: Optional[ErrorFilter] = None):
+        """Send messages of errors(accepted by error_filter) to mailman"""
         for error in self.error:
-            error.send_message(self, mailman)
+            if not error_filter or error_filter.accept(error):
+                error.send_message(self, mailman)
         self.error = []
 
     def clear(self):
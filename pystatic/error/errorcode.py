@@ -35,12 +35,12 @@ class ErrorCode:
         ...
 
     def send_message(self, box: HasTag, mailman: Sendable):
+        code = self.__class__.__name__
         if self.node:
-            msg = PositionMessage(
-                self.level, ast_to_position(self.node), self.to_string()
-            )
+            # text and position are computed when they are used
+            msg = PositionMessage(self.level, None, None, code, self)
         else:
-            msg = Message(self.level, self.to_string())
+            msg = Message(self.level, None, code, self)
         mailman.send(box.tag, msg)
 
     @staticmethod
@@ -402,7 +402,13 @@ class ReferenceLoop(ErrorCode):
             pos = ast_to_position(node)
             msgs.append(f"({symid} line {pos.lineno} col {pos.col_offset})")
         hint = "reference loop: " + " -> ".join(msgs)
+        code = self.__class__.__name__
+        # the first definition ends the loop again, it's told only once
+        sent = set()
         for symid, node in self.nodelist:
+            if (symid, node) in sent:
+                continue
+            sent.add((symid, node))
             mailman.send(
-                symid, PositionMessage(self.level, ast_to_position(node), hint)
+                symid, PositionMessage(self.level, ast_to_position(node), hint, code)
             )
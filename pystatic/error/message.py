@@ -1,14 +1,40 @@
-from typing import Optional, Tuple
+from typing import Optional, Tuple, TYPE_CHECKING
 from pystatic.error.level import Level
-from pystatic.error.position import Position
+from pystatic.error.position import Position, ast_to_position
+
+if TYPE_CHECKING:
+    from pystatic.error.errorcode import ErrorCode
 
 
 class Message:
-    __slots__ = ["level", "msg"]
+    """Message sent to the user
+
+    A message sent by an ErrorCode keeps the error and formats the text when
+    it's first used, messages that are only counted or filtered are never
+    formatted.
+    """
+
+    __slots__ = ["level", "_msg", "code", "error"]
 
-    def __init__(self, level: Level, msg: str) -> None:
+    def __init__(
+        self,
+        level: Level,
+        msg: Optional[str],
+        code: Optional[str] = None,
+        error: Optional["ErrorCode"] = None,
+    ) -> None:
         self.level = level
-        self.msg = msg
+        self._msg = msg
+        # name of the ErrorCode class that sent this message
+        self.code = code
+        self.error = error
+
+    @property
+    def msg(self) -> str:
+        if self._msg is None:
+            assert self.error
+            self._msg = self.error.to_string()
+        return self._msg
 
     def get_position(self) -> Optional[Position]:
         return None
@@ -26,16 +52,34 @@ class Message:
     def __str__(self):
         return self.msg
 
+    def __reduce__(self):
+        # the error refers to asts and types, only the text is pickled
+        return Message, (self.level, self.msg, self.code)
+
 
 class PositionMessage(Message):
+    __slots__ = ["_pos"]
+
     def __init__(
         self,
         level: Level,
-        pos: Position,
-        msg: str,
+        pos: Optional[Position],
+        msg: Optional[str],
+        code: Optional[str] = None,
+        error: Optional["ErrorCode"] = None,
     ):
-        super().__init__(level, msg)
-        self.pos = pos
+        """
+        @param pos: None if it's computed from the node of error.
+        """
+        super().__init__(level, msg, code, error)
+        self._pos = pos
+
+    @property
+    def pos(self) -> Position:
+        if self._pos is None:
+            assert self.error and self.error.node
+            self._pos = ast_to_position(self.error.node)
+        return self._pos
 
     def get_position(self) -> Optional[Position]:
         return self.pos
@@ -49,3 +93,6 @@ class PositionMessage(Message):
             + " "
             + self.msg
         )
+
+    def __reduce__(self):
+        return PositionMessage, (self.level, self.pos, self.msg, self.code)
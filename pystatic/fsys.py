@@ -1,6 +1,6 @@
 import os
 from pystatic.config import PY_VERSION
-from typing import List, Dict, Optional, TYPE_CHECKING
+from typing import List, Dict, Optional, Set, Tuple, TYPE_CHECKING
 from pystatic.symid import symid2list, absolute_symidlist, list2symid
 
 if TYPE_CHECKING:
@@ -25,11 +25,20 @@ class ModuleFindRes:
         # File to analyse, if result is a namespace package, target_file is None
         self.analyse_path = analyse_path
 
+    def copy(self) -> "ModuleFindRes":
+        return ModuleFindRes(self.res_type, list(self.paths), self.analyse_path)
+
 
 class Node:
     def __init__(self, res: ModuleFindRes):
         self.res: ModuleFindRes = res
         self.child: Dict[str, Node] = {}
+        # names that can't be found under this node
+        self.missing: Set[str] = set()
+
+
+# (files, directories) in a directory
+DirListing = Tuple[Set[str], Set[str]]
 
 
 class Filesys:
@@ -55,12 +64,19 @@ class Filesys:
 
         self.cwd = config.cwd
 
-        # dummy namespace on the root
-        self.dummy_ns = ModuleFindRes(ModuleFindRes.Namespace, [], None)
-        self.root = Node(self.dummy_ns)
-
         self.path_symid_map: Dict[FilePath, "SymId"] = {}
 
+        # results of find_module are memoized in a trie whose root is a dummy
+        # namespace containing all search paths, listings of directories
+        # visited are cached too.
+        self.dir_listing: Dict[FilePath, Optional[DirListing]] = {}
+        self.reset_find_cache()
+
+        # number of filesystem calls made by find_module
+        self.syscall_count = 0
+        # number of find_module calls
+        self.find_count = 0
+
     def abspath(self, path: FilePath) -> FilePath:
         return os.path.normpath(os.path.join(self.cwd, path))
 
@@ -78,31 +94,56 @@ class Filesys:
     def add_userpath(self, path: str):
         if path not in self.user_path:
             self.user_path.append(path)
+            # search paths changed, memoized results may be shadowed now
+            self.reset_find_cache()
+
+    def reset_find_cache(self):
+        """Forget memoized results of find_module"""
+        self.dummy_ns = ModuleFindRes(
+            ModuleFindRes.Namespace,
+            self.manual_path + self.user_path + self.typeshed + self.sitepkg,
+            None,
+        )
+        self.root = Node(self.dummy_ns)
+
+    def search_paths(self) -> List[FilePath]:
+        """Directories top-level modules are searched in, in order"""
+        return list(self.dummy_ns.paths)
+
+    def clear_cache(self):
+        """Forget everything cached about the filesystem, call this when files
+        may have been added or removed.
+        """
+        self.dir_listing = {}
+        self.reset_find_cache()
 
     def find_module(self, symid: str) -> Optional[ModuleFindRes]:
+        """Find a module, the result is a copy so callers can modify it"""
+        self.find_count += 1
         symidlist = symid2list(symid)
         if not symidlist:
             return None
 
         cur_node = self.root
-        self.dummy_ns.paths = (
-            self.manual_path + self.user_path + self.typeshed + self.sitepkg
-        )
-        i = 0
-        while i < len(symidlist) and symidlist[i] in cur_node.child:
-            cur_node = cur_node.child[symidlist[i]]
-            i += 1
-
-        cur_res = cur_node.res
-        for subsymid in symidlist[i:]:
-            if cur_res.res_type == ModuleFindRes.Module:
+        for subsymid in symidlist:
+            if subsymid in cur_node.child:
+                cur_node = cur_node.child[subsymid]
+                continue
+            elif (
+                subsymid in cur_node.missing
+                or cur_node.res.res_type == ModuleFindRes.Module
+            ):
                 return None
-            walk_res = _walk_single(subsymid, cur_res.paths)
+
+            walk_res = self._walk_single(subsymid, cur_node.res.paths)
             if not walk_res:
+                cur_node.missing.add(subsymid)
                 return None
-            cur_res = walk_res
+            new_node = Node(walk_res)
+            cur_node.child[subsymid] = new_node
+            cur_node = new_node
 
-        return cur_res
+        return cur_node.res.copy()
 
     def relative_find_module(
         self, symid: str, module: "TypeModuleIns"
@@ -110,42 +151,72 @@ class Filesys:
         abs_symid = symidlist_from_impitem(symid, module)
         return self.find_module(list2symid(abs_symid))
 
-
-def _walk_single(subsymid: str, paths: List[str]) -> Optional[ModuleFindRes]:
-    assert paths
-    ns_paths = []
-    target = None
-    target_file = None
-    for path in paths:
-        sub_target = os.path.normpath(os.path.join(path, subsymid))
-        pyi_file = sub_target + ".pyi"
-        py_file = sub_target + ".py"
-        if os.path.isfile(pyi_file):
-            return ModuleFindRes(ModuleFindRes.Module, [pyi_file], pyi_file)
-        if os.path.isfile(py_file):
-            return ModuleFindRes(ModuleFindRes.Module, [py_file], py_file)
-
-        if os.path.isdir(sub_target):
-            init_file = os.path.join(sub_target, "__init__.py")
-            init_pyi_file = os.path.join(sub_target, "__init__.pyi")
-            if os.path.isfile(init_file):
-                # FIXME: should we take .py file over .pyi file?
-                target = sub_target
-                target_file = init_file
-                break
-            elif os.path.isfile(init_pyi_file):
-                target = sub_target
-                target_file = init_pyi_file
-                break
-            else:
-                ns_paths.append(sub_target)
-    if target:
-        assert target_file
-        return ModuleFindRes(ModuleFindRes.Package, [target], target_file)
-    elif ns_paths:
-        return ModuleFindRes(ModuleFindRes.Namespace, ns_paths, None)
-    else:
-        return None
+    def listdir(self, path: FilePath) -> Optional[DirListing]:
+        """Files and directories in path, None if path is not a directory.
+
+        Each directory is scanned only once until clear_cache is called.
+        """
+        if path in self.dir_listing:
+            return self.dir_listing[path]
+
+        self.syscall_count += 1
+        listing: Optional[DirListing] = None
+        try:
+            files: Set[str] = set()
+            dirs: Set[str] = set()
+            with os.scandir(path) as it:
+                for entry in it:
+                    # is_file/is_dir don't need extra syscalls unless entry
+                    # is a symbolic link
+                    if entry.is_file():
+                        files.add(entry.name)
+                    elif entry.is_dir():
+                        dirs.add(entry.name)
+            listing = (files, dirs)
+        except OSError:
+            pass
+        self.dir_listing[path] = listing
+        return listing
+
+    def _walk_single(self, subsymid: str, paths: List[str]) -> Optional[ModuleFindRes]:
+        assert paths
+        ns_paths = []
+        target = None
+        target_file = None
+        for path in paths:
+            listing = self.listdir(path)
+            if not listing:
+                continue
+            files, dirs = listing
+            sub_target = os.path.normpath(os.path.join(path, subsymid))
+            if subsymid + ".pyi" in files:
+                pyi_file = sub_target + ".pyi"
+                return ModuleFindRes(ModuleFindRes.Module, [pyi_file], pyi_file)
+            if subsymid + ".py" in files:
+                py_file = sub_target + ".py"
+                return ModuleFindRes(ModuleFindRes.Module, [py_file], py_file)
+
+            if subsymid in dirs:
+                sub_listing = self.listdir(sub_target)
+                sub_files = sub_listing[0] if sub_listing else set()
+                if "__init__.py" in sub_files:
+                    # FIXME: should we take .py file over .pyi file?
+                    target = sub_target
+                    target_file = os.path.join(sub_target, "__init__.py")
+                    break
+                elif "__init__.pyi" in sub_files:
+                    target = sub_target
+                    target_file = os.path.join(sub_target, "__init__.pyi")
+                    break
+                else:
+                    ns_paths.append(sub_target)
+        if target:
+            assert target_file
+            return ModuleFindRes(ModuleFindRes.Package, [target], target_file)
+        elif ns_paths:
+            return ModuleFindRes(ModuleFindRes.Namespace, ns_paths, None)
+        else:
+            return None
 
 
 def _resolve_typeshed(typeshed: str, pyv: PY_VERSION) -> List[str]:
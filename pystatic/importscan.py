@@ -0,0 +1,337 @@
+"""Find import statements of a module without parsing the whole module.
+
+One regular expression pass splits the source into logical lines, skipping
+strings, comments and brackets. Only lines that contain 'import' and headers
+of if statements static_infer can decide are tokenized. Conditions are parsed
+on their own and evaluated by static_infer, so imports in branches that are
+never checked(sys.version_info, TYPE_CHECKING...) are skipped like
+TypeDefVisitor does. Imports in function bodies are included.
+"""
+
+import io
+import re
+import ast
+import tokenize
+from typing import Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+from pystatic.reach import Reach, is_true
+from pystatic.infer.staticinfer import static_infer
+
+if TYPE_CHECKING:
+    from pystatic.config import Config
+
+# keywords of statements that end with a block
+_COMPOUND = {
+    "if",
+    "elif",
+    "else",
+    "for",
+    "while",
+    "try",
+    "except",
+    "finally",
+    "with",
+    "def",
+    "class",
+    "async",
+}
+_OPEN = {"(", "[", "{"}
+_CLOSE = {")", "]", "}"}
+
+
+class ImportStmt:
+    """An import statement, names is empty for 'import module'"""
+
+    __slots__ = ["level", "module", "names", "lineno"]
+
+    def __init__(self, level: int, module: str, names: List[str], lineno: int):
+        """
+        @param level: number of leading dots of a relative import.
+
+        @param module: module name without leading dots, it may be empty in
+        'from . import name'.
+        """
+        self.level = level
+        self.module = module
+        self.names = names
+        self.lineno = lineno
+
+    def __eq__(self, other):
+        return isinstance(other, ImportStmt) and self._key() == other._key()
+
+    def __repr__(self):
+        return f"ImportStmt{self._key()!r}"
+
+    def _key(self):
+        return (self.level, self.module, self.names, self.lineno)
+
+
+def scan_source(source: str, config: "Config") -> List[ImportStmt]:
+    """Import statements of a module in the order they appear
+
+    Raise SyntaxError or tokenize.TokenError if the source can't be tokenized.
+    """
+    return _Scanner(source, config).scan()
+
+
+def scan_file(path: str, config: "Config") -> List[ImportStmt]:
+    with open(path, "r") as f:
+        return scan_source(f.read(), config)
+
+
+# strings, comments, brackets and newlines, other code is skipped
+_LEXER = re.compile(
+    "|".join(
+        [
+            r"(?P<string>'''[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*'''",
+            r'"""[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*"""',
+            r"'[^'\\\n]*(?:\\.[^'\\\n]*)*'",
+            r'"[^"\\\n]*(?:\\.[^"\\\n]*)*")',
+            r"(?P<comment>#[^\n]*)",
+            r"(?P<open>[(\[{])",
+            r"(?P<close>[)\]}])",
+            r"(?P<newline>\\?\n)",
+        ]
+    ),
+    re.DOTALL,
+)
+
+
+def _simple_line() -> str:
+    """Pattern of a logical line in one physical line that has no backslash,
+    no multiline string and brackets nested at most two levels, most lines
+    are matched at once by it.
+    """
+    code = r"[^\n'\"#()\[\]{}\\]*"
+    # a quote followed by two more starts a triple-quoted string, not an
+    # empty string
+    string = r"""(?:'(?!'')[^'\\\n]*'|"(?!"")[^"\\\n]*")"""
+
+    def brackets(inner: str) -> str:
+        return rf"(?:\({inner}\)|\[{inner}\]|\{{{inner}\}})"
+
+    inner = rf"{code}(?:{string}{code})*"
+    inner = rf"{code}(?:(?:{string}|{brackets(inner)}){code})*"
+    return rf"{code}(?:(?:{string}|{brackets(inner)}){code})*(?:#[^\n]*)?\n"
+
+
+_SIMPLE_LINE = re.compile(_simple_line())
+_HEAD = re.compile(r"[ \t]*(\w*)")
+_IMPORT = re.compile(r"\bimport\b")
+# static_infer can only decide conditions that refer to these or start with a
+# constant, other conditions are Reach.UNKNOWN
+_STATIC_NAME = re.compile(r"\b(?:TYPE_CHECKING|version_info)\b")
+_CONST_TEST = re.compile(
+    r"(?:el)?if[\s(]*(?:(?:not\b|[-+])[\s(]*)*"
+    r"(?:True|False|None|[0-9.'\"]|[a-zA-Z]{1,2}['\"])"
+)
+
+
+def _logical_lines(source: str) -> Iterator[Tuple[int, int, int]]:
+    """First line number, start and end offset of each logical line"""
+    row = 1
+    pos = 0
+    size = len(source)
+    simple_line = _SIMPLE_LINE.match
+    while pos < size:
+        match = simple_line(source, pos)
+        if match:
+            end = match.end()
+            yield row, pos, end
+            row += 1
+            pos = end
+            continue
+
+        start_row = row
+        end = size
+        brackets = 0
+        for match in _LEXER.finditer(source, pos):
+            kind = match.lastgroup
+            if kind == "newline":
+                row += 1
+                if brackets == 0 and len(match.group()) == 1:
+                    end = match.end()
+                    break
+            elif kind == "string":
+                row += match.group().count("\n")
+            elif kind == "open":
+                brackets += 1
+            elif kind == "close" and brackets:
+                brackets -= 1
+        yield start_row, pos, end
+        pos = end
+
+
+def _tokenize(text: str) -> List[tokenize.TokenInfo]:
+    """Tokens of a logical line"""
+    return [
+        tok
+        for tok in tokenize.generate_tokens(io.StringIO(text).readline)
+        if tok.type not in _IGNORED_TOKENS
+    ]
+
+
+_IGNORED_TOKENS = {
+    tokenize.NEWLINE,
+    tokenize.NL,
+    tokenize.COMMENT,
+    tokenize.INDENT,
+    tokenize.DEDENT,
+    tokenize.ENDMARKER,
+}
+
+
+def _split(
+    tokens: List[tokenize.TokenInfo], sep: str
+) -> List[List[tokenize.TokenInfo]]:
+    """Split tokens by sep outside brackets"""
+    parts: List[List[tokenize.TokenInfo]] = [[]]
+    level = 0
+    for tok in tokens:
+        if tok.string in _OPEN:
+            level += 1
+        elif tok.string in _CLOSE:
+            level -= 1
+        elif tok.string == sep and level == 0 and tok.type == tokenize.OP:
+            parts.append([])
+            continue
+        parts[-1].append(tok)
+    return [part for part in parts if part]
+
+
+def _header_end(tokens: List[tokenize.TokenInfo]) -> Optional[int]:
+    """Index of the colon that ends the header of a compound statement"""
+    level = 0
+    lambdas = 0  # colons of lambdas come before the end of the header
+    for i, tok in enumerate(tokens):
+        if tok.string in _OPEN:
+            level += 1
+        elif tok.string in _CLOSE:
+            level -= 1
+        elif level == 0 and tok.string == "lambda":
+            lambdas += 1
+        elif level == 0 and tok.string == ":":
+            if not lambdas:
+                return i
+            lambdas -= 1
+    return None
+
+
+class _Scanner:
+    def __init__(self, source: str, config: "Config") -> None:
+        self.source = source
+        self.config = config
+        # indentation of headers of the blocks that are not checked
+        self.blocks: List[int] = []
+        # indentation -> whether the else part of the if statement with this
+        # indentation is checked, only kept if it's different from the block
+        # the if statement is in
+        self.orelse: Dict[int, bool] = {}
+        self.result: List[ImportStmt] = []
+
+    def scan(self) -> List[ImportStmt]:
+        source = self.source
+        blocks = self.blocks
+        orelse = self.orelse
+        for row, start, end in _logical_lines(source):
+            head = _HEAD.match(source, start, end)
+            assert head
+            keyword = head.group(1)
+            branch = keyword in ("if", "elif", "else")
+            has_import = _IMPORT.search(source, start, end)
+            if not (has_import or branch or blocks or orelse):
+                continue
+            if not keyword and source[head.end() : head.end() + 1] in ("\n", "#", ""):
+                continue  # blank lines and comments
+
+            width = len(source[start : head.start(1)].expandtabs(8))
+            while blocks and blocks[-1] >= width:
+                blocks.pop()
+            if orelse:
+                for stale in [
+                    w for w in orelse if w > width or (w == width and not branch)
+                ]:
+                    del orelse[stale]
+            active = not blocks
+
+            body_active = active
+            if branch:
+                body_active = self.enter_branch(width, keyword, head.start(1), end)
+                if active and not body_active:
+                    blocks.append(width)
+            if has_import and body_active:
+                tokens = _tokenize(source[head.start(1) : end])
+                if keyword in _COMPOUND:
+                    # statements after the colon on the same line
+                    colon = _header_end(tokens)
+                    tokens = tokens[colon + 1 :] if colon is not None else []
+                for stmt in _split(tokens, ";"):
+                    self.scan_simple(stmt, row + stmt[0].start[0] - 1)
+        return self.result
+
+    def enter_branch(self, width: int, keyword: str, start: int, end: int) -> bool:
+        """Whether the block of an if, elif or else clause is checked"""
+        active = not self.blocks
+        if keyword == "else":
+            return self.orelse.pop(width, active)
+        parent = self.orelse.pop(width, active)
+        if keyword == "if":
+            parent = active
+
+        reach = Reach.UNKNOWN
+        source = self.source
+        if parent and (
+            _STATIC_NAME.search(source, start, end) or _CONST_TEST.match(source, start)
+        ):
+            tokens = _tokenize(source[start:end])
+            colon = _header_end(tokens)
+            if colon is not None:
+                reach = self.eval_test(tokens[1:colon])
+
+        unknown = reach == Reach.UNKNOWN
+        rest = parent and (unknown or not is_true(reach, False))
+        if rest != active:
+            self.orelse[width] = rest
+        return parent and (unknown or is_true(reach, False))
+
+    def eval_test(self, tokens: List[tokenize.TokenInfo]) -> Reach:
+        if not tokens:
+            return Reach.UNKNOWN
+        text = " ".join(tok.string for tok in tokens)
+        try:
+            test = ast.parse(f"({text})", mode="eval").body
+        except SyntaxError:
+            return Reach.UNKNOWN
+        return static_infer(test, self.config)
+
+    def scan_simple(self, tokens: List[tokenize.TokenInfo], lineno: int):
+        keyword = tokens[0].string
+        if keyword == "import":
+            for alias in _split(tokens[1:], ","):
+                module = self.dotted_name(alias)
+                if module:
+                    self.result.append(ImportStmt(0, module, [], lineno))
+
+        elif keyword == "from":
+            level = 0
+            i = 1
+            while i < len(tokens) and tokens[i].string in (".", "..."):
+                level += len(tokens[i].string)
+                i += 1
+            j = i
+            while j < len(tokens) and tokens[j].string != "import":
+                j += 1
+            module = "".join(tok.string for tok in tokens[i:j])
+            aliases = tokens[j + 1 :]
+            if aliases and aliases[0].string == "(":
+                aliases = aliases[1:-1]
+            names = [alias[0].string for alias in _split(aliases, ",")]
+            if (level or module) and names:
+                self.result.append(ImportStmt(level, module, names, lineno))
+
+    def dotted_name(self, tokens: List[tokenize.TokenInfo]) -> str:
+        names = []
+        for tok in tokens:
+            if tok.string == "as":
+                break
+            names.append(tok.string)
+        return "".join(names)
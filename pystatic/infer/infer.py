@@ -2,7 +2,7 @@ import logging
 from typing import Deque
 from contextlib import contextmanager
 from pystatic.predefined import *
-from pystatic.target import FunctionTarget, Target, BlockTarget
+from pystatic.target import FunctionTarget, Target, BlockTarget, Stage
 from pystatic.error.errorbox import ErrorBox
 from pystatic.arg import Argument
 from pystatic.error.errorcode import *
@@ -56,6 +56,8 @@ class InferVisitor(BaseVisitor):
         self.errbox.add_err(CodeUnreachable(begin))
 
     def infer(self):
+        if isinstance(self.root, ast.Module):
+            self.preprocess_funcs(self.root.body)
         self.visit(self.root)
 
     def get_type(self, node: Optional[ast.AST]) -> TypeIns:
@@ -216,9 +218,36 @@ class InferVisitor(BaseVisitor):
     def preprocess_in_func(self, node: ast.FunctionDef,
                            func_type: TypeFuncIns):
         new_table = func_type.get_inner_symtable()
+        if new_table.preprocessed:  # methods and functions of preprocess_funcs
+            return
         func_target = FunctionTarget(self.symid, new_table, node, self.errbox)
         self.manager.preprocess_block(func_target)
 
+    def preprocess_funcs(self, stmt_list: List[ast.stmt]):
+        """Preprocess bodies of functions defined in stmt_list in one wave
+
+        Functions after a return, break or continue are never visited and a
+        name defined twice has one symtable, they are left to
+        preprocess_in_func.
+        """
+        func_nodes: Dict[str, Optional[ast.FunctionDef]] = {}
+        for stmt in stmt_list:
+            if isinstance(stmt, (ast.Return, ast.Break, ast.Continue)):
+                break
+            elif isinstance(stmt, ast.FunctionDef):
+                func_nodes[stmt.name] = None if stmt.name in func_nodes else stmt
+
+        func_targets: List[BlockTarget] = []
+        for name, node in func_nodes.items():
+            func_type = self.recorder.get_comment_type(name)
+            if node and isinstance(func_type, TypeFuncIns):
+                new_table = func_type.get_inner_symtable()
+                if not new_table.preprocessed:
+                    func_targets.append(
+                        FunctionTarget(self.symid, new_table, node, self.errbox))
+        if func_targets:
+            self.manager.preprocess_blocks(func_targets)
+
     def infer_argument(self, argument: Argument):
         """Store arguments' type to a dict"""
         args = {}
@@ -348,7 +377,7 @@ class InferVisitor(BaseVisitor):
         if name == "Dict":
             return [container.bindlist[0]]
         else:
-            return container.bindlist
+            return list(container.bindlist)
 
     def check_iterable(self, node: ast.AST, container: TypeIns) -> bool:
         # TODO: change to __iter__
@@ -372,13 +401,15 @@ class InferStarter:
             symid = target.symid
             logger.info(f"Type infer in module '{symid}'")
             assert isinstance(target, Target)
-            infer_visitor = InferVisitor(
-                target.ast,
-                target.module_ins,
-                target.errbox,
-                symid,
-                self.config,
-                self.manager,
-            )
-            infer_visitor.infer()
+            with self.manager.stats.timer(Stage.Infer.name, symid):
+                infer_visitor = InferVisitor(
+                    target.ast,
+                    target.module_ins,
+                    target.errbox,
+                    symid,
+                    self.config,
+                    self.manager,
+                )
+                infer_visitor.infer()
+            self.manager.update_stage(target, Stage.FINISH)
         self.q_infer.clear()
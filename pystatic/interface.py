@@ -0,0 +1,241 @@
+import os
+import io
+import ast
+import pickle
+import weakref
+import hashlib
+from typing import Dict, Any, List, Optional, Tuple, TYPE_CHECKING
+from pystatic.cache import (
+    CACHE_VERSION,
+    code_fingerprint,
+    content_hash,
+    read_source,
+    dump_pickle,
+    load_pickle,
+)
+from pystatic.symtable import SymTable
+from pystatic.typesys import TypeIns, TypeTemp, TypeClassTemp, hierarchy_changed
+
+if TYPE_CHECKING:
+    from pystatic.manager import Manager
+    from pystatic.target import Target
+    from pystatic.fsys import FilePath
+
+INTERFACE_CACHE_DIR = "interface"
+
+# (path, mtime_ns, size, content hash)
+Fingerprint = Tuple[str, int, int, str]
+
+_predefined_cache: Optional[Tuple[Dict[str, Any], Dict[int, str]]] = None
+# manager the predefined objects(builtins, typing...) are filled for, they are
+# shared by the whole process so only one manager may use them at a time
+_predefined_owner: Optional["weakref.ref[Manager]"] = None
+
+
+def claim_predefined(manager: "Manager"):
+    """Record that the predefined objects are filled for manager"""
+    global _predefined_owner
+    _predefined_owner = weakref.ref(manager)
+
+
+def release_predefined(manager: "Manager"):
+    """Manager doesn't use the predefined objects any more"""
+    global _predefined_owner
+    if _predefined_owner is not None and _predefined_owner() is manager:
+        _predefined_owner = None
+
+
+def predefined_in_use(manager: "Manager") -> bool:
+    """Whether the predefined objects belong to another manager that is not
+    released(predefined objects refer to their manager, so the owner is
+    usually alive until release_predefined is called)
+    """
+    if _predefined_owner is None:
+        return False
+    owner = _predefined_owner()
+    return owner is not None and owner is not manager
+
+
+def _predefined_objects() -> Tuple[Dict[str, Any], Dict[int, str]]:
+    """Objects created when pystatic is imported.
+
+    They are shared by all managers so they are never pickled by value,
+    only their states are saved.
+
+    Return (key -> object, id(object) -> key).
+    """
+    global _predefined_cache
+    if _predefined_cache:
+        return _predefined_cache
+
+    import pystatic.typesys as typesys
+    import pystatic.predefined as predefined
+
+    key_obj: Dict[str, Any] = {}
+    id_key: Dict[int, str] = {}
+
+    def add(key: str, obj: Any):
+        if id(obj) not in id_key:
+            id_key[id(obj)] = key
+            key_obj[key] = obj
+
+    for module in (typesys, predefined):
+        for name, obj in vars(module).items():
+            if name == "_" or not isinstance(obj, (TypeTemp, TypeIns, SymTable)):
+                continue
+            key = f"{module.__name__}:{name}"
+            add(key, obj)
+            if isinstance(obj, TypeTemp):
+                add(key + "._cached_ins", obj._cached_ins)
+                add(key + "._cached_typetype", obj._cached_typetype)
+                if isinstance(obj, TypeClassTemp):
+                    add(key + "._inner_symtable", obj._inner_symtable)
+
+    _predefined_cache = (key_obj, id_key)
+    return _predefined_cache
+
+
+def file_fingerprint(path: "FilePath") -> Fingerprint:
+    st = os.stat(path)
+    return (path, st.st_mtime_ns, st.st_size, content_hash(read_source(path)))
+
+
+def fingerprint_valid(fingerprint: Fingerprint) -> bool:
+    path, mtime, size, digest = fingerprint
+    try:
+        st = os.stat(path)
+        if st.st_mtime_ns == mtime and st.st_size == size:
+            return True
+        return content_hash(read_source(path)) == digest
+    except OSError:
+        return False
+
+
+class _InterfacePickler(pickle.Pickler):
+    def __init__(self, file, manager: "Manager") -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.manager = manager
+        _, self.id_key = _predefined_objects()
+
+    def persistent_id(self, obj):
+        if obj is self.manager:
+            return ("manager",)
+        elif isinstance(obj, ast.AST):
+            # asts are not part of the interface
+            return ("ast",)
+        elif (key := self.id_key.get(id(obj))) :
+            return ("predefined", key)
+        return None
+
+
+class _InterfaceUnpickler(pickle.Unpickler):
+    def __init__(self, file, manager: "Manager") -> None:
+        super().__init__(file)
+        self.manager = manager
+        self.key_obj, _ = _predefined_objects()
+
+    def persistent_load(self, pid):
+        kind = pid[0]
+        if kind == "manager":
+            return self.manager
+        elif kind == "ast":
+            return None
+        elif kind == "predefined":
+            return self.key_obj[pid[1]]
+        raise pickle.UnpicklingError(f"unknown persistent id {pid}")
+
+
+class InterfaceCache:
+    """Persistent cache of preprocessed module interfaces.
+
+    The unit of the cache is the group of typeshed modules the manager loads
+    when it starts(builtins, typing, typing_extensions and everything they
+    import). These modules reference each other circularly and fill in the
+    shared objects defined in pystatic.predefined, so they are saved and
+    restored together: the targets with their symtables, and the states of the
+    predefined objects.
+
+    The fingerprints of all source files in the group, the python version and
+    typeshed path in the config and pystatic's own source decide whether the
+    cache is valid.
+    """
+
+    def __init__(self, cache_dir: "FilePath", key: str) -> None:
+        self.cache_dir = os.path.join(cache_dir, INTERFACE_CACHE_DIR)
+        self.key = key
+
+    @property
+    def entry_path(self) -> "FilePath":
+        name = hashlib.sha1(self.key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, name + ".pickle")
+
+    def save(self, manager: "Manager", targets: List["Target"]) -> bool:
+        key_obj, _ = _predefined_objects()
+        states = {
+            key: obj.__getstate__()
+            for key, obj in key_obj.items()
+            if isinstance(obj, (TypeTemp, SymTable))
+        }
+        symids = {target.symid for target in targets}
+        edges = {
+            symid: sorted(manager.module_graph.get_imports(symid) & symids)
+            for symid in symids
+        }
+        try:
+            buf = io.BytesIO()
+            _InterfacePickler(buf, manager).dump((targets, states, edges))
+            payload = buf.getvalue()
+        except (pickle.PicklingError, TypeError, AttributeError, RecursionError):
+            return False
+
+        entry = {
+            "version": CACHE_VERSION,
+            "key": self.key,
+            "code": code_fingerprint(),
+            "fingerprints": [
+                file_fingerprint(target.analyse_path) for target in targets
+            ],
+            "payload": payload,
+        }
+        return dump_pickle(self.entry_path, entry)
+
+    def load(self, manager: "Manager") -> Optional[List["Target"]]:
+        """Load cached targets, states of predefined objects are restored and
+        import edges are added to the manager's module graph.
+
+        The predefined objects are shared by the whole process, so nothing is
+        loaded while they belong to another manager that is not closed(see
+        claim_predefined), its types would be replaced underneath it.
+
+        Return None if the cache is missing, stale or can't be loaded.
+        """
+        if predefined_in_use(manager):
+            return None
+        entry = load_pickle(self.entry_path)
+        if (
+            not isinstance(entry, dict)
+            or entry.get("version") != CACHE_VERSION
+            or entry.get("key") != self.key
+            or entry.get("code") != code_fingerprint()
+            or not all(fingerprint_valid(fp) for fp in entry["fingerprints"])
+        ):
+            return None
+
+        try:
+            targets, states, edges = _InterfaceUnpickler(
+                io.BytesIO(entry["payload"]), manager
+            ).load()
+        except (pickle.UnpicklingError, KeyError, AttributeError, EOFError):
+            return None
+
+        key_obj, _ = _predefined_objects()
+        for key, state in states.items():
+            obj = key_obj[key]
+            obj.__dict__.clear()
+            obj.__setstate__(state)
+        hierarchy_changed()
+
+        for importer, imported_list in edges.items():
+            for imported in imported_list:
+                manager.module_graph.add_edge(importer, imported)
+        return targets
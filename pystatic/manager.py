@@ -1,17 +1,25 @@
 import os
 import logging
 from collections import deque
-from typing import Dict, Deque, Set
+from typing import Callable, Dict, Deque, List, Set
 from pystatic.config import Config
+from pystatic.cache import AstCache
+from pystatic.interface import (
+    InterfaceCache,
+    claim_predefined,
+    release_predefined,
+)
 from pystatic.infer.infer_expr import infer_expr
 from pystatic.error.errorcode import *
-from pystatic.error.errorbox import ErrorBox
+from pystatic.error.errorbox import ErrorBox, ErrorFilter
 from pystatic.fsys import Filesys, FilePath, ModuleFindRes
 from pystatic.infer.infer import InferStarter
 from pystatic.result import Result
 from pystatic.preprocess import Preprocessor
 from pystatic.predefined import *
-from pystatic.symid import SymId, relpath2symid
+from pystatic.symid import SymId, relpath2symid, symid2list, list2symid
+from pystatic.modulegraph import ModuleGraph
+from pystatic.stats import Stats
 from pystatic.typesys import TypeIns
 from pystatic.predefined import TypeModuleIns
 from pystatic.target import BlockTarget, Target, Stage, PackageTarget
@@ -21,31 +29,75 @@ logger = logging.getLogger(__name__)
 
 
 class Manager:
+    """Checks modules of a run
+
+    Predefined objects(builtins, typing...) are shared by the whole process,
+    so only one manager should be used at a time, call close when a manager is
+    no longer used.
+    """
+
     def __init__(self, config: Config):
         self.config = config
+        self.stats = Stats(config.stats)
 
         self.fsys = Filesys(config)
+        self.ast_cache = AstCache(config.cache_dir) if config.cache_dir else None
 
         self.pre_proc = Preprocessor(self)
         self.to_check: Set[SymId] = set()  # modules that need to be checked
         self.targets: Dict[SymId, Target] = {}
+        self.module_graph = ModuleGraph()
 
         self.q_preprocess: Deque[BlockTarget] = deque()
         self.q_infer: Deque[BlockTarget] = deque()
 
         self.manager_errbox = ErrorBox(MANAGER_TAG)
+        self.error_filter = ErrorFilter(config.level, config.disable_code)
         self.message_cache: Dict[SymId, List[Message]] = {}
+        # called with every target that reaches Stage.FINISH
+        self.on_finish: Optional[Callable[[BlockTarget], None]] = None
 
         if not config.no_typeshed:
             self.__init_typeshed()
 
     def __init_typeshed(self):
+        # symtables of special modules are shared, lazy imports in them are
+        # loaded by the current manager
+        for symtable in (
+            builtins_symtable,
+            typing_symtable,
+            typing_extensions_symtable,
+        ):
+            symtable.manager = self
+
+        interface_cache = None
+        # lazy definitions refer to asts, which are not cached
+        if self.config.cache_dir and not self.config.lazy_typeshed:
+            cache_key = repr(
+                (
+                    self.config.python_version,
+                    self.config.typeshed,
+                    self.config.cwd,
+                    self.config.manual_path,
+                )
+            )
+            interface_cache = InterfaceCache(self.config.cache_dir, cache_key)
+            if (targets := interface_cache.load(self)) is not None:
+                for target in targets:
+                    self.__add_target(target, False)
+                claim_predefined(self)
+                return
+
         self.__add_check_symid("builtins", builtins_symtable, False, None, True)
         self.__add_check_symid("typing", typing_symtable, False, None, True)
         self.__add_check_symid(
             "typing_extensions", typing_extensions_symtable, False, None, True
         )
         self.preprocess()
+        claim_predefined(self)
+
+        if interface_cache:
+            interface_cache.save(self, list(self.targets.values()))
 
     def get_abspath(self, symid: "SymId") -> Optional[List[str]]:
         """
@@ -162,7 +214,14 @@ class Manager:
     def __parse(self, target: Target):
         assert target.stage == Stage.Parse
         assert os.path.isabs(target.analyse_path)
-        target.ast = path2ast(target.analyse_path)
+        with self.stats.timer(Stage.Parse.name, target.symid):
+            target.ast = self.parse_file(target.analyse_path)
+
+    def parse_file(self, path: FilePath) -> ast.AST:
+        """Parse a file, use the ast cache if it's enabled"""
+        if self.ast_cache:
+            return self.ast_cache.parse(path)
+        return path2ast(path)
 
     def is_module(self, symid: "SymId") -> bool:
         """symid represents a valid module?"""
@@ -194,7 +253,84 @@ class Manager:
         elif stage == Stage.Infer:
             self.q_infer.append(target)
         elif stage == Stage.FINISH:
-            pass
+            if self.on_finish:
+                self.on_finish(target)
+
+    def get_target_symid(self, symid: "SymId") -> "SymId":
+        """Convert the symid of a module symtable to its target's symid
+
+        symtable of a package's __init__ file has a symid ends with '.__init__'.
+        """
+        if symid not in self.targets and symid.endswith(".__init__"):
+            return symid[: -len(".__init__")]
+        return symid
+
+    def record_import(self, importer: "SymId", imported: "SymId"):
+        """Record that module importer imports module imported(and the
+        packages along the way), symids not found are recorded too.
+        """
+        importer = self.get_target_symid(importer)
+        symidlist = symid2list(imported)
+        for i in range(1, len(symidlist) + 1):
+            cur_symid = list2symid(symidlist[:i])
+            if cur_symid in self.targets:
+                self.module_graph.add_edge(importer, cur_symid)
+            else:
+                self.module_graph.add_missing(importer, cur_symid)
+
+    def load_lazy_import(
+        self, symtable: "SymTable", module_symid: "SymId", origin_name: str
+    ) -> "TypeIns":
+        """Load a module imported lazily by a stub file and cache the type of the
+        imported symbol in symtable.
+
+        Lazy imports that definitions of a wave are imported through are loaded
+        in that wave(see Preprocessor.collect_wave). Others found while a wave
+        is resolved are preprocessed by a nested preprocessor.
+        """
+        env = self.pre_proc.env
+        if not self.pre_proc.running:
+            self.add_import_symid(module_symid, origin_name)
+            self.preprocess()
+        elif origin_name and env.get_prepinfo(module_symid):
+            # the module is resolved in the current wave, its symtable is not
+            # filled yet so nothing is cached
+            res = env.lookup(module_symid, origin_name)
+            if res is not None and not isinstance(res, TypeIns):
+                res = res.getins()
+            return res or any_ins
+        else:
+            queue = self.q_preprocess
+            self.q_preprocess = deque()
+            try:
+                self.add_import_symid(module_symid, origin_name)
+                Preprocessor(self, env).process()
+            finally:
+                self.q_preprocess = queue
+
+        origin_symid = f"{module_symid}.{origin_name}"
+
+        res: Optional[TypeIns] = None
+        if not origin_name:
+            res = self.get_module_ins(module_symid)
+        elif (res := self.get_module_ins(origin_symid)) is None:
+            if (module_ins := self.get_module_ins(module_symid)) :
+                res = module_ins._inner_symtable.lookup_local(origin_name)
+        res = res or any_ins
+        symtable.import_cache.add_cache(module_symid, origin_name, res)
+        return res
+
+    def add_import_symid(self, module_symid: "SymId", origin_name: str):
+        """Add the module(and the packages along the way) imported by
+        'from module_symid import origin_name', origin_name is empty for
+        'import module_symid'.
+        """
+        symidlist = symid2list(module_symid)
+        for i in range(1, len(symidlist) + 1):
+            self.add_check_symid(list2symid(symidlist[:i]), False)
+        origin_symid = f"{module_symid}.{origin_name}"
+        if origin_name and self.is_module(origin_symid):
+            self.add_check_symid(origin_symid, False)
 
     def get_module_ins(self, symid: "SymId") -> Optional[TypeModuleIns]:
         if symid in self.targets:
@@ -215,6 +351,8 @@ class Manager:
             self.fsys.add_userpath(rt_path)
             symid = relpath2symid(rt_path, path)
             if recheck and symid in self.targets:
+                if to_check:
+                    self.to_check.add(symid)
                 return self.recheck(symid)
             return self.__add_check_symid(symid, None, to_check, path, False)
 
@@ -235,14 +373,14 @@ class Manager:
 
     def take_messages_by_symid(self, symid: "SymId") -> Sequence[Message]:
         """Get messages according to the symid"""
-        self.manager_errbox.release(self)
+        self.manager_errbox.release(self, self.error_filter)
         target = self.targets.get(symid)
         if target:
-            target.errbox.release(self)
+            target.errbox.release(self, self.error_filter)
         elif symid.endswith(".__init__"):
             package_id = symid[: -len(".__init__")]
             if (target := self.targets.get(package_id)) :
-                target.errbox.release(self)
+                target.errbox.release(self, self.error_filter)
         else:
             return []
         if (res := self.message_cache.get(symid, None)) :
@@ -260,24 +398,41 @@ class Manager:
         return []
 
     def take_all_messages(self) -> Dict[SymId, List[Message]]:
-        self.manager_errbox.release(self)
+        self.manager_errbox.release(self, self.error_filter)
         for target in self.targets.values():
-            target.errbox.release(self)
+            target.errbox.release(self, self.error_filter)
         tmp_messages = self.message_cache
         self.message_cache = {}
         return tmp_messages
 
     def preprocess(self):
-        self.pre_proc.process()
-        pass
+        with self.stats.activate():
+            self.pre_proc.process()
 
     def preprocess_block(self, blk_target: BlockTarget):
-        self.update_stage(blk_target, Stage.Preprocess, True)
-        self.pre_proc.process()
-        pass
+        self.preprocess_blocks([blk_target])
+
+    def preprocess_blocks(self, blk_targets: List[BlockTarget]):
+        """Preprocess several blocks in the same wave"""
+        for blk_target in blk_targets:
+            self.update_stage(blk_target, Stage.Preprocess, True)
+        self.preprocess()
 
     def infer(self):
-        InferStarter(self.q_infer, self.config, self).start_infer()
+        with self.stats.activate():
+            InferStarter(self.q_infer, self.config, self).start_infer()
+
+    def get_stats(self) -> Stats:
+        """Statistics of the run, Config.stats must be set to collect them"""
+        self.stats.find_module_calls = self.fsys.find_count
+        self.stats.dir_scans = self.fsys.syscall_count
+        return self.stats
+
+    def close(self):
+        """Release the predefined objects so that later managers may load the
+        interface cache
+        """
+        release_predefined(self)
 
     def infer_expr(self, module_symid: SymId, expr: str) -> Optional["TypeIns"]:
         """Evaluate an expression of a in the environment of a module"""
@@ -295,22 +450,60 @@ class Manager:
             return None
 
     def recheck(self, module_symid: SymId, from_begin: bool = True) -> Result[bool]:
-        """Recheck a module, this will flush old message of that module automatically"""
-        module_target = self.targets.get(module_symid)
-        assert isinstance(module_target, Target)
-        if from_begin:
-            try:
-                new_ast = path2ast(module_target.path)
-                module_target.ast = new_ast
-                module_target.clear()
-                self.update_stage(module_target, Stage.Preprocess, False)
-                return Result(True)
-            except SyntaxError:
-                return Result(False)
-        else:
-            self.update_stage(module_target, Stage.Preprocess, False)
+        """Recheck a module, this will flush old message of that module automatically
+
+        Modules that import module_symid(directly or not) are checked again too
+        if from_begin is True, see recheck_modules.
+        """
+        return self.recheck_modules([module_symid], from_begin)
+
+    def recheck_modules(
+        self, symids: List[SymId], from_begin: bool = True
+    ) -> Result[bool]:
+        """Recheck modules and all modules affected by them
+
+        @param from_begin: if True, the files of the modules and the modules
+        that import them(directly or not) are parsed again and their old states
+        and messages are dropped. Otherwise only the given modules are put back
+        to the preprocess queue as they are, modules that import them are not
+        followed and keep their messages.
+        """
+        for symid in symids:
+            assert isinstance(self.targets.get(symid), Target)
+        if not from_begin:
+            for symid in symids:
+                self.__requeue(self.targets[symid])
             return Result(True)
 
+        # files may have been added or removed since the last check
+        self.fsys.clear_cache()
+        affected = self.module_graph.affected(symids)
+        # keep the order in which targets were added
+        to_recheck = [
+            target for symid, target in self.targets.items() if symid in affected
+        ]
+
+        new_asts = {}
+        try:
+            for target in to_recheck:
+                new_asts[target.symid] = self.parse_file(target.analyse_path)
+        except SyntaxError:
+            return Result(False)
+
+        for target in to_recheck:
+            target.ast = new_asts[target.symid]
+            target.clear()
+            self.module_graph.remove_imports(target.symid)
+            self.message_cache.pop(target.symid, None)
+            self.message_cache.pop(target.symtable.symid, None)
+            self.__requeue(target)
+        return Result(True)
+
+    def __requeue(self, target: Target):
+        """Put target back to the preprocess queue"""
+        if target not in self.q_preprocess:
+            self.update_stage(target, Stage.Preprocess, True)
+
 
 def path2ast(path: FilePath) -> ast.AST:
     with open(path, "r") as f:
@@ -0,0 +1,60 @@
+from collections import deque
+from typing import Dict, Set, Iterable, Deque
+from pystatic.symid import SymId
+
+
+class ModuleGraph:
+    """Import relationship between modules(targets) known by the manager.
+
+    Edges are recorded while imports are resolved in the preprocess stage,
+    they are used to find out which modules should be checked again after
+    some modules changed.
+    """
+
+    def __init__(self) -> None:
+        # module -> modules it imports
+        self.imports: Dict[SymId, Set[SymId]] = {}
+        # module -> modules that import it
+        self.imported_by: Dict[SymId, Set[SymId]] = {}
+        # module -> symids it imports that were not found
+        self.missing: Dict[SymId, Set[SymId]] = {}
+
+    def add_edge(self, importer: SymId, imported: SymId):
+        if importer == imported:
+            return
+        self.imports.setdefault(importer, set()).add(imported)
+        self.imported_by.setdefault(imported, set()).add(importer)
+
+    def add_missing(self, importer: SymId, imported: SymId):
+        self.missing.setdefault(importer, set()).add(imported)
+
+    def get_missing(self, symid: SymId) -> Set[SymId]:
+        return self.missing.get(symid, set())
+
+    def get_imports(self, symid: SymId) -> Set[SymId]:
+        return self.imports.get(symid, set())
+
+    def get_imported_by(self, symid: SymId) -> Set[SymId]:
+        return self.imported_by.get(symid, set())
+
+    def remove_imports(self, symid: SymId):
+        """Forget the imports of a module, they will be recorded again when
+        the module is preprocessed.
+        """
+        self.missing.pop(symid, None)
+        for imported in self.imports.pop(symid, set()):
+            importers = self.imported_by.get(imported)
+            if importers:
+                importers.discard(symid)
+
+    def affected(self, symids: Iterable[SymId]) -> Set[SymId]:
+        """Modules that (transitively) import any of symids, symids included"""
+        result: Set[SymId] = set(symids)
+        queue: Deque[SymId] = deque(result)
+        while queue:
+            cur = queue.popleft()
+            for importer in self.imported_by.get(cur, ()):
+                if importer not in result:
+                    result.add(importer)
+                    queue.append(importer)
+        return result
@@ -110,6 +110,8 @@ class TypeVarTemp(TypeClassTemp):
 
 
 class TypeVarIns(TypeIns):
+    __slots__ = ["tpvar_name", "bound", "kind", "constraints"]
+
     def __init__(
         self,
         tpvar_name: str,
@@ -124,6 +126,10 @@ class TypeVarIns(TypeIns):
         self.kind = kind
         self.constraints: List["TypeIns"] = list(*args)
 
+    def is_interned(self) -> bool:
+        # every TypeVar is one instance
+        return True
+
 
 class TypeNoneTemp(TypeTemp):
     def __init__(self):
@@ -228,6 +234,8 @@ class TypeLiteralTemp(TypeTemp):
 
 
 class TypeLiteralIns(TypeIns):
+    __slots__ = []
+
     def __init__(self, value):
         super().__init__(literal_temp, [value])
 
@@ -236,6 +244,11 @@ class TypeLiteralIns(TypeIns):
         assert self.bindlist
         return self.bindlist[0]
 
+    def cache_key(self) -> Any:
+        # literals are not interned, equal literals have the same key
+        value = self.value
+        return (literal_temp, value.__class__, value)
+
     def get_value_type(self) -> TypeIns:
         value = self.value
         if isinstance(value, bool):
@@ -319,9 +332,8 @@ class TypeCallableTemp(TypeTemp):
     def getitem_typetype(
         self, bindlist: BindList, itemarg: "GetItemArgs", node: Optional[ast.AST] = None
     ) -> Result["TypeType"]:
-        res_bindlist = []
-        res = TypeType(self, [ellipsis_ins, any_ins])
-        result = Result(res)
+        res_bindlist: List[Any] = []
+        result = Result(TypeType(self, [ellipsis_ins, any_ins]))
 
         if not self._getitem_typetype_check_bindlist(bindlist, result, node):
             result.value = TypeType(self, bindlist)
@@ -346,9 +358,9 @@ class TypeCallableTemp(TypeTemp):
                 arglist = []
                 for argitem in arg_part.value:
                     self._getitem_typetype_accept_item(argitem, result, arglist)
-                res_bindlist.append(arglist)
+                res_bindlist.append(tuple(arglist))
             self._getitem_typetype_accept_item(ret_part, result, res_bindlist)
-            res.bindlist = res_bindlist
+            result.value = TypeType(self, res_bindlist)
             return result
 
 
@@ -363,9 +375,8 @@ class TypeGenericTemp(TypeTemp):
     def getitem_typetype(
         self, bindlist: BindList, itemarg: "GetItemArgs", node: Optional[ast.AST]
     ) -> Result["TypeType"]:
-        res_bindlist = []
-        res = TypeType(self, res_bindlist)
-        result = Result(res)
+        res_bindlist: List[Any] = []
+        result = Result(self._cached_typetype)
 
         if not self._getitem_typetype_check_bindlist(bindlist, result, node):
             result.value = TypeType(self, bindlist)
@@ -379,6 +390,7 @@ class TypeGenericTemp(TypeTemp):
                 result.add_err(IndiceGeneralError("Expect a TypeVar", node))
             else:
                 res_bindlist.append(value)
+        result.value = self.get_interned(TypeType, res_bindlist)
         return result
 
 
@@ -417,7 +429,7 @@ class TypeTypeAnnTemp(TypeTemp):
         if isinstance(bindlist[0], TypeType):
             return Result(bindlist[0])
         else:
-            return Result(TypeType(bindlist[0].temp, []))
+            return Result(bindlist[0].temp.get_interned(TypeType, []))
 
 
 class TypeListTemp(TypeClassTemp):
@@ -498,6 +510,8 @@ class TypeEllipsisTemp(TypeClassTemp):
 
 
 class TypeModuleIns(TypeIns):
+    __slots__ = ["_inner_symtable", "consultant"]
+
     def __init__(self, symtable: "SymTable", consultant=None) -> None:
         super().__init__(module_temp, [])
         self._inner_symtable = symtable
@@ -530,6 +544,8 @@ class TypeModuleIns(TypeIns):
 
 
 class TypePackageIns(TypeModuleIns):
+    __slots__ = ["paths", "submodule"]
+
     def __init__(self, symtable: "SymTable", paths: List[str], consultant=None) -> None:
         super().__init__(symtable, consultant)
         self.paths = paths
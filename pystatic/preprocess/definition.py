@@ -29,6 +29,8 @@ def get_definition(target: "BlockTarget", env: "PrepEnvironment"):
     )
 
     TypeDefVisitor(env, prepinfo, cur_mbox).accept(cur_ast)
+    if isinstance(target, Target):
+        prepinfo.load_used_imports(cur_ast)
 
 
 def get_definition_in_function(target: "FunctionTarget", env: "PrepEnvironment"):
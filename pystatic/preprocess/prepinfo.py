@@ -1,12 +1,20 @@
 from pystatic.reach import Reach
-from typing import Dict, Set, Final
+from typing import Dict, Set, Final, Callable
 from pystatic.error.errorcode import *
 from pystatic.target import Target
 from pystatic.symid import SymId, symid2list
-from pystatic.typesys import TypeAlias, TypeClassTemp, TypeIns, TypeType, any_ins, TypeTemp
+from pystatic.typesys import (
+    TypeAlias,
+    TypeClassTemp,
+    TypeIns,
+    TypeType,
+    any_ins,
+    TypeTemp,
+)
 from pystatic.predefined import TypeVarIns, TypeFuncIns
 from pystatic.symtable import (
     ImportEntry,
+    LazyEntry,
     SymTable,
     ImportNode,
     Entry,
@@ -31,6 +39,22 @@ PREP_NULL = 0
 PREP_COMPLETE = 1
 
 
+def first_name(node: Optional[ast.AST]) -> Optional[str]:
+    """Name an expression like A.B or A[B] starts with(A), used to build the
+    dependency graph while definitions are collected.
+    """
+    while isinstance(node, (ast.Attribute, ast.Subscript)):
+        node = node.value
+    if isinstance(node, ast.Name):
+        return node.id
+    return None
+
+
+def add_dep_name(dep_names: List[str], node: Optional[ast.AST]):
+    if (name := first_name(node)) :
+        dep_names.append(name)
+
+
 class PrepInfo:
     def __init__(
         self,
@@ -101,7 +125,7 @@ class PrepInfo:
         name = node.name
         if name in self.func:
             # name collision of different function is checked later
-            self.func[name].defnodes.append(node)
+            self.func[name].add_defnode(node)
         else:
             if (old_def := self.cls.get(name)) :
                 errbox.add_err(VarTypeCollide(old_def.defnode, name, node))
@@ -112,6 +136,8 @@ class PrepInfo:
                 self.local.pop(name)
 
             self.func[name] = prep_func(self, node)
+            # signatures of functions in stub files are resolved when used
+            self.func[name].lazy = self.env.is_lazy(self)
 
     def add_local_def(self, node: AssignNode, is_method: bool, errbox: "ErrorBox"):
         def is_strong_def(node: AssignNode):
@@ -188,30 +214,51 @@ class PrepInfo:
         self, node: Union[ast.Import, ast.ImportFrom], infolist: List["prep_impt"]
     ):
         """Add import information to the symtable"""
-        manager = self.env.manager
+        lazy = self.symtable.scope == TableScope.GLOB and self.env.is_lazy(self)
         for infoitem in infolist:
-            # analyse all the package along the way
-            symidlist = symid2list(infoitem.symid)
-            cur_prefix = ""
-            for subid in symidlist:
-                if cur_prefix:
-                    cur_prefix += f".{subid}"
-                else:
-                    cur_prefix = subid
-                manager.add_check_symid(cur_prefix, False)
-
             if infoitem.origin_name == "*":
                 if infoitem.symid not in self.star_import:
                     self.star_import.append(infoitem.symid)
-
-            if not infoitem.is_import_module():
-                origin_symid = infoitem.symid + f".{infoitem.origin_name}"
-                if manager.is_module(origin_symid):
-                    manager.add_check_symid(origin_symid, False)
+                self.load_import(infoitem)
+            elif lazy:
+                infoitem.lazy = True
+            else:
+                self.load_import(infoitem)
 
             # TODO: error check name collision here
             self.impt[infoitem.asname] = infoitem
 
+    def load_import(self, infoitem: "prep_impt"):
+        """Add modules imported by infoitem to the manager"""
+        infoitem.lazy = False
+        self.env.manager.add_import_symid(infoitem.symid, infoitem.origin_name)
+
+    def load_used_imports(self, node: ast.AST):
+        """Load lazy imports that are used by node or re-exported
+
+        Names in conditions of if statements are not counted because the
+        conditions(sys.version_info, sys.platform...) are evaluated statically.
+        Other lazy imports are loaded when they are looked up in the symtable.
+        """
+        if not any(infoitem.lazy for infoitem in self.impt.values()):
+            return
+        used: Set[str] = set()
+        stack = [node]
+        while stack:
+            cur = stack.pop()
+            if isinstance(cur, ast.Name):
+                used.add(cur.id)
+            elif isinstance(cur, ast.If):
+                stack.extend(cur.body)
+                stack.extend(cur.orelse)
+                continue
+            stack.extend(ast.iter_child_nodes(cur))
+        for infoitem in self.impt.values():
+            if infoitem.lazy and (
+                infoitem.asname.split(".")[0] in used or infoitem.is_reexport()
+            ):
+                self.load_import(infoitem)
+
     def add_typevar_def(self, name: str, typevar: "TypeVarIns", defnode: AssignNode):
         assert name in self.local
         self.typevar.add(name)
@@ -270,6 +317,13 @@ class PrepInfo:
         if (res := self.cls.get(name)) :
             return Result(res.clstemp.get_default_typetype())
         elif (res := self.impt.get(name)) :
+            if res.lazy:
+                # looked up by another module, e.g. as an attribute of this one
+                manager = self.env.manager
+                res.value = manager.load_lazy_import(
+                    self.symtable, res.symid, res.origin_name
+                )
+                res.lazy = False
             return Result(res.getins())
         elif (res := self.local.get(name)) :
             return Result(res.getins())
@@ -304,16 +358,23 @@ class PrepInfo:
             value = local.getins()
             self.symtable.add_entry(name, Entry(value, local.defnode))
         for name, func in self.func.items():
-            value = func.getins()
-            self.symtable.add_entry(name, Entry(value, func.defnode))
+            if func.lazy_resolver:
+                self.symtable.add_entry(name, LazyEntry(func.getins, func.defnode))
+            else:
+                value = func.getins()
+                self.symtable.add_entry(name, Entry(value, func.defnode))
         for name, impt in self.impt.items():
-            value = impt.getins()
-            self.symtable.import_cache.add_cache(impt.symid, impt.origin_name, value)
+            if not impt.lazy:
+                value = impt.getins()
+                self.symtable.import_cache.add_cache(
+                    impt.symid, impt.origin_name, value
+                )
             self.symtable.add_entry(
                 name, ImportEntry(impt.symid, impt.origin_name, impt.defnode)
             )
 
-        self.symtable.star_import.extend(self.star_import)
+        for module_symid in self.star_import:
+            self.symtable.add_star_import(module_symid)
 
 
 class PrepFunctionInfo(PrepInfo):
@@ -354,19 +415,31 @@ class PrepMethodInfo(PrepFunctionInfo):
 
     def dump(self):
         super().dump()
+        if self.var_attr.keys() - self.clstemp.var_attr.keys():
+            self.clstemp.attributes_changed()
         for name, var_attr in self.var_attr.items():
             self.clstemp.var_attr[name] = var_attr.getins()
 
 
 class PrepEnvironment:
-    def __init__(self, manager: "Manager") -> None:
+    def __init__(
+        self, manager: "Manager", outer: Optional["PrepEnvironment"] = None
+    ) -> None:
+        """
+        @param outer: environment of the wave this environment is nested in,
+        modules of that wave are looked up there.
+        """
         self.manager = manager
+        self.outer = outer
         self.symid_prepinfo: Dict[str, "PrepInfo"] = {}
         self.target_prepinfo: Dict["BlockTarget", "PrepInfo"] = {}
 
-    def get_prepinfo(self, symid: "SymId"):
+    def get_prepinfo(self, symid: "SymId") -> Optional["PrepInfo"]:
         if (prepinfo := self.symid_prepinfo.get(symid)) :
             return prepinfo
+        elif self.outer:
+            return self.outer.get_prepinfo(symid)
+        return None
 
     def add_target_prepinfo(self, target: "BlockTarget", prepinfo: "PrepInfo"):
         assert target not in self.target_prepinfo
@@ -391,6 +464,19 @@ class PrepEnvironment:
     def get_target_prepinfo(self, target: "BlockTarget"):
         return self.target_prepinfo.get(target)
 
+    def is_lazy(self, prepinfo: "PrepInfo") -> bool:
+        """Whether definitions in prepinfo are resolved lazily
+
+        In lazy_typeshed mode, module level imports and signatures of
+        functions(methods) defined in stub files are resolved when they are used.
+        """
+        manager = self.manager
+        if not manager.config.lazy_typeshed or isinstance(prepinfo, PrepFunctionInfo):
+            return False
+        symid = manager.get_target_symid(prepinfo.symtable.glob_symid)
+        target = manager.get_target(symid)
+        return bool(target and target.analyse_path.endswith(".pyi"))
+
     def lookup(self, module_symid: "SymId", name: str, allow_impt=False):
         """
         Look up a name
@@ -402,25 +488,62 @@ class PrepEnvironment:
         @param allow_impt: whether prep_impt of the symbol(not the definition part)
         is allowed to return
         """
-        prepinfo = self.symid_prepinfo.get(module_symid)
+        prepinfo = self.get_prepinfo(module_symid)
         if prepinfo:
             res = prepinfo.get_def(name, allow_impt)
             if res:
                 return res
             else:
                 for symid in prepinfo.star_import:
-                    module_prepinfo = self.symid_prepinfo.get(symid)
+                    module_prepinfo = self.get_prepinfo(symid)
                     if module_prepinfo:
                         res = module_prepinfo.get_def(name, allow_impt)
                         if res:
                             return res
 
+        manager = self.manager
+        visited: Set[ImportEntry] = set()
+        while (entry := self.lazy_import_entry(module_symid, name)) and (
+            entry not in visited and manager.get_target(entry.module_symid)
+        ):
+            # follow imports of stub files whose modules are loaded but not
+            # cached yet, they may be preprocessed in this wave(modules that
+            # are not loaded are loaded by ImportEntry.get_type)
+            visited.add(entry)
+            module_symid, name = entry.module_symid, entry.origin_name
+            submodule = f"{module_symid}.{name}"
+            if not name or manager.get_target(submodule):
+                return manager.get_module_ins(submodule if name else module_symid)
+            if (prepinfo := self.get_prepinfo(module_symid)) :
+                return prepinfo.get_def(name, allow_impt)
+
         module_ins = self.manager.get_module_ins(module_symid)
         if not module_ins:
             return None
         else:
             return module_ins._inner_symtable.legb_lookup(name)
 
+    def lazy_import_entry(
+        self, module_symid: "SymId", name: str
+    ) -> Optional[ImportEntry]:
+        """ImportEntry of name in a preprocessed stub file if the imported
+        symbol is not cached yet(see Config.lazy_typeshed)
+        """
+        manager = self.manager
+        if not manager.config.lazy_typeshed or self.get_prepinfo(module_symid):
+            return None
+        module_ins = manager.get_module_ins(module_symid)
+        if not module_ins:
+            return None
+        symtable = module_ins._inner_symtable
+        entry = symtable.local.get(name)
+        if isinstance(entry, ImportEntry) and (
+            symtable.import_cache.lookup_cache(entry.module_symid, entry.origin_name)
+            is None
+        ):
+            return entry
+        return None
+
     def clear(self):
         self.symid_prepinfo = {}
         for blk_target in self.target_prepinfo.keys():
@@ -444,6 +567,10 @@ class prep_cls:
         self.defnode = defnode
         self.var_attr: Dict[str, prep_local] = {}
         self.stage = PREP_NULL
+        # first names of base classes
+        self.dep_names: List[str] = []
+        for basenode in defnode.bases:
+            add_dep_name(self.dep_names, basenode)
 
     @property
     def name(self):
@@ -465,17 +592,34 @@ class prep_func:
         self.value: Optional[TypeFuncIns] = None
         self.stage = PREP_NULL
         self.name = defnode.name
+        # if lazy is True, lazy_resolver is set instead of resolving the
+        # function, it's called when the function is first used.
+        self.lazy = False
+        self.lazy_resolver: Optional[Callable[[], None]] = None
+        # first names of parameter and return annotations
+        self.dep_names: List[str] = []
+        self.add_dep_names(defnode)
 
     def add_defnode(self, defnode: ast.FunctionDef):
         assert isinstance(defnode, ast.FunctionDef)
         assert defnode.name == self.defnodes[0].name
         self.defnodes.append(defnode)
+        self.add_dep_names(defnode)
+
+    def add_dep_names(self, defnode: ast.FunctionDef):
+        for argnode in defnode.args.args:
+            add_dep_name(self.dep_names, argnode.annotation)
+        add_dep_name(self.dep_names, defnode.returns)
 
     @property
     def defnode(self) -> ast.AST:
         return self.defnodes[0]
 
     def getins(self) -> TypeIns:
+        if self.lazy_resolver:
+            resolver = self.lazy_resolver
+            self.lazy_resolver = None
+            resolver()
         return self.value or any_ins
 
 
@@ -495,6 +639,12 @@ class prep_local:
         self.type = LOCAL_NORMAL
         self.typenode = self.get_typenode(defnode)
         self.stage = PREP_NULL
+        # first name of the annotation(or the value if there is none)
+        self.dep_names: List[str] = []
+        if isinstance(defnode, ast.AnnAssign):
+            add_dep_name(self.dep_names, defnode.annotation)
+        else:
+            add_dep_name(self.dep_names, defnode.value)
 
     def get_typenode(self, node: AssignNode):
         if isinstance(node, ast.AnnAssign):
@@ -528,11 +678,20 @@ class prep_impt:
         self.defnode = defnode
         self.def_prepinfo = def_prepinfo
         self.value: Union[PrepDef, TypeIns, None] = None
+        # the imported module is loaded when it's used
+        self.lazy = False
 
     def is_import_module(self):
         """Import the whole module?"""
         return self.origin_name == ""
 
+    def is_reexport(self):
+        """Imports in the form of 'import a as a' or 'from m import a as a'"""
+        return any(
+            alias.asname == self.asname and alias.name == alias.asname
+            for alias in self.defnode.names
+        )
+
     def getins(self) -> TypeIns:
         if not self.value:
             return any_ins
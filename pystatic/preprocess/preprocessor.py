@@ -8,7 +8,12 @@ from pystatic.preprocess.definition import (
     get_definition_in_function,
 )
 from pystatic.preprocess.dependency import toposort_prepdef
-from pystatic.preprocess.resolve import resolve, resolve_import, resolve_cls_method
+from pystatic.preprocess.resolve import (
+    resolve,
+    resolve_import,
+    resolve_cls_method,
+    load_lazy_chains,
+)
 from pystatic.preprocess.prepinfo import *
 
 if TYPE_CHECKING:
@@ -28,54 +33,115 @@ def dump_to_symtable(prepinfo: "PrepInfo"):
 
 
 class Preprocessor:
-    def __init__(self, manager: "Manager") -> None:
-        self.env = PrepEnvironment(manager)
+    """Preprocess targets in the queue of the manager in waves
+
+    A wave first collects definitions of all the queued targets. Modules
+    imported by them are queued and collected in the same wave, so the whole
+    import closure is known before anything is resolved. Then definitions of
+    the wave are sorted in one dependency graph and resolved in one pass.
+
+    Bodies of methods are collected in the next wave because they need the
+    resolved class(see resolve_cls_method).
+    """
+
+    def __init__(
+        self, manager: "Manager", outer: Optional["PrepEnvironment"] = None
+    ) -> None:
+        """
+        @param outer: environment of the wave this preprocessor is nested in,
+        definitions of that wave can be looked up.
+        """
+        self.env = PrepEnvironment(manager, outer)
+        self.running = False
 
     def process(self):
         manager = self.env.manager
+        self.running = True
+        while len(manager.q_preprocess) > 0:
+            self.resolve_wave(self.collect_wave())
+        self.env.clear()
+        self.running = False
+
+    def collect_wave(self) -> List[BlockTarget]:
+        """Collect definitions of queued targets and the modules they import"""
+        manager = self.env.manager
+        stage = Stage.Preprocess.name
+        wave: List[BlockTarget] = []
         while len(manager.q_preprocess) > 0:
-            to_check: List[BlockTarget] = []
             while len(manager.q_preprocess) > 0:
-                current = manager.q_preprocess[0]
-                manager.q_preprocess.popleft()
+                current = manager.q_preprocess.popleft()
                 assert current.stage == Stage.Preprocess
                 assert current.ast
-                to_check.append(current)
+                wave.append(current)
 
-                # get current module's class definitions.
-                if isinstance(current, MethodTarget):
-                    get_definition_in_method(current, self.env)
-                elif isinstance(current, FunctionTarget):
-                    get_definition_in_function(current, self.env)
-                else:
-                    get_definition(current, self.env)
+                # imports found here are appended to the queue
+                with manager.stats.timer(stage, self.module_symid(current.symtable)):
+                    if isinstance(current, MethodTarget):
+                        get_definition_in_method(current, self.env)
+                    elif isinstance(current, FunctionTarget):
+                        get_definition_in_function(current, self.env)
+                    else:
+                        get_definition(current, self.env)
+
+            if manager.config.lazy_typeshed:
+                # stub files imported through lazy imports join this wave
+                for target in wave:
+                    prepinfo = self.env.get_target_prepinfo(target)
+                    assert prepinfo
+                    load_lazy_chains(prepinfo, self.env)
+        return wave
 
-            prepinfo_list = [
-                prepinfo
-                for target in to_check
-                if (prepinfo := self.env.get_target_prepinfo(target))
-            ]
-            assert len(prepinfo_list) == len(to_check)
+    def resolve_wave(self, wave: List[BlockTarget]):
+        """Resolve definitions collected in a wave and move its modules to the
+        next stage
+        """
+        manager = self.env.manager
+        stats = manager.stats
+        stage = Stage.Preprocess.name
+        prepinfo_list = [
+            prepinfo
+            for target in wave
+            if (prepinfo := self.env.get_target_prepinfo(target))
+        ]
+        assert len(prepinfo_list) == len(wave)
 
-            for prepinfo in prepinfo_list:
+        for prepinfo in prepinfo_list:
+            with stats.timer(stage, self.module_symid(prepinfo.symtable)):
                 resolve_import(prepinfo, self.env)
 
-            resolve_order = toposort_prepdef(
-                prepinfo_list, self.env.manager.manager_errbox
-            )
-            for prepdef in resolve_order:
+        with stats.timer(stage):
+            resolve_order = toposort_prepdef(prepinfo_list, manager.manager_errbox)
+        for prepdef in resolve_order:
+            symtable = prepdef.def_prepinfo.symtable
+            with stats.timer(stage, self.module_symid(symtable)):
                 resolve(prepdef, shallow=True)
 
-            for prepinfo in prepinfo_list:
+        for prepinfo in prepinfo_list:
+            with stats.timer(stage, self.module_symid(prepinfo.symtable)):
                 resolve_typevar(prepinfo)
-            for prepdef in resolve_order:
+        for prepdef in resolve_order:
+            symtable = prepdef.def_prepinfo.symtable
+            with stats.timer(stage, self.module_symid(symtable)):
                 resolve(prepdef, shallow=False)
 
-            for prepinfo in prepinfo_list:
+        for prepinfo in prepinfo_list:
+            with stats.timer(stage, self.module_symid(prepinfo.symtable)):
+                # method targets are queued for the next wave
                 resolve_cls_method(prepinfo, self.env, prepinfo.errbox)
                 dump_to_symtable(prepinfo)
 
-            for target in to_check:
-                if isinstance(target, Target) and manager.is_on_check(target.symid):
+        for target in wave:
+            if isinstance(target, FunctionTarget):
+                target.symtable.preprocessed = True
+            elif isinstance(target, Target):
+                if manager.is_on_check(target.symid):
                     manager.update_stage(target, Stage.Infer)
-        self.env.clear()
+                else:
+                    manager.update_stage(target, Stage.FINISH)
+
+    def module_symid(self, symtable: "SymTable") -> Optional["SymId"]:
+        """symid of the module a symtable belongs to, None if stats are off"""
+        manager = self.env.manager
+        if not manager.stats.enabled:
+            return None
+        return manager.get_target_symid(symtable.glob_symid)
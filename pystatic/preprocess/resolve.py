@@ -1,3 +1,4 @@
+from functools import partial
 from pystatic.preprocess.resolve_local import resolve_local
 from pystatic.preprocess.resolve_func import resolve_func
 from pystatic.preprocess.resolve_cls import (
@@ -5,7 +6,7 @@ from pystatic.preprocess.resolve_cls import (
     resolve_cls_method,
     resolve_cls_placeholder,
 )
-from pystatic.preprocess.resolve_impt import resolve_import
+from pystatic.preprocess.resolve_impt import resolve_import, load_lazy_chains
 from pystatic.preprocess.resolve_spt import resolve_typealias, resolve_typevar
 from pystatic.preprocess.prepinfo import *
 
@@ -19,6 +20,9 @@ def resolve(prepdef: PrepDef, shallow: bool):
         resolve_cls(prepdef, shallow)
     elif isinstance(prepdef, prep_func):
         if not shallow:
-            resolve_func(prepdef)
+            if prepdef.lazy:
+                prepdef.lazy_resolver = partial(resolve_func, prepdef)
+            else:
+                resolve_func(prepdef)
     else:
         raise TypeError()
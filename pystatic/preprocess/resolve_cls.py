@@ -1,16 +1,17 @@
 import ast
 import contextlib
 from collections import deque
+from functools import partial
 from typing import Deque, List
 from pystatic.target import MethodTarget
-from pystatic.typesys import TypeIns, TypeType
-from pystatic.predefined import TypeGenericTemp, TypeVarIns, TypeFuncIns
+from pystatic.typesys import TypeIns, TypeType, hierarchy_changed
+from pystatic.predefined import TypeGenericTemp, TypeVarIns, TypeVarTemp, TypeFuncIns
 from pystatic.visitor import BaseVisitor
 from pystatic.error.errorbox import ErrorBox
 from pystatic.symtable import TableScope
 from pystatic.arg import Argument
 from pystatic.preprocess.resolve_func import resolve_func_template
-from pystatic.preprocess.resolve_util import eval_preptype
+from pystatic.preprocess.resolve_util import eval_preptype, PrepTypeEvalResult
 from pystatic.preprocess.prepinfo import *
 
 
@@ -19,13 +20,19 @@ def resolve_cls(clsdef: "prep_cls", shallow: bool):
     clstemp = clsdef.clstemp
     errbox = clsdef.def_prepinfo.errbox
     clstemp.baseclass = []
-    is_generic = True
 
-    for base_node in clsdef.defnode.bases:
-        base_res = eval_preptype(base_node, clsdef.prepinfo, True, shallow)
+    base_results = [
+        (base_node, eval_preptype(base_node, clsdef.prepinfo, True, shallow))
+        for base_node in clsdef.defnode.bases
+    ]
+    # if every base is a plain class, shallow evaluation is already complete
+    # and the class doesn't need to be resolved again
+    complete = not shallow or all(_plain_class(res) for _, res in base_results)
+
+    for base_node, base_res in base_results:
         res_type = base_res.result.value
 
-        if not shallow:
+        if complete:
             base_res.result.dump_to_box(errbox)
 
         assert res_type
@@ -35,12 +42,12 @@ def resolve_cls(clsdef: "prep_cls", shallow: bool):
             result = Result(any_ins)
             baseins = res_type.getins(result)
 
-            if not shallow:
+            if complete:
                 result.dump_to_box(errbox)
 
             for old_ins in clstemp.baseclass:
                 if baseins.temp == old_ins.temp:
-                    if not shallow:
+                    if complete:
                         errbox.add_err(DuplicateBaseclass(base_node))
                     break
             else:
@@ -50,16 +57,27 @@ def resolve_cls(clsdef: "prep_cls", shallow: bool):
             if shallow:
                 errbox.add_err(BaseNotType(base_node))
 
-        is_generic = is_generic or base_res.generic
     clstemp.get_mro()
+    hierarchy_changed()
 
-    if not shallow:
+    if complete:
         resolve_cls_placeholder(clsdef, clsdef.def_prepinfo.errbox)
-
-    if not shallow or not is_generic:
         clsdef.stage = PREP_COMPLETE
 
 
+def _plain_class(base_res: "PrepTypeEvalResult") -> bool:
+    """Whether a base evaluates to a class without subscripts, aliases(their
+    values may not be resolved yet) and typevars excluded
+    """
+    res_type = base_res.result.value
+    return (
+        not base_res.generic
+        and type(res_type) is TypeType
+        and not res_type.bindlist
+        and not isinstance(res_type.temp, TypeVarTemp)
+    )
+
+
 def resolve_cls_placeholder(clsdef: "prep_cls", errbox: "ErrorBox"):
     """Resolve placeholders of a class"""
     clstemp = clsdef.clstemp
@@ -68,6 +86,7 @@ def resolve_cls_placeholder(clsdef: "prep_cls", errbox: "ErrorBox"):
         visitor.accept(base_node)
 
     clstemp.placeholders = visitor.get_typevar_list()
+    hierarchy_changed()
 
 
 class _TypeVarVisitor(BaseVisitor):
@@ -239,6 +258,12 @@ def _resolve_cls_method(clsdef: "prep_cls",
         ins.add_overload(args, ret)
 
     for func in clsdef.prepinfo.func.values():
-        resolve_func_template(func, add_func_def, add_func_overload, errbox)
+        if func.lazy:
+            # method targets of lazy methods(in stub files) are not needed
+            func.lazy_resolver = partial(
+                resolve_func_template, func, add_func_def, add_func_overload, errbox
+            )
+        else:
+            resolve_func_template(func, add_func_def, add_func_overload, errbox)
 
     return targets
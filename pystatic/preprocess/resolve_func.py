@@ -54,12 +54,7 @@ def resolve_func_template(
     not_overload: Optional[
         FunTuple] = None  # function def that's not decorated by overload
     for astnode in func.defnodes:
-        is_overload = False
-        for decs in astnode.decorator_list:
-            if getattr(decs, "id", None) == "overload":
-                is_overload = True
-                break
-        if is_overload:
+        if is_overload_def(astnode):
             overload_list.append((*get_arg_ret(astnode), astnode))
         else:
             if not_overload:
@@ -86,9 +81,22 @@ def resolve_func_template(
     else:
         assert not_overload
         func_ins = add_func_def(*not_overload)
+
+    # items are in the same order as overloads of func_ins
+    defs = ([not_overload] if not_overload else []) + overload_list
+    for item, (_, _, node) in zip(func_ins.overloads, defs):
+        item.is_overload = is_overload_def(node)
     func.value = func_ins
 
 
+def is_overload_def(node: ast.FunctionDef) -> bool:
+    """Whether the function definition is decorated by overload"""
+    for decs in node.decorator_list:
+        if getattr(decs, "id", None) == "overload":
+            return True
+    return False
+
+
 def eval_argument_type(node: ast.arguments,
                        prepinfo: PrepInfo) -> Result[Argument]:
     """Gernerate an Argument instance according to an ast.arguments node"""
@@ -138,7 +146,10 @@ def eval_argument_type(node: ast.arguments,
         arg.valid = True
         arg.default = value  # TODO: add type check here
 
-    for arg, value in zip(reversed(order_kwarg), reversed(node.kw_defaults)):
+    # kw_defaults is None for keyword only arguments without default values
+    for arg, value in zip(order_kwarg, node.kw_defaults):
+        if value is None:
+            continue
         arg.valid = True
         arg.default = value  # TODO: add type check here(here value is a node represent an expression)
 
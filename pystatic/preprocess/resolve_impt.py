@@ -14,6 +14,7 @@ def resolve_import(prepinfo: "PrepInfo", env: "PrepEnvironment"):
         symtable = cur_prepinfo.symtable
         tmp_impt = {**cur_prepinfo.impt}  # copy of cur_prepinfo.impt
         for _, entry in tmp_impt.items():
+            record_import_edge(symtable, entry, env.manager)
             update_symtable_import_cache(symtable, cur_prepinfo, entry, env.manager)
             if not entry.origin_name:
                 # import <module_name>
@@ -38,6 +39,54 @@ def resolve_import(prepinfo: "PrepInfo", env: "PrepEnvironment"):
             queue.append(clsdef.prepinfo)
 
 
+def load_lazy_chains(prepinfo: "PrepInfo", env: "PrepEnvironment"):
+    """Load lazy imports(see Config.lazy_typeshed) that names imported by
+    prepinfo go through, so that their modules are preprocessed in the same
+    wave before the names are resolved.
+    """
+    manager = env.manager
+    queue: Deque["PrepInfo"] = deque()
+    queue.append(prepinfo)
+
+    while len(queue):
+        cur_prepinfo = queue.popleft()
+        for entry in cur_prepinfo.impt.values():
+            if entry.lazy or entry.is_import_module():
+                continue
+            cur_state = (entry.symid, entry.origin_name)
+            state_set = set()
+            while cur_state[1] and cur_state not in state_set:
+                state_set.add(cur_state)
+                mod_symid, name_in_mod = cur_state
+                if (lazy_entry := env.lazy_import_entry(mod_symid, name_in_mod)) :
+                    # a stub file preprocessed in an earlier wave
+                    manager.add_import_symid(
+                        lazy_entry.module_symid, lazy_entry.origin_name
+                    )
+                    cur_state = (lazy_entry.module_symid, lazy_entry.origin_name)
+                    continue
+
+                lookup_res = env.lookup(mod_symid, name_in_mod, True)
+                if not isinstance(lookup_res, prep_impt):
+                    break
+                if lookup_res.lazy:
+                    lookup_res.def_prepinfo.load_import(lookup_res)
+                cur_state = (lookup_res.symid, lookup_res.origin_name)
+
+        for clsdef in cur_prepinfo.cls.values():
+            queue.append(clsdef.prepinfo)
+
+
+def record_import_edge(symtable: "SymTable", entry: "prep_impt", manager: "Manager"):
+    """Record the modules imported by entry in the manager's module graph"""
+    manager.record_import(symtable.glob_symid, entry.symid)
+    if not entry.is_import_module():
+        # from package import module
+        manager.record_import(
+            symtable.glob_symid, entry.symid + f".{entry.origin_name}"
+        )
+
+
 def _resolve_import_chain(prepinfo: "PrepInfo", name: str, env: "PrepEnvironment"):
     """Resolve type from an import chaine"""
     impt_entry = prepinfo.impt[name]
@@ -1,7 +1,7 @@
 import ast
 from collections import deque
 from typing import Deque
-from pystatic.typesys import TypeIns, TypeType
+from pystatic.typesys import TypeIns, TypeType, hierarchy_changed
 from pystatic.predefined import TypeVarIns, typevar_type, typevar_temp
 from pystatic.preprocess.prepinfo import *
 from pystatic.infer.infer_expr import ExprInferer, infer_expr
@@ -51,6 +51,7 @@ def copy_typevar(src: "TypeVarIns", dst: "TypeVarIns"):
     dst.kind = src.kind
     dst.bound = src.bound
     dst.constraints = src.constraints
+    hierarchy_changed()
 
 
 class TypeVarFiller(ExprInferer):
@@ -1,4 +1,4 @@
-from typing import Dict, Deque, Set
+from typing import Dict, Deque, List, Optional, Set
 from collections import deque
 from pystatic.preprocess.prepinfo import PrepDef
 from pystatic.error.errorbox import ErrorBox
@@ -6,50 +6,15 @@ from pystatic.error.errorcode import *
 
 
 class _Node:
-    __slots__ = ["prepdef", "dependency", "indeg"]
+    __slots__ = ["prepdef", "dependency"]
 
     def __init__(self, prepdef: "PrepDef") -> None:
         self.prepdef = prepdef
-        self.dependency: Set["_Node"] = set()
-        self.indeg: int = 0
+        # nodes this node depends on, a dict keeps the order edges are added
+        self.dependency: Dict["_Node", None] = {}
 
     def add_dependency(self, node: "_Node"):
-        self.dependency.add(node)
-
-
-def _resolve_loop(
-    cur_node: _Node, added: set, nodelist: List[_Node], errbox: ErrorBox, order_list
-):
-    added.add(cur_node)
-    nodelist.append(cur_node)
-    for next_node in cur_node.dependency:
-        assert next_node.indeg != 0
-        if next_node in added:
-            loop_ref_list = []
-            if next_node == cur_node:
-                glob_symid = cur_node.prepdef.def_prepinfo.glob_symid
-                cur_item = (glob_symid, cur_node.prepdef.defnode)
-                loop_ref_list = [cur_item, cur_item]
-            else:
-                for i in range(len(nodelist) - 2, 0, -1):
-                    glob_symid = nodelist[i].prepdef.def_prepinfo.glob_symid
-                    loop_ref_list.append((glob_symid, nodelist[i].prepdef.defnode))
-                    if nodelist[i] == next_node:
-                        break
-            errbox.add_err(ReferenceLoop(loop_ref_list))
-
-        else:
-            _resolve_loop(next_node, added, nodelist, errbox, order_list)
-        next_node.indeg -= 1
-    added.remove(cur_node)
-    order_list.append(cur_node.prepdef)
-    nodelist.pop()
-
-
-def resolve_loop(cur_node: _Node, errbox: ErrorBox, order_list):
-    added = set()
-    nodelist = []
-    _resolve_loop(cur_node, added, nodelist, errbox, order_list)
+        self.dependency[node] = None
 
 
 class DependencyGraph:
@@ -66,36 +31,107 @@ class DependencyGraph:
         return self._mapping[prepdef]
 
     def add_dependency(self, def_from: PrepDef, def_to: PrepDef):
+        """def_from depends on def_to"""
         from_node = self.lookup(def_from)
         to_node = self.lookup(def_to)
-        to_node.add_dependency(from_node)
+        from_node.add_dependency(to_node)
 
     def add_prepdef(self, prepdef: PrepDef):
         self.lookup(prepdef)
 
     def toposort(self) -> List["PrepDef"]:
-        que: Deque["_Node"] = deque()
-        for node in self._nodes:
-            node.indeg = 0
-        for node in self._nodes:
-            for depend_node in node.dependency:
-                depend_node.indeg += 1
-        for node in self._nodes:
-            if node.indeg == 0:
-                que.append(node)
-
-        res = []
-
-        while len(que) != 0:
-            curnode = que.popleft()
-            res.append(curnode.prepdef)
-            for depend_node in curnode.dependency:
-                depend_node.indeg -= 1
-                if depend_node.indeg == 0:
-                    que.append(depend_node)
-
-        for node in self._nodes:
-            if node.indeg != 0:
-                resolve_loop(node, self.errbox, res)
-
+        return [prepdef for comp in self.components() for prepdef in comp]
+
+    def components(self) -> List[List["PrepDef"]]:
+        """Strongly connected components, a component comes after all the
+        components it depends on and independent definitions keep the order
+        they were added.
+
+        Definitions in the same component refer to each other, every reference
+        loop is reported once to errbox.
+        """
+        return [
+            [node.prepdef for node in comp] for comp in self._strong_components()
+        ]
+
+    def _strong_components(self) -> List[List["_Node"]]:
+        # Tarjan's algorithm with an explicit stack, so that a long chain of
+        # definitions can't exceed the recursion limit
+        index: Dict["_Node", int] = {}
+        lowlink: Dict["_Node", int] = {}
+        stack: List["_Node"] = []
+        on_stack: Set["_Node"] = set()
+        res: List[List["_Node"]] = []
+
+        for root in self._nodes:
+            if root in index:
+                continue
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(root.dependency))]
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if child not in index:
+                        index[child] = lowlink[child] = len(index)
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(child.dependency)))
+                        break
+                    elif child in on_stack:
+                        lowlink[node] = min(lowlink[node], index[child])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] == index[node]:
+                        start = len(stack) - 1
+                        while stack[start] is not node:
+                            start -= 1
+                        comp = stack[start:]
+                        del stack[start:]
+                        on_stack.difference_update(comp)
+                        self._report_loop(comp)
+                        res.append(comp)
         return res
+
+    def _report_loop(self, comp: List["_Node"]):
+        if len(comp) == 1 and comp[0] not in comp[0].dependency:
+            return
+        members = set(comp)
+        reported: Set["_Node"] = set()
+        for node in comp:
+            if node in reported:
+                continue
+            cycle = _shortest_cycle(node, members)
+            reported.update(cycle)
+            loop_ref_list = []
+            for cycle_node in cycle + [node]:
+                glob_symid = cycle_node.prepdef.def_prepinfo.glob_symid
+                loop_ref_list.append((glob_symid, cycle_node.prepdef.defnode))
+            self.errbox.add_err(ReferenceLoop(loop_ref_list))
+
+
+def _shortest_cycle(start: "_Node", members: Set["_Node"]) -> List["_Node"]:
+    """Nodes of the shortest loop from start back to start, start included
+    only once. All nodes of the loop are in members.
+    """
+    parent: Dict["_Node", Optional["_Node"]] = {start: None}
+    que: Deque["_Node"] = deque([start])
+    while que:
+        curnode = que.popleft()
+        for next_node in curnode.dependency:
+            if next_node is start:
+                cycle = []
+                node: Optional["_Node"] = curnode
+                while node is not None:
+                    cycle.append(node)
+                    node = parent[node]
+                cycle.reverse()
+                return cycle
+            if next_node in members and next_node not in parent:
+                parent[next_node] = curnode
+                que.append(next_node)
+    assert False, "start is not in a loop"
@@ -1,9 +1,9 @@
 import ast
 from typing import Optional, TYPE_CHECKING, List
 from pystatic.infer.infer_expr import SupportGetAttribute
-from pystatic.typesys import TypeIns, TypeType
+from pystatic.typesys import TypeIns, TypeType, hierarchy_changed
 from pystatic.predefined import TypeModuleIns, TypePackageIns, TypeClassTemp
-from pystatic.visitor import NoGenVisitor, VisitorMethodNotFound
+from pystatic.visitor import NoGenVisitor
 from pystatic.result import Result
 from pystatic.symtable import ImportNode, SymTable
 from pystatic.symid import SymId, rel2abssymid, symid_parent, absolute_symidlist
@@ -20,14 +20,11 @@ def omit_inst_typetype(
 
     @param allow_tuple: allow analyse inside tuple node or not
     """
-    try:
-        res = typetype_getter.accept(node, consultant, allow_tuple)
-        if not res:
-            return None
-        assert isinstance(res, TypeType)
-        return res
-    except VisitorMethodNotFound:
+    res = typetype_getter.accept(node, consultant, allow_tuple)
+    if not res:
         return None
+    assert isinstance(res, TypeType)
+    return res
 
 
 class TypeTypeGetter(NoGenVisitor):
@@ -36,6 +33,9 @@ class TypeTypeGetter(NoGenVisitor):
         self.allow_tuple = allow_tuple
         return self.visit(node)
 
+    def visit_missing(self, node, *args, **kwargs):
+        return None
+
     def visit_Name(self, node: ast.Name) -> Optional[TypeIns]:
         name_result = self.consultant.getattribute(node.id, node)
         assert isinstance(name_result, Result)
@@ -122,3 +122,4 @@ def analyse_import_stmt(
 def add_baseclass(temp: TypeClassTemp, basecls: "TypeIns"):
     if basecls not in temp.baseclass:
         temp.baseclass.append(basecls)
+        hierarchy_changed()
@@ -0,0 +1,203 @@
+"""Statistics of a run: time spent in each stage and module, and counters of
+the work done.
+
+Collecting is disabled unless Config.stats is set. Time is measured
+exclusively: when a timer starts inside another one(a module parsed while
+preprocessing the module that imports it), the outer one is paused, so the
+time of stages adds up to the time of the whole run.
+
+Counters of visited nodes and symtable lookups are updated by the Stats that
+is active, Manager activates its Stats while preprocessing and inferring.
+"""
+
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional, Tuple, Any
+
+try:
+    import resource
+except ImportError:  # not available on windows
+    resource = None  # type: ignore
+
+# the Stats currently collecting counters
+active: Optional["Stats"] = None
+
+_null_timer = nullcontext()
+
+
+class _Timer:
+    __slots__ = ["stats", "stage", "symid", "wall", "cpu"]
+
+    def __init__(self, stats: "Stats", stage: str, symid: Optional[str]) -> None:
+        self.stats = stats
+        self.stage = stage
+        self.symid = symid
+        self.wall = 0.0
+        self.cpu = 0.0
+
+    def __enter__(self):
+        stack = self.stats._timer_stack
+        wall, cpu = time.perf_counter(), time.process_time()
+        if stack:
+            stack[-1].charge(wall, cpu)
+        stack.append(self)
+        self.wall, self.cpu = wall, cpu
+        return self
+
+    def __exit__(self, *args):
+        stack = self.stats._timer_stack
+        wall, cpu = time.perf_counter(), time.process_time()
+        self.charge(wall, cpu)
+        stack.pop()
+        if stack:
+            stack[-1].wall, stack[-1].cpu = wall, cpu
+
+    def charge(self, wall: float, cpu: float):
+        """Add time elapsed since last charge to the stage and the module"""
+        stats = self.stats
+        wall_delta, cpu_delta = wall - self.wall, cpu - self.cpu
+        stats.stage_wall[self.stage] += wall_delta
+        stats.stage_cpu[self.stage] += cpu_delta
+        if self.symid is not None:
+            module = stats.module_time.setdefault(self.symid, {})
+            prev_wall, prev_cpu = module.get(self.stage, (0.0, 0.0))
+            module[self.stage] = (prev_wall + wall_delta, prev_cpu + cpu_delta)
+        self.wall, self.cpu = wall, cpu
+
+
+class Stats:
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        # stage -> seconds
+        self.stage_wall: Counter = Counter()
+        self.stage_cpu: Counter = Counter()
+        # module symid -> stage -> (wall seconds, cpu seconds)
+        self.module_time: Dict[str, Dict[str, Tuple[float, float]]] = {}
+        # visitor class name -> nodes visited
+        self.visits: Counter = Counter()
+        # symtable symid -> lookups of names
+        self.lookups: Counter = Counter()
+        # cache name -> hits/misses
+        self.cache_hits: Counter = Counter()
+        self.cache_misses: Counter = Counter()
+        # set by the manager when the stats are read
+        self.find_module_calls = 0
+        self.dir_scans = 0
+        self._timer_stack: List[_Timer] = []
+
+    def timer(self, stage: str, symid: Optional[str] = None):
+        """Context manager that measures time spent in stage(and module symid)"""
+        if not self.enabled:
+            return _null_timer
+        return _Timer(self, stage, symid)
+
+    @contextmanager
+    def activate(self):
+        """Collect counters while in the context"""
+        global active
+        if not self.enabled:
+            yield self
+            return
+        old_active = active
+        active = self
+        try:
+            yield self
+        finally:
+            active = old_active
+
+    def count_visit(self, visitor: object):
+        self.visits[visitor.__class__.__name__] += 1
+
+    def count_lookup(self, symid: str):
+        self.lookups[symid] += 1
+
+    def count_cache(self, name: str, hit: bool):
+        if hit:
+            self.cache_hits[name] += 1
+        else:
+            self.cache_misses[name] += 1
+
+    @property
+    def peak_memory(self) -> Optional[int]:
+        """Peak resident memory of the process in bytes"""
+        if resource is None:
+            return None
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on linux, bytes on macos
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+    def module_total(self, symid: str) -> Tuple[float, float]:
+        times = self.module_time.get(symid, {}).values()
+        return sum(wall for wall, _ in times), sum(cpu for _, cpu in times)
+
+    def slowest_modules(self, top: int) -> List[Tuple[str, float, float]]:
+        """[(symid, wall, cpu)] of the top slowest modules"""
+        totals = [(symid, *self.module_total(symid)) for symid in self.module_time]
+        totals.sort(key=lambda item: item[1], reverse=True)
+        return totals[:top]
+
+    def merge(self, other: "Stats"):
+        """Add statistics of another run(in another process) to self"""
+        self.stage_wall.update(other.stage_wall)
+        self.stage_cpu.update(other.stage_cpu)
+        for symid, stages in other.module_time.items():
+            module = self.module_time.setdefault(symid, {})
+            for stage, (wall, cpu) in stages.items():
+                prev_wall, prev_cpu = module.get(stage, (0.0, 0.0))
+                module[stage] = (prev_wall + wall, prev_cpu + cpu)
+        self.visits.update(other.visits)
+        self.lookups.update(other.lookups)
+        self.cache_hits.update(other.cache_hits)
+        self.cache_misses.update(other.cache_misses)
+        self.find_module_calls += other.find_module_calls
+        self.dir_scans += other.dir_scans
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stage_wall": dict(self.stage_wall),
+            "stage_cpu": dict(self.stage_cpu),
+            "module_time": self.module_time,
+            "visits": dict(self.visits),
+            "lookups": dict(self.lookups),
+            "cache_hits": dict(self.cache_hits),
+            "cache_misses": dict(self.cache_misses),
+            "find_module_calls": self.find_module_calls,
+            "dir_scans": self.dir_scans,
+            "peak_memory": self.peak_memory,
+        }
+
+    def report(self, top: int = 10) -> str:
+        lines = ["stage".ljust(16) + "wall(s)".rjust(10) + "cpu(s)".rjust(10)]
+        for stage in self.stage_wall:
+            lines.append(
+                stage.ljust(16)
+                + f"{self.stage_wall[stage]:10.3f}{self.stage_cpu[stage]:10.3f}"
+            )
+        lines.append("")
+        lines.append(
+            f"find_module calls: {self.find_module_calls} "
+            f"(directories scanned: {self.dir_scans})"
+        )
+        if (peak := self.peak_memory) is not None:
+            lines.append(f"peak memory: {peak / (1 << 20):.1f} MiB")
+        for name in sorted(self.cache_hits.keys() | self.cache_misses.keys()):
+            hits, misses = self.cache_hits[name], self.cache_misses[name]
+            lines.append(
+                f"{name} cache: {hits} hits, {misses} misses "
+                f"({hits / (hits + misses):.1%} hit rate)"
+            )
+
+        lines.append("")
+        lines.append(f"top {top} slowest modules:")
+        for symid, wall, cpu in self.slowest_modules(top):
+            lines.append(f"  {symid}: {wall:.3f}s wall, {cpu:.3f}s cpu")
+
+        lines.append("nodes visited:")
+        for name, count in self.visits.most_common(top):
+            lines.append(f"  {name}: {count}")
+        lines.append(f"top {top} symtables by lookups:")
+        for symid, count in self.lookups.most_common(top):
+            lines.append(f"  {symid}: {count}")
+        return "\n".join(lines)
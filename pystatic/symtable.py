@@ -1,12 +1,14 @@
 import enum
+import weakref
 from pystatic.symid import symid2list
-from typing import Dict
+from typing import Dict, Callable
 from pystatic.result import Result
+from pystatic import stats
 from pystatic.error.errorcode import *
 
 if TYPE_CHECKING:
     from pystatic.manager import Manager
-    from pystatic.typesys import TypeIns, TypeTemp
+    from pystatic.typesys import TypeIns, TypeTemp, TypeClassTemp
     from pystatic.arg import Argument
 
 
@@ -36,6 +38,25 @@ class Entry:
         return self.defnode
 
 
+class LazyEntry(Entry):
+    """Entry whose type is resolved when it's first used"""
+
+    __slots__ = ["resolver"]
+
+    def __init__(
+        self, resolver: Callable[[], "TypeIns"], defnode: Optional[ast.AST] = None
+    ):
+        super().__init__(None, defnode)  # type: ignore
+        self.resolver: Optional[Callable[[], "TypeIns"]] = resolver
+
+    def get_type(self, symtable: "SymTable") -> "TypeIns":
+        if self.resolver:
+            resolver = self.resolver
+            self.resolver = None
+            self.tp = resolver()
+        return self.tp
+
+
 class ImportEntry(Entry):
     __slots__ = ["module_symid", "origin_name", "defnode"]
 
@@ -50,13 +71,21 @@ class ImportEntry(Entry):
         self.defnode = defnode
 
     def get_type(self, symtable: "SymTable"):
-        return symtable.import_cache.lookup_cache(self.module_symid, self.origin_name)
+        res = symtable.import_cache.lookup_cache(self.module_symid, self.origin_name)
+        manager = symtable.manager
+        if res is None and manager and manager.config.lazy_typeshed:
+            # imported lazily by a stub file
+            res = manager.load_lazy_import(
+                symtable, self.module_symid, self.origin_name
+            )
+        return res
 
 
 class ImportCache:
-    __slots__ = ["import_nodes", "import_map", "_cache"]
+    __slots__ = ["symtable", "import_nodes", "import_map", "_cache"]
 
-    def __init__(self) -> None:
+    def __init__(self, symtable: "SymTable") -> None:
+        self.symtable = symtable
         self.import_nodes: List["ImportNode"] = []
         self.import_map: Dict[str, "TypeIns"] = {}
 
@@ -86,12 +115,14 @@ class ImportCache:
         return cur_ins
 
     def set_moduleins(self, abssymid: "SymId", modins: "TypeIns"):
+        self.symtable.symbols_changed()
         self.import_map[abssymid] = modins
 
     def add_import_node(self, node: "ImportNode"):
         self.import_nodes.append(node)
 
     def add_cache(self, module_symid: str, origin_name: str, ins: "TypeIns"):
+        self.symtable.symbols_changed()
         module_map = self._cache.setdefault(module_symid, {})
         module_map[origin_name] = ins
 
@@ -103,6 +134,7 @@ class ImportCache:
             return module_map.get(origin_name)
 
     def clear(self):
+        self.symtable.symbols_changed()
         self.import_map = {}
         self.import_nodes = []
         self._cache = {}
@@ -126,17 +158,38 @@ class SymTable:
         self.builtins = builtins
 
         self.scope = scope
+        # class whose attributes are defined in this symtable
+        self.clstemp: Optional["TypeClassTemp"] = None
 
-        self.import_cache = ImportCache()
+        self.import_cache = ImportCache(self)
 
         self.manager = manager
         # modules star imported
         self.star_import: List[SymId] = []
 
+        # name -> result of legb_lookup
+        self._lookup_cache: Dict[str, "TypeIns"] = {}
+        # name -> star imported symtables defining it, None if not built yet
+        self._star_table: Optional[Dict[str, List["SymTable"]]] = None
+        # symtables whose cached lookups searched this symtable
+        self._dependents: "weakref.WeakSet[SymTable]" = weakref.WeakSet()
+
         # inner data structure to store important information about this
         # symtable, used heavily in the preprocess stage.
         self._tp_def: Dict[str, "TypeTemp"] = {}
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # dependents are not saved, so neither are the cached lookups
+        state["_lookup_cache"] = {}
+        state["_star_table"] = None
+        del state["_dependents"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._dependents = weakref.WeakSet()
+
     @property
     def glob_symid(self):
         return self.glob.symid
@@ -163,8 +216,55 @@ class SymTable:
         self._tp_def[name] = temp
 
     def add_entry(self, name: str, entry: Entry):
+        if self.clstemp and name not in self.local:
+            self.clstemp.attributes_changed()
+        self.symbols_changed()
         self.local[name] = entry
 
+    def add_star_import(self, module_symid: "SymId"):
+        self.symbols_changed()
+        self.star_import.append(module_symid)
+
+    def symbols_changed(self):
+        """Called when a name in this symtable may resolve to something else
+
+        Cached lookups of this symtable and of the symtables that star import
+        it or have it in their legb chain(recursively) are dropped.
+        """
+        stack = [self]
+        while stack:
+            table = stack.pop()
+            table._lookup_cache = {}
+            table._star_table = None
+            if table._dependents:
+                # they register again when their caches are rebuilt
+                stack.extend(table._dependents)
+                table._dependents.clear()
+
+    def _get_star_table(self) -> Dict[str, List["SymTable"]]:
+        """Merge names exported by star imported modules"""
+        if self._star_table is not None:
+            return self._star_table
+        star_table: Dict[str, List[SymTable]] = {}
+        searched = {self.glob_symid}
+        complete = True
+        for module_symid in self.star_import:
+            if module_symid in searched:
+                continue
+            searched.add(module_symid)
+            module_ins = self.manager.get_module_ins(module_symid)
+            if not module_ins:
+                # not cached, the module may be added later
+                complete = False
+                continue
+            module_table = module_ins._inner_symtable
+            module_table._dependents.add(self)
+            for name in module_table.local:
+                star_table.setdefault(name, []).append(module_table)
+        if complete:
+            self._star_table = star_table
+        return star_table
+
     def get_type_def(self, name: str) -> Optional["TypeTemp"]:
         findlist = name.split(".")
         assert findlist
@@ -185,23 +285,39 @@ class SymTable:
         """
         @param search_star_import: whether search in the module fully imported
         """
-        res = self.local.get(name)
-        if search_star_import and not res:
-            searched = {self.glob_symid}
-            for module_symid in self.star_import:
-                if module_symid not in searched:
-                    searched.add(module_symid)
-                    module_ins = self.manager.get_module_ins(module_symid)
-                    res = module_ins._inner_symtable.lookup_local(name, False)
-                    if res:
-                        return res
-            return None
-        if res:
-            return res.get_type(self)
+        if stats.active:
+            stats.active.count_lookup(self.symid)
+        entry = self.local.get(name)
+        if entry:
+            return entry.get_type(self)
+        if search_star_import and self.star_import:
+            for module_table in self._get_star_table().get(name, ()):
+                res = module_table.lookup_local(name, False)
+                if res:
+                    return res
         return None
 
     def legb_lookup(self, name):
-        return self._legb_lookup(name, SymTable.lookup_local)
+        res = self._lookup_cache.get(name)
+        if stats.active:
+            stats.active.count_cache("lookup", res is not None)
+        if res is None:
+            res = self._legb_lookup(name, SymTable.lookup_local)
+            if res:
+                if not self._lookup_cache:
+                    self._watch_legb_chain()
+                self._lookup_cache[name] = res
+        return res
+
+    def _watch_legb_chain(self):
+        """Register to the enclosing symtables legb_lookup searches"""
+        curtable = self.non_local
+        while curtable:
+            curtable._dependents.add(self)
+            curtable = curtable.non_local
+        for curtable in (self.glob, self.builtins):
+            if curtable and curtable is not self:
+                curtable._dependents.add(self)
 
     def egb_lookup(self, name: str):
         find = SymTable.lookup_local
@@ -248,6 +364,9 @@ class SymTable:
             )
 
     def clear(self):
+        if self.clstemp and self.local:
+            self.clstemp.attributes_changed()
+        self.symbols_changed()
         self.local = {}
         self.star_import = []
         self._tp_def = {}
@@ -265,7 +384,18 @@ class FunctionSymTable(SymTable):
         scope: "TableScope",
     ) -> None:
         super().__init__(symid, glob, non_local, builtins, manager, scope)
-        self.param: Optional["Argument"] = None
+        self._param: Optional["Argument"] = None
+        # definitions in the body of the function are collected and resolved
+        self.preprocessed = False
+
+    @property
+    def param(self) -> Optional["Argument"]:
+        return self._param
+
+    @param.setter
+    def param(self, param: Optional["Argument"]):
+        self.symbols_changed()
+        self._param = param
 
     def lookup_local(self, name: str, search_star_import) -> Optional["TypeIns"]:
         if self.param and (arg_type := self.param.get_arg_type(name)):
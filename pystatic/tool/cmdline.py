@@ -1,10 +1,14 @@
 import argparse
 import os
+import sys
 from os.path import isdir
 from typing import Optional, List
 from pystatic.config import Config
-from pystatic.manager import Manager
-from pystatic.error.errorbox import ErrorBox
+from pystatic.cache import clear_cache_dir
+from pystatic.tool.output import JsonlWriter, SarifWriter
+from pystatic.tool.parallel import check_files, check_files_parallel
+import pystatic.tool.daemon as daemon
+import pystatic.tool.watch as watch
 import pystatic.tool.stubgen as stubgen
 import pystatic.tool.shell as shell
 import pystatic.tool.instaviz.web as web
@@ -29,6 +33,87 @@ def cmdline_parse():
     parser.add_argument("--shell", action="store_true", help="run pystatic shell")
     parser.add_argument("--web", action="store_true", help="web view")
     parser.add_argument("--test-typeshed", action="store_true")
+    parser.add_argument(
+        "--lazy-typeshed",
+        action="store_true",
+        help="resolve definitions in stub files when they are used",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        metavar="cache directory",
+        default=".pystatic_cache",
+        help="directory to store caches",
+        type=str,
+    )
+    parser.add_argument("--no-cache", action="store_true", help="disable caches")
+    parser.add_argument(
+        "--clear-cache", action="store_true", help="remove caches before checking"
+    )
+    parser.add_argument(
+        "--no-result-cache",
+        dest="result_cache",
+        action="store_false",
+        help="check modules even if they and their imports are unchanged",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        metavar="N",
+        default=1,
+        help="number of worker processes used to check modules",
+        type=int,
+    )
+    parser.add_argument(
+        "--stats",
+        metavar="N",
+        nargs="?",
+        const=10,
+        help="print statistics of the run and the N slowest modules",
+        type=int,
+    )
+    parser.add_argument(
+        "--output",
+        choices=["text", "jsonl", "sarif"],
+        default="text",
+        help="text: print messages when all modules are checked, "
+        "jsonl: write a json object per message as soon as its module is checked, "
+        "sarif: write a SARIF 2.1.0 log",
+    )
+    parser.add_argument(
+        "--level",
+        choices=["hint", "warn", "error"],
+        default="hint",
+        help="do not report messages below this level",
+    )
+    parser.add_argument(
+        "--disable-code",
+        metavar="CODE",
+        action="append",
+        help="do not report errors of this class(for example: SymbolUndefined)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="check modules again whenever their files change",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="keep checked modules in memory and serve checks over a socket",
+    )
+    parser.add_argument(
+        "--client", action="store_true", help="check modules with a running daemon"
+    )
+    parser.add_argument(
+        "--stop-daemon", action="store_true", help="stop the running daemon"
+    )
+    parser.add_argument(
+        "--socket",
+        metavar="socket path",
+        default=daemon.DEFAULT_SOCKET,
+        help="unix socket the daemon listens on",
+        type=str,
+    )
     parse_res = parser.parse_args()
     return parse_res
 
@@ -50,34 +135,70 @@ def cmdline_main():
             return
 
     config = Config(cmd_res)
-    cmd_res.module = list(set(cmd_res.module))  # remove duplicates
+    cmd_res.module = list(dict.fromkeys(cmd_res.module))  # remove duplicates
+
+    if cmd_res.clear_cache:
+        clear_cache_dir(os.path.join(config.cwd, cmd_res.cache_dir))
 
-    if cmd_res.shell:
+    socket_path = os.path.join(config.cwd, cmd_res.socket)
+    if cmd_res.daemon:
+        daemon.serve(config, socket_path)
+    elif cmd_res.stop_daemon:
+        _daemon_request(socket_path, {"command": "stop"})
+    elif cmd_res.client:
+        if not cmd_res.module:
+            print("please enter module path or package path")
+            return
+        response = _daemon_request(
+            socket_path, {"command": "check", "files": cmd_res.module}
+        )
+        if response:
+            for mod in cmd_res.module:
+                for msg in response["messages"].get(mod, []):
+                    print(" ".join([mod, msg["text"]]))
+    elif cmd_res.watch:
+        if not cmd_res.module:
+            print("please enter module path or package path")
+            return
+        watch.watch(config, cmd_res.module)
+    elif cmd_res.shell:
         shell.run(config, cmd_res.module)
     elif cmd_res.stubgen:
         pass
     elif cmd_res.web:
         web.run(config, cmd_res.module)
     else:
-        manager = Manager(config)
         if not cmd_res.module:
             print("please enter module path or package path")
             return
 
-        cmdline_errbox = ErrorBox("__CMDLINE__")
-        for mod in cmd_res.module:
-            add_result = manager.add_check_file(mod)
-            add_result.dump_to_box(cmdline_errbox)
+        writer = None
+        if cmd_res.output == "jsonl":
+            writer = JsonlWriter(sys.stdout)
+        elif cmd_res.output == "sarif":
+            writer = SarifWriter(sys.stdout, config.cwd)
+        if writer:
+            writer.begin()
+        on_finish = writer.write if writer else None
+
+        if cmd_res.jobs > 1:
+            messages, stats = check_files_parallel(
+                config, cmd_res.module, cmd_res.jobs, on_finish
+            )
+        else:
+            messages, stats = check_files(config, cmd_res.module, on_finish)
 
-        manager.preprocess()
-        manager.infer()
+        if writer:
+            writer.end()
+        else:
+            for mod in cmd_res.module:
+                for msg in messages[mod]:
+                    output_info = " ".join([mod, str(msg)])
+                    print(output_info)
 
-        cmdline_errbox.release(manager)
-        for mod in cmd_res.module:
-            msg_list = manager.take_messages(mod)
-            for msg in msg_list:
-                output_info = " ".join([mod, str(msg)])
-                print(output_info)
+        if cmd_res.stats:
+            # keep machine readable output on stdout clean
+            print(stats.report(cmd_res.stats), file=sys.stderr if writer else None)
 
         # symid_errors = manager.take_all_messages()
 
@@ -87,6 +208,18 @@ def cmdline_main():
         #         print(output_info)
 
 
+def _daemon_request(socket_path: str, payload: dict) -> Optional[dict]:
+    try:
+        response = daemon.request(socket_path, payload)
+    except OSError:
+        print(f"no daemon is listening on {socket_path}")
+        return None
+    if not response.get("ok"):
+        print(f"daemon error: {response.get('error')}")
+        return None
+    return response
+
+
 def _search_modules_under_package(package_abspath) -> Optional[List[str]]:
     if not isdir(package_abspath):
         return None
@@ -0,0 +1,158 @@
+"""Keep a manager in memory and check files on request.
+
+The daemon listens on a unix domain socket. Requests and responses are json
+objects, one per line:
+
+- {"command": "check", "files": [path, ...]}
+  -> {"ok": true, "messages": {path: [message, ...]}}
+- {"command": "status"} -> {"ok": true, "pid": ..., "files": ...}
+- {"command": "stop"} -> {"ok": true}
+
+Before every check, files of the modules the manager knows(typeshed excluded)
+are compared with the state they were checked with, changed modules are
+rechecked together with the modules that import them. Messages of other
+modules are served from memory.
+"""
+
+import os
+import json
+import socket
+import socketserver
+from typing import Dict, List, Tuple, Any, Optional
+from pystatic.config import Config
+from pystatic.fsys import FilePath
+from pystatic.manager import Manager
+from pystatic.symid import SymId
+from pystatic.target import Target
+from pystatic.tool.output import message_to_dict
+
+DEFAULT_SOCKET = ".pystatic.sock"
+
+# (mtime_ns, size)
+FileState = Tuple[int, int]
+
+
+def _file_state(path: FilePath) -> Optional[FileState]:
+    try:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+    except OSError:
+        return None
+
+
+class Daemon:
+    def __init__(self, config: Config) -> None:
+        self.config = config
+        self.manager = Manager(config)
+        # state of module files when they were checked
+        self.file_states: Dict[SymId, Optional[FileState]] = {}
+        # messages of checked modules
+        self.messages: Dict[SymId, List[Dict[str, Any]]] = {}
+        self.stopped = False
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        command = request.get("command")
+        if command == "check":
+            files = request.get("files") or []
+            return {"ok": True, "messages": self.check(files)}
+        elif command == "status":
+            return {"ok": True, "pid": os.getpid(), "files": len(self.file_states)}
+        elif command == "stop":
+            self.stopped = True
+            return {"ok": True}
+        return {"ok": False, "error": f"unknown command {command!r}"}
+
+    def check(self, files: List[FilePath]) -> Dict[FilePath, List[Dict[str, Any]]]:
+        manager = self.manager
+        paths = [manager.fsys.realpath(path) for path in files]
+
+        changed = self.changed_modules()
+        if changed and manager.recheck_modules(list(changed)).value:
+            # a module with syntax errors is tried again in the next check
+            self.file_states.update(changed)
+
+        for path in paths:
+            symid = manager.get_symid(path)
+            if not symid or not manager.is_on_check(symid):
+                manager.add_check_file(path, recheck=True)
+
+        manager.preprocess()
+        # modules on check that were preprocessed again
+        inferred = [
+            target.symid for target in manager.q_infer if isinstance(target, Target)
+        ]
+        manager.infer()
+
+        for symid in inferred:
+            self.messages[symid] = [
+                message_to_dict(msg) for msg in manager.take_messages_by_symid(symid)
+            ]
+        for symid, target in manager.targets.items():
+            if symid not in self.file_states and self.is_watched(target):
+                self.file_states[symid] = _file_state(target.analyse_path)
+
+        result = {}
+        for path in paths:
+            symid = manager.get_symid(path)
+            result[path] = self.messages.get(symid, []) if symid else []
+        return result
+
+    def is_watched(self, target: Target) -> bool:
+        """Changes of typeshed are not watched"""
+        typeshed = self.config.typeshed
+        return not typeshed or not target.analyse_path.startswith(typeshed)
+
+    def changed_modules(self) -> Dict[SymId, FileState]:
+        """Modules whose files changed since they were checked"""
+        changed = {}
+        for symid, state in self.file_states.items():
+            target = self.manager.get_target(symid)
+            if not target:
+                continue
+            new_state = _file_state(target.analyse_path)
+            if new_state and new_state != state:
+                changed[symid] = new_state
+        return changed
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        daemon: Daemon = self.server.daemon  # type: ignore
+        for line in self.rfile:
+            try:
+                response = daemon.handle(json.loads(line))
+            except Exception as e:
+                response = {"ok": False, "error": repr(e)}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+            if daemon.stopped:
+                break
+
+
+def serve(config: Config, socket_path: FilePath):
+    """Run the daemon until a stop request is received"""
+    daemon = Daemon(config)
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = socketserver.UnixStreamServer(socket_path, _RequestHandler)
+    server.daemon = daemon  # type: ignore
+    try:
+        # requests are handled one by one, the manager is not thread safe
+        while not daemon.stopped:
+            server.handle_request()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def request(socket_path: FilePath, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Send a request to the daemon and wait for the response"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        return {"ok": False, "error": "no response from the daemon"}
+    return json.loads(line)
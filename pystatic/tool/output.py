@@ -0,0 +1,178 @@
+"""Write messages of checked modules while the check is running.
+
+Writers receive the messages of a module as soon as the module is checked, so
+nothing has to wait for the whole run and messages are never collected in
+memory:
+
+- JsonlWriter writes one json object per message and line
+- SarifWriter writes a SARIF 2.1.0 log, results are written one by one and
+  only the rules seen so far are kept
+"""
+
+import os
+import json
+import pathlib
+from typing import Any, Dict, IO, List, Optional, Sequence
+from pystatic.cache import read_source
+from pystatic.error.level import Level
+from pystatic.error.message import Message
+from pystatic.fsys import FilePath
+from pystatic.symid import SymId
+
+
+def message_to_dict(msg: Message) -> Dict[str, Any]:
+    res: Dict[str, Any] = {
+        "level": msg.level.name,
+        "code": msg.code,
+        "msg": msg.msg,
+        "text": str(msg),
+    }
+    if (pos := msg.get_position()) :
+        res["lineno"] = pos.lineno
+        res["col_offset"] = pos.col_offset
+        res["end_lineno"] = pos.end_lineno
+        res["end_col_offset"] = pos.end_col_offset
+    return res
+
+
+class JsonlWriter:
+    def __init__(self, out: IO[str]) -> None:
+        self.out = out
+
+    def begin(self):
+        pass
+
+    def write(
+        self, path: FilePath, symid: Optional[SymId], messages: Sequence[Message]
+    ):
+        for msg in messages:
+            record: Dict[str, Any] = {"path": path, "symid": symid}
+            record.update(message_to_dict(msg))
+            self.out.write(json.dumps(record) + "\n")
+        # flushed per module so that readers get results right away
+        self.out.flush()
+
+    def end(self):
+        pass
+
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_VERSION = "2.1.0"
+# rule of messages that are not sent by an ErrorCode
+DEFAULT_RULE = "pystatic"
+SRCROOT = "SRCROOT"
+
+_sarif_levels = {
+    Level.HINT: "note",
+    Level.WARN: "warning",
+    Level.ERROR: "error",
+}
+
+
+class SarifWriter:
+    """Every ErrorCode subclass is a rule, its id is the name of the class"""
+
+    def __init__(self, out: IO[str], root: Optional[FilePath] = None) -> None:
+        """
+        @param root: paths under root are written relative to it
+        """
+        self.out = out
+        self.root = os.path.realpath(root) if root else None
+        # rule id -> level of the first result
+        self.rules: Dict[str, str] = {}
+        self.count = 0
+
+    def begin(self):
+        self.out.write(
+            '{"$schema": %s, "version": %s, "runs": [{"results": ['
+            % (json.dumps(SARIF_SCHEMA), json.dumps(SARIF_VERSION))
+        )
+
+    def write(
+        self, path: FilePath, symid: Optional[SymId], messages: Sequence[Message]
+    ):
+        if not messages:
+            return
+        location = self.artifact_location(path)
+        lines = None
+        if any(msg.get_position() for msg in messages):
+            lines = _utf8_lines(path)
+        for msg in messages:
+            result = self.result(msg, location, lines)
+            if self.count:
+                self.out.write(",")
+            self.out.write("\n" + json.dumps(result))
+            self.count += 1
+        self.out.flush()
+
+    def end(self):
+        rules = [
+            {"id": rule, "name": rule, "defaultConfiguration": {"level": level}}
+            for rule, level in sorted(self.rules.items())
+        ]
+        run: Dict[str, Any] = {
+            "tool": {"driver": {"name": "pystatic", "rules": rules}},
+            "columnKind": "unicodeCodePoints",
+        }
+        if self.root:
+            root_uri = pathlib.Path(self.root).as_uri() + "/"
+            run["originalUriBaseIds"] = {SRCROOT: {"uri": root_uri}}
+        # results are the first member of the run, the rest of it follows
+        self.out.write("\n], " + json.dumps(run)[1:] + "]}\n")
+        self.out.flush()
+
+    def artifact_location(self, path: FilePath) -> Dict[str, str]:
+        path = os.path.realpath(path)
+        if self.root and path.startswith(self.root + os.sep):
+            relpath = os.path.relpath(path, self.root)
+            return {"uri": pathlib.PurePath(relpath).as_posix(), "uriBaseId": SRCROOT}
+        return {"uri": pathlib.Path(path).as_uri()}
+
+    def result(
+        self,
+        msg: Message,
+        location: Dict[str, str],
+        lines: Optional[List[bytes]] = None,
+    ) -> Dict[str, Any]:
+        """
+        @param lines: utf-8 encoded lines of the file, columns are left out if
+        they are not given.
+        """
+        rule = msg.code or DEFAULT_RULE
+        level = _sarif_levels[msg.level]
+        self.rules.setdefault(rule, level)
+
+        physical: Dict[str, Any] = {"artifactLocation": location}
+        if (pos := msg.get_position()) :
+            region = {"startLine": pos.lineno, "endLine": pos.end_lineno}
+            start = _column(lines, pos.lineno, pos.col_offset)
+            end = _column(lines, pos.end_lineno, pos.end_col_offset)
+            if start is not None and end is not None:
+                region["startColumn"] = start
+                region["endColumn"] = end
+            physical["region"] = region
+        return {
+            "ruleId": rule,
+            "level": level,
+            "message": {"text": msg.msg},
+            "locations": [{"physicalLocation": physical}],
+        }
+
+
+def _utf8_lines(path: FilePath) -> Optional[List[bytes]]:
+    """Lines of a source file encoded like the offsets of ast nodes"""
+    try:
+        # bytes are split only at line breaks python counts, unlike str
+        return read_source(path).encode("utf-8", "surrogatepass").splitlines()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _column(lines: Optional[List[bytes]], lineno: int, offset: int) -> Optional[int]:
+    """Column in unicode code points(from 1) of an utf-8 byte offset"""
+    if lines is None or not 0 < lineno <= len(lines) or offset < 0:
+        return None
+    try:
+        return len(lines[lineno - 1][:offset].decode("utf-8")) + 1
+    except UnicodeDecodeError:
+        return None
@@ -0,0 +1,356 @@
+"""Check files in several worker processes.
+
+Files to check are split along the import graph: modules in the same strongly
+connected component always go to the same worker, and components are packed
+into as many groups as there are jobs. Every worker runs its own Manager on a
+group, modules imported from other groups are only preprocessed there(not
+checked), and the preprocessed typeshed is shared through the interface cache
+in config.cache_dir.
+
+Messages of a module only depend on the module and the interfaces of what it
+imports, so the result is the same as checking all files in one manager.
+"""
+
+import os
+import tokenize
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Set, Sequence, Tuple
+from pystatic.cache import ResultCache
+from pystatic.config import Config
+from pystatic.error.message import Message
+from pystatic.fsys import FilePath
+from pystatic.importscan import scan_file
+from pystatic.manager import Manager, crawl_path
+from pystatic.stats import Stats
+from pystatic.symid import SymId, relpath2symid, rel2abssymid, symid_parent
+from pystatic.target import Target
+
+# messages of each file and statistics of the run
+CheckResult = Tuple[Dict[FilePath, List[Message]], Stats]
+# called with the path, symid and messages of a checked file
+FinishCallback = Callable[[FilePath, Optional[SymId], Sequence[Message]], None]
+
+
+def check_files(
+    config: Config,
+    paths: Sequence[FilePath],
+    on_finish: Optional[FinishCallback] = None,
+) -> CheckResult:
+    """Check files in the current process
+
+    Files whose results are in config.result_cache and are not stale are not
+    checked again, their messages are replayed.
+
+    @param on_finish: if given, messages of a file are passed to it as soon as
+    the module is checked instead of being returned.
+    """
+    manager = Manager(config)
+    messages: Dict[FilePath, List[Message]] = {}
+    result_cache = None
+    if config.result_cache:
+        for path in paths:
+            # search paths of the run, results depend on how imports resolve
+            root = crawl_path(os.path.dirname(manager.fsys.realpath(path)))
+            manager.fsys.add_userpath(root)
+        result_cache = ResultCache(config.result_cache, config, manager.fsys)
+        to_check = []
+        for path in dict.fromkeys(paths):
+            cached = result_cache.lookup(path)
+            if manager.stats.enabled:
+                manager.stats.count_cache("result", cached is not None)
+            if cached is None:
+                to_check.append(path)
+            elif on_finish:
+                on_finish(path, *cached)
+            else:
+                messages[path] = cached[1]
+        paths = to_check
+
+    for path in paths:
+        manager.add_check_file(path)
+
+    # target symid -> (path, symid of messages)
+    finish_paths: Dict[SymId, Tuple[FilePath, SymId]] = {}
+    for path in paths:
+        if (symid := manager.get_symid(path)) :
+            finish_paths[manager.get_target_symid(symid)] = (path, symid)
+
+    def finish(target):
+        if (item := finish_paths.get(target.symid)) :
+            path, symid = item
+            path_messages = manager.take_messages_by_symid(symid)
+            if result_cache:
+                _store_result(manager, result_cache, target, path, symid, path_messages)
+            if on_finish:
+                on_finish(path, symid, path_messages)
+            else:
+                messages[path] = list(path_messages)
+
+    manager.on_finish = finish
+    manager.preprocess()
+    manager.infer()
+    manager.on_finish = None
+
+    # messages reported after their module was finished
+    for path in dict.fromkeys(paths):
+        if (path_messages := manager.take_messages(path)) :
+            if result_cache:
+                result_cache.remove(path)
+            if on_finish:
+                on_finish(path, manager.get_symid(path), path_messages)
+            else:
+                messages.setdefault(path, []).extend(path_messages)
+        elif not on_finish:
+            messages.setdefault(path, [])
+
+    if result_cache:
+        result_cache.close()
+    manager.close()
+    return messages, manager.get_stats()
+
+
+def _store_result(
+    manager: Manager,
+    result_cache: ResultCache,
+    target: Target,
+    path: FilePath,
+    symid: SymId,
+    messages: Sequence[Message],
+):
+    """Store messages of a module with the files of all modules it imports
+    and the symids these modules import(typeshed excluded)
+    """
+    typeshed = manager.config.typeshed
+    module_graph = manager.module_graph
+    deps: List[FilePath] = []
+    imports = set(module_graph.get_imports(target.symid))
+    imports.update(module_graph.get_missing(target.symid))
+    visited = {target.symid}
+    stack = [target.symid]
+    while stack:
+        for imported in module_graph.get_imports(stack.pop()):
+            if imported in visited:
+                continue
+            visited.add(imported)
+            stack.append(imported)
+            if (imported_target := manager.get_target(imported)) :
+                dep_path = imported_target.analyse_path
+                if typeshed and dep_path.startswith(typeshed):
+                    continue
+                if os.path.isfile(dep_path):
+                    deps.append(dep_path)
+                    imports.update(module_graph.get_imports(imported))
+                    imports.update(module_graph.get_missing(imported))
+    result_cache.store(path, symid, sorted(deps), sorted(imports), messages)
+
+
+def check_files_parallel(
+    config: Config,
+    paths: Sequence[FilePath],
+    jobs: int,
+    on_finish: Optional[FinishCallback] = None,
+) -> CheckResult:
+    """Check files with at most jobs worker processes
+
+    Statistics of all workers are merged. Messages can't be passed between
+    processes before a worker is done, so on_finish gets the messages of a
+    group when its worker finishes.
+    """
+    groups = split_groups(paths, jobs, config)
+    if len(groups) <= 1:
+        return check_files(config, paths, on_finish)
+
+    messages: Dict[FilePath, List[Message]] = {}
+    stats = Stats(config.stats)
+    with ProcessPoolExecutor(max_workers=len(groups)) as executor:
+        futures = [executor.submit(check_files, config, group) for group in groups]
+        for future in as_completed(futures):
+            group_messages, group_stats = future.result()
+            stats.merge(group_stats)
+            if on_finish:
+                for path, path_messages in group_messages.items():
+                    on_finish(path, module_symid(path), path_messages)
+            else:
+                messages.update(group_messages)
+    return messages, stats
+
+
+def split_groups(
+    paths: Sequence[FilePath], jobs: int, config: Optional[Config] = None
+) -> List[List[FilePath]]:
+    """Split paths into at most jobs groups that can be checked independently.
+
+    Weakly connected components of the import graph are kept in one group when
+    possible. A component larger than the average size of a group is split
+    into its strongly connected components so that big projects can still be
+    spread over all workers.
+    """
+    paths = list(dict.fromkeys(paths))
+    if jobs <= 1 or len(paths) <= 1:
+        return [paths] if paths else []
+
+    graph = import_graph(paths, config)
+    sizes = {path: _file_size(path) for path in paths}
+    share = sum(sizes.values()) / jobs
+
+    units: List[List[FilePath]] = []
+    for component in _weak_components(paths, graph):
+        if sum(sizes[path] for path in component) > share:
+            units.extend(_strong_components(component, graph))
+        else:
+            units.append(component)
+
+    # largest first, each unit goes to the least loaded group
+    units.sort(key=lambda unit: (-sum(sizes[path] for path in unit), unit))
+    groups: List[Tuple[int, int, List[FilePath]]] = [
+        (0, i, []) for i in range(min(jobs, len(units)))
+    ]
+    for unit in units:
+        load, i, group = min(groups)
+        group.extend(unit)
+        groups[i] = (load + sum(sizes[path] for path in unit), i, group)
+
+    order = {path: i for i, path in enumerate(paths)}
+    return [sorted(group, key=order.__getitem__) for _, _, group in groups]
+
+
+def module_symid(path: FilePath) -> SymId:
+    """symid of the module defined in path, a package's symid for __init__.py"""
+    symid = relpath2symid(crawl_path(os.path.dirname(path)), path)
+    if symid.endswith(".__init__"):
+        symid = symid[: -len(".__init__")]
+    return symid
+
+
+def scan_imports(path: FilePath, config: Optional[Config] = None) -> Set[SymId]:
+    """Absolute symids of all modules(and names) imported by a file
+
+    Only imports are scanned(see pystatic.importscan), imports in branches
+    that are never checked under config are skipped.
+    """
+    try:
+        stmts = scan_file(path, config or Config({}))
+    except (OSError, SyntaxError, ValueError, tokenize.TokenError):
+        return set()
+
+    symid = module_symid(path)
+    if os.path.basename(path) == "__init__.py":
+        package = symid
+    else:
+        package = symid_parent(symid)
+
+    result: Set[SymId] = set()
+    for stmt in stmts:
+        if not stmt.names:
+            result.add(stmt.module)
+            continue
+        module = "." * stmt.level + stmt.module
+        module = rel2abssymid(package, module) if stmt.level else module
+        result.add(module)
+        for name in stmt.names:
+            result.add(f"{module}.{name}" if module else name)
+    return result
+
+
+def import_graph(
+    paths: Sequence[FilePath], config: Optional[Config] = None
+) -> Dict[FilePath, List[FilePath]]:
+    """path -> paths it imports, only paths in the argument are considered"""
+    symid_path: Dict[SymId, FilePath] = {}
+    for path in paths:
+        symid_path.setdefault(module_symid(path), path)
+
+    graph: Dict[FilePath, List[FilePath]] = {}
+    for path in paths:
+        deps: Dict[FilePath, None] = {}
+        for imported in sorted(scan_imports(path, config)):
+            names = imported.split(".")
+            for i in range(1, len(names) + 1):
+                dep = symid_path.get(".".join(names[:i]))
+                if dep and dep != path:
+                    deps[dep] = None
+        graph[path] = list(deps)
+    return graph
+
+
+def _file_size(path: FilePath) -> int:
+    try:
+        return max(os.path.getsize(path), 1)
+    except OSError:
+        return 1
+
+
+def _weak_components(
+    paths: List[FilePath], graph: Dict[FilePath, List[FilePath]]
+) -> List[List[FilePath]]:
+    neighbors: Dict[FilePath, Set[FilePath]] = {path: set() for path in paths}
+    for path, deps in graph.items():
+        for dep in deps:
+            neighbors[path].add(dep)
+            neighbors[dep].add(path)
+
+    visited: Set[FilePath] = set()
+    components = []
+    for path in paths:
+        if path in visited:
+            continue
+        visited.add(path)
+        component = []
+        stack = [path]
+        while stack:
+            cur = stack.pop()
+            component.append(cur)
+            for nxt in neighbors[cur]:
+                if nxt not in visited:
+                    visited.add(nxt)
+                    stack.append(nxt)
+        components.append(component)
+    return components
+
+
+def _strong_components(
+    paths: List[FilePath], graph: Dict[FilePath, List[FilePath]]
+) -> List[List[FilePath]]:
+    """Tarjan's algorithm without recursion"""
+    members = set(paths)
+    index: Dict[FilePath, int] = {}
+    lowlink: Dict[FilePath, int] = {}
+    on_stack: Set[FilePath] = set()
+    stack: List[FilePath] = []
+    components: List[List[FilePath]] = []
+
+    for root in paths:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph[root]))]
+        while work:
+            node, deps = work[-1]
+            for dep in deps:
+                if dep not in members:
+                    continue
+                if dep not in index:
+                    index[dep] = lowlink[dep] = len(index)
+                    stack.append(dep)
+                    on_stack.add(dep)
+                    work.append((dep, iter(graph[dep])))
+                    break
+                elif dep in on_stack:
+                    lowlink[node] = min(lowlink[node], index[dep])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        cur = stack.pop()
+                        on_stack.discard(cur)
+                        component.append(cur)
+                        if cur == node:
+                            break
+                    components.append(component)
+    return components
@@ -0,0 +1,95 @@
+"""Check files again whenever they change.
+
+The watcher keeps a daemon(see pystatic.tool.daemon) in the current process.
+Files of all modules it knows(typeshed excluded) are polled with os.stat, once
+a file changed the watcher waits until files stay the same for a short while,
+then changed modules are rechecked together with the modules that import
+them. Only messages that appeared(+) or disappeared(-) are printed again.
+"""
+
+import time
+from typing import Callable, Dict, List, Optional
+from pystatic.config import Config
+from pystatic.fsys import FilePath
+from pystatic.tool.daemon import Daemon
+
+# seconds between two polls
+POLL_INTERVAL = 0.5
+# seconds files must stay the same before they are checked
+DEBOUNCE = 0.2
+
+
+class Watcher:
+    def __init__(self, config: Config, paths: List[FilePath]) -> None:
+        self.daemon = Daemon(config)
+        self.paths = paths
+        # path -> texts of messages printed last time
+        self.messages: Dict[FilePath, List[str]] = {}
+
+    def check(self) -> List[str]:
+        """Check files and return lines of messages that changed"""
+        lines = []
+        first = not self.messages
+        for path, messages in self.daemon.check(self.paths).items():
+            texts = [msg["text"] for msg in messages]
+            old_texts = self.messages.get(path, [])
+            self.messages[path] = texts
+            if first:
+                lines.extend(" ".join([path, text]) for text in texts)
+                continue
+            for text in old_texts:
+                if text not in texts:
+                    lines.append(" ".join(["-", path, text]))
+            for text in texts:
+                if text not in old_texts:
+                    lines.append(" ".join(["+", path, text]))
+        return lines
+
+    def wait_changes(
+        self,
+        interval: float = POLL_INTERVAL,
+        debounce: float = DEBOUNCE,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """Wait until some files changed and then stayed the same for debounce
+        seconds.
+
+        @param timeout: give up after timeout seconds, None means forever.
+
+        return False if timeout.
+        """
+        begin = time.monotonic()
+        while not self.daemon.changed_modules():
+            if timeout is not None and time.monotonic() - begin >= timeout:
+                return False
+            time.sleep(interval)
+
+        # editors may write a file several times when it's saved
+        changed = self.daemon.changed_modules()
+        while True:
+            time.sleep(debounce)
+            new_changed = self.daemon.changed_modules()
+            if new_changed == changed:
+                return True
+            changed = new_changed
+
+    def run(
+        self,
+        output: Callable[[str], None] = print,
+        interval: float = POLL_INTERVAL,
+        debounce: float = DEBOUNCE,
+    ):
+        """Check files until interrupted"""
+        for line in self.check():
+            output(line)
+        try:
+            while True:
+                self.wait_changes(interval, debounce)
+                for line in self.check():
+                    output(line)
+        except KeyboardInterrupt:
+            pass
+
+
+def watch(config: Config, paths: List[FilePath]):
+    Watcher(config, paths).run()
@@ -1,6 +1,7 @@
-import copy
+import weakref
 from abc import ABC, abstractmethod
-from typing import Any, Final, Dict, Type
+from typing import Any, Final, Dict, Set, Type
+from pystatic import stats
 from pystatic.result import Result
 from pystatic.opmap import get_funname, get_opstr
 from pystatic.error.errorcode import *
@@ -9,19 +10,35 @@ if TYPE_CHECKING:
     from pystatic.symtable import SymTable, FunctionSymTable
     from pystatic.infer.util import ApplyArgs, GetItemArgs, WithAst
     from pystatic.predefined import TypeVarIns
-    from pystatic.arg import Argument
+    from pystatic.arg import Argument, MatchPlan
 
-BindList = List[Any]
+BindList = Sequence[Any]
 
 DEFAULT_TYPEVAR_NAME: Final[str] = "__unknown_typevar_name__"
 INFINITE_ARITY: Final[int] = -1
 
+# increased when the class hierarchy(baseclasses, placeholders or typevars)
+# changes, results computed from it are cached until then
+_hierarchy_epoch = 0
+
+
+def hierarchy_changed():
+    global _hierarchy_epoch
+    _hierarchy_epoch += 1
+
+
+def get_hierarchy_epoch() -> int:
+    return _hierarchy_epoch
+
 
 class TypeIns:
+    # interned instances are weakly referenced by the tables of their temps
+    __slots__ = ["temp", "bindlist", "__weakref__"]
+
     def __init__(self, temp: "TypeTemp", bindlist: BindList):
-        # bindlist will be shallowly copied
+        # bindlist is copied to a tuple
         self.temp = temp
-        self.bindlist = bindlist
+        self.bindlist: Tuple[Any, ...] = tuple(bindlist) if bindlist else ()
 
     def get_local_attr(self, name: str, node: Optional[ast.AST]) -> Optional["TypeIns"]:
         return self.temp.get_local_attr(name, self.bindlist)
@@ -39,6 +56,17 @@ class TypeIns:
     def try_getattribute(self, name: str) -> Optional["TypeIns"]:
         return self.temp.getattribute(name, self.bindlist)
 
+    def is_interned(self) -> bool:
+        """Whether this is the instance get_interned of its temp returns"""
+        temp = self.temp
+        if not self.bindlist:
+            return self is temp._cached_ins or self is temp._cached_typetype
+        return temp._interned.get((self.__class__, self.bindlist)) is self
+
+    def cache_key(self) -> Any:
+        """Key of the instance in caches of results that depend on types"""
+        return self
+
     def call(
         self, applyargs: "ApplyArgs", node: Optional[ast.Call]
     ) -> Result["TypeIns"]:
@@ -81,6 +109,10 @@ class TypeIns:
         """
         @param: relax: if True, Any is considered to equiv with any type
         """
+        # interned instances are equal iff they are the same object
+        if self is other:
+            return True
+
         # note that `isinstance(other, TypeIns)` won't reject typeins and typetype
         if relax and (other == any_ins or self == any_ins):
             return True
@@ -96,8 +128,8 @@ class TypeIns:
             temp_arity = self.temp.arity()
             # default bind is Any
             if temp_arity == INFINITE_ARITY:
-                ext_list1 = copy.copy(self.bindlist) if self.bindlist else []
-                ext_list2 = copy.copy(other.bindlist) if other.bindlist else []
+                ext_list1 = list(self.bindlist) if self.bindlist else []
+                ext_list2 = list(other.bindlist) if other.bindlist else []
                 len1 = len(ext_list1)
                 len2 = len(ext_list2)
                 if len1 < len2:
@@ -108,13 +140,13 @@ class TypeIns:
             else:
                 if self.bindlist:
                     diff1 = temp_arity - len(self.bindlist)
-                    ext_list1 = self.bindlist + [any_ins] * diff1
+                    ext_list1 = list(self.bindlist) + [any_ins] * diff1
                 else:
                     ext_list1 = [any_ins] * temp_arity
 
                 if other.bindlist:
                     diff2 = temp_arity - len(other.bindlist)
-                    ext_list2 = other.bindlist + [any_ins] * diff2
+                    ext_list2 = list(other.bindlist) + [any_ins] * diff2
                 else:
                     ext_list2 = [any_ins] * temp_arity
 
@@ -128,6 +160,8 @@ class TypeIns:
 
 
 class TypeType(TypeIns):
+    __slots__ = []
+
     def __init__(self, temp: "TypeTemp", bindlist: BindList):
         super().__init__(temp, bindlist)
 
@@ -177,6 +211,8 @@ class TypeType(TypeIns):
 
 
 class TypeAlias(TypeType):
+    __slots__ = ["alias"]
+
     def __init__(self, alias: str, typetype: TypeType):
         super().__init__(typetype.temp, typetype.bindlist)
         self.alias = alias
@@ -192,6 +228,18 @@ class TypeTemp(ABC):
 
         self._cached_ins = TypeIns(self, [])
         self._cached_typetype = TypeType(self, [])
+        # (class of the instance, bindlist) -> instance, entries are dropped
+        # once the instance is no longer used
+        self._interned: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_interned"] = dict(self._interned)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._interned = weakref.WeakValueDictionary(state["_interned"])
 
     @property
     def basename(self) -> str:
@@ -334,8 +382,8 @@ class TypeTemp(ABC):
         self, bindlist: BindList, itemarg: "GetItemArgs", node: Optional[ast.AST] = None
     ) -> Result["TypeType"]:
         """Mainly used for TypeType to generate correct TypeType"""
-        res_bindlist = []
-        result = Result(TypeType(self, res_bindlist))
+        res_bindlist: List[Any] = []
+        result = Result(self._cached_typetype)
 
         if not self._getitem_typetype_check_bindlist(bindlist, result, node):
             result.value = TypeType(self, bindlist)
@@ -350,6 +398,7 @@ class TypeTemp(ABC):
         for i in range(len_items):
             self._getitem_typetype_accept_item(itemarg.items[i], result, res_bindlist)
         res_bindlist.extend([any_ins] * pad_cnt)
+        result.value = self.get_interned(TypeType, res_bindlist)
         return result
 
     def get_default_typetype(self) -> "TypeType":
@@ -359,11 +408,36 @@ class TypeTemp(ABC):
         if self.arity == 0 or not bindlist:
             return Result(self._cached_ins)
         else:
-            return Result(TypeIns(self, bindlist))
+            return Result(self.get_interned(TypeIns, bindlist))
 
     def get_default_ins(self) -> "TypeIns":
         return self._cached_ins
 
+    def get_interned(self, ins_cls: Type[TypeIns], bindlist: BindList) -> TypeIns:
+        """Get an instance of ins_cls with bindlist
+
+        Instances whose binds are all interned are shared: structurally equal
+        instances are the same object. They must not be modified.
+        """
+        if not bindlist:
+            if self._cached_ins.__class__ is ins_cls:
+                return self._cached_ins
+            elif self._cached_typetype.__class__ is ins_cls:
+                return self._cached_typetype
+        elif not all(
+            isinstance(bind, TypeIns) and bind.is_interned() for bind in bindlist
+        ):
+            # an instance that is equal to a bind but not the same object
+            # would give a different key
+            return ins_cls(self, bindlist)
+
+        key = (ins_cls, tuple(bindlist))
+        ins = self._interned.get(key)
+        if ins is None:
+            ins = ins_cls(self, key[1])
+            self._interned[key] = ins
+        return ins
+
     def get_type_attribute(self, name: str, bindlist: BindList) -> Optional["TypeIns"]:
         """Get attribute that belong to the Type itself, mainly used for TypeType"""
         return self.getattribute(name, bindlist)
@@ -451,6 +525,26 @@ class TypeClassTemp(TypeTemp):
         self._inner_symtable = inner_symtable  # symtable belongs to this cls
         self._def_symtable = def_symtable  # symtable where this cls is defined
 
+        inner_symtable.clstemp = self
+
+        # attribute name -> classes after self in the mro that define it
+        self._attr_table: Dict[str, List[TypeIns]] = {}
+        self._attr_epoch = -1
+        # increased when attributes defined in the class or a class in its
+        # attribute table change
+        self._epoch = 0
+        # classes whose attribute tables include this class
+        self._subclasses: "weakref.WeakSet[TypeClassTemp]" = weakref.WeakSet()
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state["_subclasses"] = list(self._subclasses)
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._subclasses = weakref.WeakSet(state["_subclasses"])
+
     @property
     def module_symid(self) -> str:
         return self._def_symtable.glob_symid
@@ -485,23 +579,51 @@ class TypeClassTemp(TypeTemp):
             return self._inner_symtable.lookup_local(name)
 
     def get_mro_attr(self, name: str, bindlist: BindList) -> Optional["TypeIns"]:
-        from pystatic.predefined import object_ins, object_temp
-
-        res = None
         if self.mro:
-            for basecls in self.mro[1:]:
-                res = basecls.get_local_attr(name, None)
-                if res:
-                    break
-            else:
-                if self != object_temp:
-                    if (res := object_ins.get_local_attr(name, None)) :
-                        return res
-            return res
+            return self._get_base_attr(name)
         return None
 
-    def get_mro(self):
-        """C3 algorithm"""
+    def get_attr_names(self) -> Set[str]:
+        """Names of attributes defined in the class itself"""
+        return self.var_attr.keys() | self._inner_symtable.local.keys()
+
+    def attributes_changed(self):
+        """Called when attributes defined in the class or its mro change"""
+        self._epoch += 1
+        for subclass in self._subclasses:
+            subclass._epoch += 1
+
+    def _get_base_attr(self, name: str) -> Optional["TypeIns"]:
+        """Look up name in classes after self in the mro and object"""
+        if self._attr_epoch != self._epoch:
+            self._build_attr_table()
+        for basecls in self._attr_table.get(name, ()):
+            res = basecls.get_local_attr(name, None)
+            if res:
+                return res
+        return None
+
+    def _build_attr_table(self):
+        from pystatic.predefined import object_ins, object_temp
+
+        bases = self.mro[1:] if self.mro else []
+        if self != object_temp:
+            bases = bases + [object_ins]
+
+        table: Dict[str, List[TypeIns]] = {}
+        for basecls in bases:
+            if isinstance(basecls.temp, TypeClassTemp):
+                basecls.temp._subclasses.add(self)
+                for name in basecls.temp.get_attr_names():
+                    table.setdefault(name, []).append(basecls)
+        self._attr_table = table
+        self._attr_epoch = self._epoch
+
+    def get_mro(self) -> List[TypeIns]:
+        """C3 algorithm
+
+        The result is cached and shared, it must not be modified.
+        """
         from pystatic.predefined import object_temp
 
         # TODO: avoid recursion
@@ -509,12 +631,12 @@ class TypeClassTemp(TypeTemp):
 
         # type parameter is not concerned
         if self.mro is not None:
-            return list(self.mro)  # copy of self.mro
+            return self.mro
         to_merge = []
         for base in self.baseclass:
             base_mro = base.temp.get_mro()
             if base_mro:
-                to_merge.append(base_mro)
+                to_merge.append(list(base_mro))
 
         if self.baseclass:
             to_merge.append(list(self.baseclass))  # append a copy of baseclasses
@@ -542,31 +664,25 @@ class TypeClassTemp(TypeTemp):
         self.mro = [self.get_default_ins()] + cur_ans
         if self.mro[-1].temp is object_temp:
             self.mro = self.mro[:-1]
-        return list(self.mro)  # copy of self.mro
+        self.attributes_changed()
+        return self.mro
 
     def getins(self, bindlist: BindList) -> Result["TypeIns"]:
         if self.arity == 0 or not bindlist:
             return Result(self._cached_ins)
         else:
-            return Result(TypeClassIns(self, bindlist))
+            return Result(self.get_interned(TypeClassIns, bindlist))
 
     def getattribute(self, name: str, bindlist: BindList) -> Optional["TypeIns"]:
-        from pystatic.predefined import object_temp, object_ins
-
         res = self.get_local_attr(name, bindlist)
         if not res:
-            if self.mro:
-                for basecls in self.mro[1:]:
-                    res = basecls.get_local_attr(name, None)
-                    if res:
-                        break
-            if not res and self != object_temp:
-                if (res := object_ins.get_local_attr(name, None)) :
-                    return res
+            res = self._get_base_attr(name)
         return res
 
 
 class TypeClassIns(TypeIns):
+    __slots__ = []
+
     def __init__(self, temp: "TypeClassTemp", bindlist: BindList):
         self.temp: "TypeClassTemp"
         super().__init__(temp, bindlist)
@@ -659,15 +775,45 @@ class TypeModuleTemp(TypeTemp):
 
 
 class OverloadItem:
-    __slots__ = ["argument", "ret_type"]
+    __slots__ = ["argument", "ret_type", "is_overload", "_plan"]
 
-    def __init__(self, argument: "Argument", ret_type: "TypeIns") -> None:
+    def __init__(
+        self, argument: "Argument", ret_type: "TypeIns", is_overload: bool = False
+    ) -> None:
         self.argument = argument
         self.ret_type = ret_type
+        # decorated by typing.overload
+        self.is_overload = is_overload
+        self._plan: Optional["MatchPlan"] = None
+
+    def get_plan(self) -> "MatchPlan":
+        if self._plan is None:
+            from pystatic.arg import MatchPlan
+
+            self._plan = MatchPlan(self.argument)
+        return self._plan
+
+
+# (positional argument keys, keyword argument names and keys)
+CallKey = Tuple[Tuple[Any, ...], Tuple[Tuple[str, Any], ...]]
+
+CALL_CACHE_SIZE: Final[int] = 256
 
 
-# TODO: add overload matching
 class TypeFuncIns(TypeIns):
+    __slots__ = [
+        "overloads",
+        "funname",
+        "module_symid",
+        "self_bind",
+        "_inner_symtable",
+        "is_method",
+        "is_classmethod",
+        "is_staticmethod",
+        "_call_cache",
+        "_call_epoch",
+    ]
+
     def __init__(
         self,
         funname: str,
@@ -690,9 +836,22 @@ class TypeFuncIns(TypeIns):
         self.is_classmethod: bool = False
         self.is_staticmethod: bool = False
 
+        # types of arguments -> the item matched without errors
+        self._call_cache: Dict[CallKey, OverloadItem] = {}
+        self._call_epoch = -1
+
     def add_overload(self, argument: "Argument", ret: TypeIns):
         self.overloads.append(OverloadItem(argument, ret))
 
+    def get_call_overloads(self) -> List[OverloadItem]:
+        """Items a call is matched against
+
+        If some items are decorated by overload, the others(the implementation
+        and redefinitions) are not used, otherwise only the first one is.
+        """
+        items = [item for item in self.overloads if item.is_overload]
+        return items or self.overloads[:1]
+
     def get_inner_symtable(self) -> "FunctionSymTable":
         return self._inner_symtable
 
@@ -723,19 +882,73 @@ class TypeFuncIns(TypeIns):
     def call(
         self, applyargs: "ApplyArgs", node: Optional[ast.AST]
     ) -> Result["TypeIns"]:
-        # TODO: deal with overloads(find a best match)
+        """Match the call against overloads in order, the first one that
+        matches without errors decides the return type.
+
+        If none matches, errors of the first item whose arity matches are
+        reported.
+        """
         from pystatic.arg import match_argument
 
         assert self.overloads
         if self.self_bind:
             applyargs.add_arg_front(self.self_bind[0], self.self_bind[1])
 
-        error_list = match_argument(self.overloads[0].argument, applyargs, node)
-        ret_result = Result(self.overloads[0].ret_type)
-        ret_result.add_err_list(error_list)
+        key = _call_key(applyargs)
+        if key is not None:
+            if self._call_epoch != get_hierarchy_epoch():
+                self._call_cache.clear()
+                self._call_epoch = get_hierarchy_epoch()
+            matched = self._call_cache.get(key)
+            if stats.active:
+                stats.active.count_cache("overload", matched is not None)
+            if matched:
+                return Result(matched.ret_type)
+
+        items = self.get_call_overloads()
+        fallback: Optional[Tuple[OverloadItem, List[ErrorCode]]] = None
+        for item in items:
+            if len(items) > 1 and not item.get_plan().may_match(applyargs):
+                continue
+            error_list = match_argument(item.argument, applyargs, node)
+            if not error_list:
+                if key is not None:
+                    if len(self._call_cache) >= CALL_CACHE_SIZE:
+                        self._call_cache.clear()
+                    self._call_cache[key] = item
+                return Result(item.ret_type)
+            elif not fallback:
+                fallback = (item, error_list)
+
+        if not fallback:
+            # arity of all overloads mismatch
+            item = items[0]
+            fallback = (item, match_argument(item.argument, applyargs, node))
+        ret_result = Result(fallback[0].ret_type)
+        ret_result.add_err_list(fallback[1])
         return ret_result
 
 
+def _value_key(value: Any) -> Any:
+    return value.cache_key() if isinstance(value, TypeIns) else value
+
+
+def _call_key(applyargs: "ApplyArgs") -> Optional[CallKey]:
+    """Key of the types of arguments, None if the call can't be cached"""
+    if applyargs.vararg or applyargs.varkwarg:
+        return None
+    kwargs = applyargs.kwargs
+    key = (
+        tuple(_value_key(arg.value) for arg in applyargs.args),
+        tuple((name, _value_key(kwargs[name].value)) for name in sorted(kwargs)),
+    )
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
 any_temp = TypeAnyTemp()
 any_ins = any_temp.get_default_ins()
 any_type = any_temp.get_default_typetype()
@@ -1,6 +1,7 @@
 import ast
-from typing import Optional
+from typing import Callable, Dict, List, Optional
 from pystatic.reach import Reach
+from pystatic import stats
 
 
 class VisitException(Exception):
@@ -17,21 +18,75 @@ class VisitException(Exception):
         self.msg = msg
 
 
+def _ast_node_types() -> List[type]:
+    """All node classes defined in the ast module"""
+    types = []
+    stack: List[type] = [ast.AST]
+    while stack:
+        cur = stack.pop()
+        types.append(cur)
+        stack.extend(cur.__subclasses__())
+    return types
+
+
+_node_types = _ast_node_types()
+
+
+def _find_visit_func(cls: type, node_type: type) -> Callable:
+    """visit_XXX function of cls for node_type, visit_missing if there's none"""
+    func = getattr(cls, "visit_" + node_type.__name__, None)
+    if func is None:
+        func = getattr(cls, "visit_missing")
+    return func
+
+
+def _build_dispatch(cls: type) -> Dict[type, Callable]:
+    """node type -> function of cls that visits it"""
+    return {node_type: _find_visit_func(cls, node_type) for node_type in _node_types}
+
+
 class BaseVisitor(object):
+    """Visit node with the visit_XXX method where XXX is the class name of the
+    node, nodes without such a method go to visit_missing(generic_visit by
+    default).
+
+    visit_XXX methods(and visit_missing for the other nodes) are looked up
+    once when a visitor class is created, they must not be added to the class
+    or the instance later.
+    """
+
+    _dispatch: Dict[type, Callable] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = _build_dispatch(cls)
+
     def whether_visit(self, node):
         if getattr(node, "reach", Reach.UNKNOWN) != Reach.REDEFINE:
             return True
         return False
 
     def get_visit_func(self, node):
-        method = "visit_" + node.__class__.__name__
-        next_visitor = getattr(self, method, self.generic_visit)
-        return next_visitor
+        return self._get_func(node.__class__).__get__(self)
+
+    def _get_func(self, node_type: type) -> Callable:
+        func = self._dispatch.get(node_type)
+        if func is None:
+            # node classes unknown when the table was built(subclasses of ast
+            # nodes defined later)
+            func = _find_visit_func(self.__class__, node_type)
+            self.__class__._dispatch[node_type] = func
+        return func
 
     def visit(self, node, *args, **kwargs):
+        if stats.active:
+            stats.active.count_visit(self)
         if self.whether_visit(node):
-            visit_func = self.get_visit_func(node)
-            return visit_func(node, *args, **kwargs)
+            return self._get_func(node.__class__)(self, node, *args, **kwargs)
+
+    def visit_missing(self, node, *args, **kwargs):
+        """Called for nodes without a visit_XXX method"""
+        return self.generic_visit(node, *args, **kwargs)
 
     def generic_visit(self, node, *args, **kwargs):
         rt = None
@@ -48,21 +103,23 @@ class BaseVisitor(object):
         return self.visit(node)
 
 
+BaseVisitor._dispatch = _build_dispatch(BaseVisitor)
+
+
 class VisitorMethodNotFound(Exception):
     pass
 
 
 class NoGenVisitor(BaseVisitor):
+    """Visitor without generic_visit, subclasses decide what nodes without a
+    visit_XXX method mean by overriding visit_missing.
+    """
+
     def __init__(self):
         super().__init__()
 
-    def visit(self, node, *args, **kwargs):
-        if self.whether_visit(node):
-            visit_func = self.get_visit_func(node)
-            if visit_func == self.generic_visit:
-                raise VisitorMethodNotFound
-            else:
-                return visit_func(node, *args, **kwargs)
+    def visit_missing(self, node, *args, **kwargs):
+        raise VisitorMethodNotFound
 
 
 class ValueUnParser(BaseVisitor):
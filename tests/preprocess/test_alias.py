@@ -62,3 +62,18 @@ def test_alias():
 
     UD = manager.infer_expr(symid, 'UD')
     assert not isinstance(UD, TypeAlias)
+
+
+def test_alias_base():
+    symid = 'preprocess.prep_alias'
+    manager, filepath = get_manager_path({}, symid)
+    manager.preprocess()
+
+    E_temp = manager.infer_expr(symid, 'E').temp
+    assert isinstance(E_temp, TypeClassTemp)
+    assert len(E_temp.baseclass) == 1
+    base = E_temp.baseclass[0]
+    assert base.temp is list_temp
+    assert base.bindlist
+    assert len(base.bindlist) == 1
+    assert base.bindlist[0].temp is int_temp
@@ -12,3 +12,7 @@ def test_simple_function():
 
 def test_class_function():
     error_assert("preprocess.prep_class_function")
+
+
+def test_overload():
+    error_assert("preprocess.prep_overload")
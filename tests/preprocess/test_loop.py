@@ -0,0 +1,39 @@
+import sys
+
+sys.path.extend([".", ".."])
+
+from pystatic.error.errorbox import ErrorBox
+from pystatic.preprocess.topo import DependencyGraph
+from ..util import error_assert
+
+
+class _Def:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.def_prepinfo = self
+        self.glob_symid = "test"
+        self.defnode = None
+
+
+def test_reference_loop():
+    error_assert("preprocess.prep_loop")
+
+
+def test_components():
+    a, b, c, d = _Def("a"), _Def("b"), _Def("c"), _Def("d")
+    graph = DependencyGraph(ErrorBox("test"))
+    graph.add_dependency(a, b)
+    graph.add_dependency(b, c)
+    graph.add_dependency(c, b)
+    graph.add_prepdef(d)
+    assert graph.components() == [[b, c], [a], [d]]
+    assert len(graph.errbox.error) == 1
+
+
+def test_long_chain():
+    defs = [_Def(str(i)) for i in range(sys.getrecursionlimit() * 2)]
+    graph = DependencyGraph(ErrorBox("test"))
+    for prepdef, depend in zip(defs, defs[1:]):
+        graph.add_dependency(prepdef, depend)
+    assert graph.toposort() == defs[::-1]
+    assert not graph.errbox.error
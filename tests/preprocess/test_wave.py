@@ -0,0 +1,61 @@
+import sys
+
+sys.path.extend([".", ".."])
+
+from pystatic.config import Config
+from pystatic.manager import Manager
+from pystatic.target import MethodTarget, Stage
+
+
+def test_import_closure_in_one_wave(tmp_path):
+    (tmp_path / 'a.py').write_text('from b import B\nclass A(B):\n    pass\n')
+    (tmp_path / 'b.py').write_text('import c\nclass B(c.C):\n    pass\n')
+    (tmp_path / 'c.py').write_text('class C:\n    def f(self):\n        self.x = 1\n')
+
+    manager = Manager(Config({'cwd': str(tmp_path), 'no_typeshed': True}))
+    manager.add_check_file(str(tmp_path / 'a.py'))
+    pre_proc = manager.pre_proc
+    pre_proc.running = True
+    wave = pre_proc.collect_wave()
+    assert [target.symid for target in wave] == ['a', 'b', 'c']
+    pre_proc.resolve_wave(wave)
+    # method bodies are collected in the next wave
+    assert [target.symid for target in manager.q_preprocess] == ['C.f']
+    assert isinstance(manager.q_preprocess[0], MethodTarget)
+
+    pre_proc.process()
+    assert manager.get_target('a').stage == Stage.Infer
+    assert manager.get_target('b').stage == Stage.FINISH
+
+
+def test_function_bodies_in_one_wave(tmp_path):
+    (tmp_path / 'a.py').write_text(
+        'def f():\n'
+        '    x: int = 1\n'
+        '    def inner():\n'
+        '        y: str = "y"\n'
+        'def g():\n'
+        '    z: int = "z"\n'
+        'class C:\n'
+        '    def m(self):\n'
+        '        w: int = 1\n'
+    )
+
+    manager = Manager(Config({'cwd': str(tmp_path), 'no_typeshed': True}))
+    manager.add_check_file(str(tmp_path / 'a.py'))
+    manager.preprocess()
+    waves = []
+    preprocess_blocks = manager.preprocess_blocks
+
+    def record(blk_targets):
+        waves.append([target.symid for target in blk_targets])
+        preprocess_blocks(blk_targets)
+
+    manager.preprocess_blocks = record
+    manager.infer()
+    # f and g share one wave, methods were preprocessed with their class
+    # and the nested function needs the body of f
+    assert len(waves) == 2
+    assert len(waves[0]) == 2
+    assert len(waves[1]) == 1
+    assert len(manager.take_messages(str(tmp_path / 'a.py'))) == 1
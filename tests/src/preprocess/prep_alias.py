@@ -1,4 +1,4 @@
-from typing import Union, Optional
+from typing import Union, Optional, List
 from .extend_alias import A_ext
 
 
@@ -24,3 +24,8 @@ OA = Optional[A]
 a = A()
 b = B()
 UD = 'D'
+LI = List[int]
+
+
+class E(LI):
+    pass
@@ -0,0 +1,10 @@
+class A(B):  # E reference loop: (preprocess.prep_loop line 1 col 0) -> (preprocess.prep_loop line 5 col 0) -> (preprocess.prep_loop line 1 col 0)
+    pass
+
+
+class B(A):  # E reference loop: (preprocess.prep_loop line 1 col 0) -> (preprocess.prep_loop line 5 col 0) -> (preprocess.prep_loop line 1 col 0)
+    pass
+
+
+class C(C):  # E reference loop: (preprocess.prep_loop line 9 col 0) -> (preprocess.prep_loop line 9 col 0)
+    pass
@@ -0,0 +1,17 @@
+from typing import overload
+
+
+class A:
+    @overload
+    def f(self, a: int) -> int: ...
+    @overload
+    def f(self, a: str, b: int = 1) -> str: ...
+    def f(self, a, b=1):
+        return a
+
+
+def use(a: A) -> None:
+    x: int = a.f(1)
+    y: str = a.f('s', 2)
+    z: str = a.f(1)  # E Incompatible type in assignment(expression has type 'int', variable has type 'str')
+    a.f(1, 2, 3)  # E Too more arguments
@@ -40,3 +40,9 @@ def foo7(a: int, b, *args, c: int, **kwargs: bool):
 
 foo7(a=1, b=2, c=3, d=4)  # E Incompatible type for parameter **kwargs(get 'Literal[4]', expect 'bool')
 foo7(1, 'hello', 3, c=2, d=True)
+
+def foo8(a: int, b: int = 1, *, c: str = '') -> None:
+    return None
+
+foo8(1)
+foo8(1, c=1)  # E Incompatible type for parameter c(get 'Literal[1]', expect 'str')
@@ -0,0 +1,46 @@
+import sys
+
+sys.path.extend(['.', '..'])
+
+from benchmarks.generate import ProjectShape, generate_project
+from benchmarks.run import compare, run_case
+from benchmarks.timing import STAGES
+from benchmarks.visitor import count_visits, run as run_visitor
+
+
+def test_generate_project(tmp_path):
+    shape = ProjectShape(modules=3, classes=2, functions=2, import_depth=2)
+    paths = generate_project(str(tmp_path), shape)
+    assert len(paths) == 3
+    assert 'from benchproj.mod0 import' in open(paths[2]).read()
+
+
+def test_run_case():
+    shape = ProjectShape(modules=2, classes=1, functions=1, import_depth=1)
+    case = run_case(shape, 1, False)
+    assert set(STAGES) <= set(case['stages'])
+    assert case['stages']['total'] > 0
+    assert case['messages'] >= 2
+
+
+def test_compare():
+    baseline = {'cases': {'small': {'stages': {'resolve': 1.0, 'total': 2.0}}}}
+    current = {'cases': {'small': {'stages': {'resolve': 1.5, 'total': 2.01}}}}
+    regressions = compare(baseline, current, 0.2, 0.005)
+    assert len(regressions) == 1 and regressions[0].startswith('small.resolve')
+    assert not compare(baseline, current, 0.6, 0.005)
+
+
+def test_visitor_benchmark():
+    shape = ProjectShape(modules=2, classes=1, functions=1, import_depth=1)
+    rates = run_visitor(shape, 1)
+    assert set(rates) == {'generic', 'nogen'}
+    assert all(rate > 0 for rate in rates.values())
+
+
+def test_count_visits():
+    shape = ProjectShape(modules=2, classes=1, functions=1, import_depth=1)
+    visits = count_visits(shape)
+    assert visits['TypeDefVisitor'] > 0 and visits['InferVisitor'] > 0
+    # dependencies are recorded while definitions are collected
+    assert '_FirstPrepDefVisitor' not in visits
@@ -0,0 +1,153 @@
+import os
+import sys
+
+sys.path.extend(['.', '..'])
+
+from pystatic.cache import AstCache, ResultCache
+from pystatic.config import Config
+from pystatic.fsys import Filesys
+from pystatic.manager import Manager
+from pystatic.tool.parallel import check_files
+
+
+def test_ast_cache(tmp_path):
+    src = tmp_path / 'mod.py'
+    src.write_text('a: int = 1\n')
+    cache = AstCache(str(tmp_path / 'cache'))
+
+    tree = cache.parse(str(src))
+    assert os.path.isfile(cache.entry_path(str(src)))
+    # modification of the returned tree must not affect the cache
+    setattr(tree.body[0], 'reach', None)
+    cached = cache.parse(str(src))
+    assert cached is not tree
+    assert not hasattr(cached.body[0], 'reach')
+
+    src.write_text('a: int = 1\nb: str = "s"\n')
+    os.utime(src, ns=(1, 1))
+    assert len(cache.parse(str(src)).body) == 2
+
+
+def test_manager_ast_cache(tmp_path):
+    src = tmp_path / 'mod.py'
+    src.write_text('a: int = "s"\n')
+    config = {'cwd': str(tmp_path), 'cache_dir': 'cache'}
+
+    messages = []
+    for _ in range(2):
+        manager = Manager(Config(config))
+        manager.add_check_file(str(src))
+        manager.preprocess()
+        manager.infer()
+        messages.append([str(msg) for msg in manager.take_messages(str(src))])
+
+    assert os.path.isdir(tmp_path / 'cache')
+    assert messages[0] and messages[0] == messages[1]
+
+    config['no_cache'] = True
+    assert Config(config).cache_dir is None
+
+
+def test_result_cache(tmp_path):
+    a = tmp_path / 'a.py'
+    b = tmp_path / 'b.py'
+    c = tmp_path / 'c.py'
+    a.write_text('from b import y\nx: int = "a"\ndef f() -> int:\n    return y\n')
+    b.write_text('y: int = 1\n')
+    c.write_text('z: int = "c"\n')
+    paths = [str(a), str(b), str(c)]
+    config = Config(
+        {'cwd': str(tmp_path), 'cache_dir': 'cache', 'result_cache': True, 'stats': True}
+    )
+    assert os.path.basename(config.result_cache) == 'results.sqlite'
+
+    def run():
+        messages, stats = check_files(config, paths)
+        texts = {path: [str(msg) for msg in messages[path]] for path in paths}
+        return texts, stats.cache_hits['result']
+
+    first, hits = run()
+    assert hits == 0 and len(first[str(a)]) == 1
+    assert run() == (first, 3)
+
+    # a imports b, so both are checked again
+    b.write_text('y: str = "b"\n')
+    texts, hits = run()
+    assert hits == 1
+    assert len(texts[str(a)]) == 2 and texts[str(c)] == first[str(c)]
+    assert run() == (texts, 3)
+
+
+def test_result_cache_imports(tmp_path):
+    a = tmp_path / 'a.py'
+    a.write_text('from lib import y\ndef f() -> int:\n    return y\n')
+    config = Config({'cwd': str(tmp_path), 'cache_dir': 'cache', 'result_cache': True})
+
+    def run():
+        messages, _ = check_files(config, [str(a)])
+        return [str(msg) for msg in messages[str(a)]]
+
+    first = run()
+    assert run() == first
+
+    # the module a failed to import is created
+    (tmp_path / 'lib.py').write_text('y: str = "s"\n')
+    second = run()
+    assert len(second) == 1 and second != first
+    assert run() == second
+
+    # a stub shadows the module
+    (tmp_path / 'lib.pyi').write_text('y: int\n')
+    assert run() == []
+
+
+def test_result_cache_lock(tmp_path):
+    import sqlite3
+
+    src = tmp_path / 'mod.py'
+    src.write_text('a: int = 1\n')
+    config = Config({'cwd': str(tmp_path), 'cache_dir': 'cache', 'result_cache': True})
+    caches = [
+        ResultCache(config.result_cache, config, Filesys(config)) for _ in range(2)
+    ]
+    caches[0].store(str(src), 'mod', [], [], [])
+
+    # other workers can write while a worker is running
+    conn = sqlite3.connect(config.result_cache, timeout=0)
+    conn.execute('DELETE FROM results')
+    conn.commit()
+    conn.close()
+    caches[1].store(str(src), 'mod', [], [], [])
+    caches[1].close()
+    caches[0].close()
+    cache = ResultCache(config.result_cache, config, Filesys(config))
+    assert cache.lookup(str(src)) == ('mod', [])
+    cache.close()
+
+
+def test_result_cache_typeshed(tmp_path):
+    import shutil
+    from pystatic.config import pystatic_dir
+
+    typeshed = tmp_path / 'typeshed'
+    shutil.copytree(os.path.join(pystatic_dir, 'faketypeshed'), str(typeshed))
+    src = tmp_path / 'mod.py'
+    src.write_text('from stubmod import v\ndef f() -> int:\n    return v\n')
+    stubs = typeshed / 'stdlib' / '2and3'
+    (stubs / 'stubmod.pyi').write_text('v: int\n')
+    config = Config(
+        {
+            'cwd': str(tmp_path),
+            'cache_dir': 'cache',
+            'result_cache': True,
+            'typeshed': str(typeshed),
+        }
+    )
+
+    def run():
+        messages, _ = check_files(config, [str(src)])
+        return [str(msg) for msg in messages[str(src)]]
+
+    assert run() == []
+    (stubs / 'stubmod.pyi').write_text('w: int\nv: str\n')
+    assert len(run()) == 1
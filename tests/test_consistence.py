@@ -24,3 +24,41 @@ def test_consistence():
     assert bool1
     assert not is_consistent(list_int, list_str)
     assert is_consistent(list_int, list_int2)
+
+
+def test_consistent_cache():
+    from pystatic.consistent import consistent_cache
+    from pystatic.predefined import TypeClassTemp, int_ins
+    from pystatic.symtable import SymTable, TableScope
+    from pystatic.typesys import hierarchy_changed
+
+    symtable = SymTable("cache_test", None, None, None, None, TableScope.GLOB)
+    temp = TypeClassTemp("A", symtable, symtable.new_symtable("A", TableScope.CLASS))
+    a_ins = temp.get_default_ins()
+    assert not is_consistent(int_ins, a_ins)
+
+    hits = consistent_cache.hits
+    assert not is_consistent(int_ins, a_ins)
+    assert consistent_cache.hits == hits + 1
+
+    # A becomes a subclass of int
+    temp.baseclass = [int_ins]
+    temp.mro = None
+    hierarchy_changed()
+    assert is_consistent(int_ins, a_ins)
+
+
+def test_consistent_cache_weak():
+    import gc
+    import weakref
+    from pystatic.predefined import TypeClassTemp, int_ins
+    from pystatic.symtable import SymTable, TableScope
+
+    symtable = SymTable("weak_test", None, None, None, None, TableScope.GLOB)
+    temp = TypeClassTemp("A", symtable, symtable.new_symtable("A", TableScope.CLASS))
+    assert not is_consistent(int_ins, temp.get_default_ins())
+    temp_ref = weakref.ref(temp)
+    del temp, symtable
+    gc.collect()
+    # the cache doesn't keep types alive
+    assert temp_ref() is None
@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+import threading
+
+sys.path.extend(['.', '..'])
+
+from pystatic.config import Config
+from pystatic.tool.daemon import Daemon, serve, request
+
+
+def _touch(path, content):
+    # make sure the change is visible even if mtime has a coarse resolution
+    mtime = os.stat(path).st_mtime_ns + 10 ** 9
+    path.write_text(content)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_daemon_recheck(tmp_path):
+    a = tmp_path / 'a.py'
+    b = tmp_path / 'b.py'
+    a.write_text('from b import y\nx: int = "a"\ndef f() -> int:\n    return y\n')
+    b.write_text('y: int = 1\n')
+    config = Config({'cwd': str(tmp_path), 'cache_dir': 'cache'})
+    daemon = Daemon(config)
+
+    res = daemon.handle({'command': 'check', 'files': [str(a)]})
+    assert res['ok']
+    first = res['messages'][str(a)]
+    assert len(first) == 1 and first[0]['lineno'] == 2
+
+    # nothing changed, messages are served from memory
+    res = daemon.handle({'command': 'check', 'files': [str(a)]})
+    assert res['messages'][str(a)] == first
+
+    # a changed imported module rechecks its importers
+    _touch(b, 'y: str = "b"\n')
+    res = daemon.handle({'command': 'check', 'files': [str(a), str(b)]})
+    assert [msg['lineno'] for msg in res['messages'][str(a)]] == [2, 4]
+    assert res['messages'][str(b)] == []
+
+    _touch(a, 'from b import y\n')
+    res = daemon.handle({'command': 'check', 'files': [str(a)]})
+    assert res['messages'][str(a)] == []
+
+    assert not daemon.handle({'command': 'unknown'})['ok']
+
+
+def test_daemon_socket(tmp_path):
+    a = tmp_path / 'a.py'
+    a.write_text('x: int = "a"\n')
+    config = Config({'cwd': str(tmp_path), 'cache_dir': 'cache'})
+    socket_path = str(tmp_path / 'daemon.sock')
+
+    thread = threading.Thread(target=serve, args=(config, socket_path))
+    thread.start()
+    try:
+        for _ in range(100):
+            if os.path.exists(socket_path):
+                break
+            time.sleep(0.05)
+        res = request(socket_path, {'command': 'check', 'files': [str(a)]})
+        assert res['ok']
+        assert len(res['messages'][str(a)]) == 1
+        assert request(socket_path, {'command': 'status'})['files'] >= 1
+    finally:
+        request(socket_path, {'command': 'stop'})
+        thread.join(10)
+    assert not thread.is_alive()
+    assert not os.path.exists(socket_path)
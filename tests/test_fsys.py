@@ -0,0 +1,46 @@
+import sys
+
+sys.path.extend(['.', '..'])
+
+from pystatic.config import Config
+from pystatic.fsys import Filesys, ModuleFindRes
+
+
+def test_find_module_cache(tmp_path):
+    (tmp_path / 'pkg').mkdir()
+    (tmp_path / 'pkg' / '__init__.py').write_text('')
+    (tmp_path / 'pkg' / 'mod.py').write_text('')
+    (tmp_path / 'ns').mkdir()
+    fsys = Filesys(Config({'cwd': str(tmp_path), 'no_typeshed': True}))
+
+    res = fsys.find_module('pkg.mod')
+    assert res and res.res_type == ModuleFindRes.Module
+    assert res.paths == [str(tmp_path / 'pkg' / 'mod.py')]
+    assert fsys.find_module('pkg').res_type == ModuleFindRes.Package
+    assert fsys.find_module('ns').res_type == ModuleFindRes.Namespace
+    assert fsys.find_module('pkg.mod.x') is None
+    assert fsys.find_module('pkg.missing') is None
+
+    # results are memoized, callers get copies
+    count = fsys.syscall_count
+    res.paths[0] = 'modified'
+    assert fsys.find_module('pkg.mod').paths[0] != 'modified'
+    assert fsys.find_module('pkg.missing') is None
+    assert fsys.syscall_count == count
+
+    (tmp_path / 'pkg' / 'missing.py').write_text('')
+    assert fsys.find_module('pkg.missing') is None
+    fsys.clear_cache()
+    assert fsys.find_module('pkg.missing')
+
+
+def test_find_module_userpath(tmp_path):
+    (tmp_path / 'a.py').write_text('')
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'b.py').write_text('')
+    fsys = Filesys(Config({'cwd': str(tmp_path), 'no_typeshed': True}))
+
+    assert fsys.find_module('b') is None
+    fsys.add_userpath(str(tmp_path / 'sub'))
+    assert fsys.find_module('b')
+    assert fsys.find_module('a')
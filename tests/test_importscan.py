@@ -0,0 +1,91 @@
+import sys
+
+sys.path.extend(['.', '..'])
+
+from pystatic.config import Config
+from pystatic.importscan import ImportStmt, scan_source
+
+SOURCE = '''\
+import os, sys as system
+from typing import TYPE_CHECKING
+from . import a
+from ..pkg.mod import (
+    b,  # comment
+    c as d,
+)
+doc = """
+import fake
+"""
+if TYPE_CHECKING:
+    from e import f
+else:
+    import g
+if sys.version_info >= (3, 0):
+    import h
+elif sys.version_info < (2, 0):
+    import i
+else:
+    import j
+for x in range(3): import k
+try:
+    import l
+except ImportError:
+    pass
+
+def func():
+    from m import *; import n
+'''
+
+
+def _modules(source, config):
+    return [('.' * stmt.level + stmt.module, stmt.names)
+            for stmt in scan_source(source, config)]
+
+
+def test_scan_imports():
+    config = Config({})
+    config.python_version = (3, 8)
+    stmts = scan_source(SOURCE, config)
+    assert stmts[0] == ImportStmt(0, 'os', [], 1)
+    assert stmts[1] == ImportStmt(0, 'sys', [], 1)
+    assert ImportStmt(2, 'pkg.mod', ['b', 'c'], 4) in stmts
+    assert _modules(SOURCE, config) == [
+        ('os', []),
+        ('sys', []),
+        ('typing', ['TYPE_CHECKING']),
+        ('.', ['a']),
+        ('..pkg.mod', ['b', 'c']),
+        ('e', ['f']),
+        ('h', []),
+        ('k', []),
+        ('l', []),
+        ('m', ['*']),
+        ('n', []),
+    ]
+
+
+def test_scan_version():
+    config = Config({})
+    config.python_version = (2, 7)
+    modules = [module for module, _ in _modules(SOURCE, config)]
+    assert 'h' not in modules and 'i' not in modules
+    assert 'j' in modules
+
+
+def test_scan_docstring_quote():
+    source = (
+        'def f():\n'
+        "    '''Don't do\n"
+        "    this'''\n"
+        'import os\n'
+        'from pkg import mod\n'
+        '\n'
+        'def g():\n'
+        "    '''Docs.'''\n"
+        '    s = """\n'
+        '    import sys"""\n'
+    )
+    assert scan_source(source, Config({})) == [
+        ImportStmt(0, 'os', [], 4),
+        ImportStmt(0, 'pkg', ['mod'], 5),
+    ]
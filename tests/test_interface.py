@@ -0,0 +1,53 @@
+import os
+import sys
+
+sys.path.extend(['.', '..'])
+
+from pystatic.interface import file_fingerprint, fingerprint_valid
+from pystatic.config import Config
+from pystatic.manager import Manager
+from pystatic.predefined import int_temp
+
+
+def check(config: dict):
+    cwd = os.path.join(os.path.dirname(__file__), 'src')
+    path = os.path.join(cwd, 'check', 'check_assign.py')
+    manager = Manager(Config({'cwd': cwd, **config}))
+    manager.add_check_file(path)
+    manager.preprocess()
+    manager.infer()
+    return manager, [str(msg) for msg in manager.take_messages(path)]
+
+
+def test_interface_cache(tmp_path):
+    config = {'cache_dir': str(tmp_path)}
+    expect = check({})[1]
+    manager, first = check(config)
+    assert manager.get_target('builtins').ast is not None
+
+    # the cache isn't loaded while another manager uses the predefined objects
+    other, _ = check(config)
+    assert other.get_target('builtins').ast is not None
+    manager.close()
+    other.close()
+
+    manager, second = check(config)
+    # builtins is loaded from the interface cache instead of parsed
+    assert manager.get_target('builtins').ast is None
+    assert expect == first == second
+
+    int_ins = manager.infer_expr('builtins', 'int()')
+    assert int_ins and int_ins.temp is int_temp
+
+
+def test_fingerprint(tmp_path):
+    src = tmp_path / 'mod.py'
+    src.write_text('a = 1\n')
+    fingerprint = file_fingerprint(str(src))
+    assert fingerprint_valid(fingerprint)
+
+    os.utime(src, ns=(1, 1))
+    assert fingerprint_valid(fingerprint)
+
+    src.write_text('a = 2\n')
+    assert not fingerprint_valid(fingerprint)
@@ -0,0 +1,82 @@
+import sys
+
+sys.path.extend(['.', '..'])
+
+from pystatic.config import Config
+from pystatic.manager import Manager
+from pystatic.symtable import LazyEntry
+
+
+def _check(tmp_path, lazy):
+    manager = Manager(Config({'cwd': str(tmp_path), 'lazy_typeshed': lazy}))
+    manager.add_check_file(str(tmp_path / 'user.py'))
+    manager.preprocess()
+    manager.infer()
+    messages = [str(msg) for msg in manager.take_messages(str(tmp_path / 'user.py'))]
+    return manager, messages
+
+
+def test_lazy_stub(tmp_path):
+    (tmp_path / 'lib.pyi').write_text(
+        'import unused\n'
+        'from helper import H\n'
+        'def f(x: int) -> str: ...\n'
+        'def g(x: int) -> str: ...\n'
+        'class C:\n'
+        '    def m(self) -> H: ...\n'
+    )
+    (tmp_path / 'helper.pyi').write_text('class H: ...\n')
+    (tmp_path / 'unused.pyi').write_text('u: int\n')
+    (tmp_path / 'user.py').write_text(
+        'from lib import f, C\n'
+        'a: int = f(1)\n'
+        'b: int = C().m()\n'
+    )
+
+    eager_manager, eager = _check(tmp_path, False)
+    manager, lazy = _check(tmp_path, True)
+    assert len(eager) == 2 and lazy == eager
+    assert 'unused' in eager_manager.targets
+
+    lib_symtable = manager.get_target('lib').symtable
+    assert 'unused' not in manager.targets
+    assert 'helper' in manager.targets
+    assert isinstance(lib_symtable.local['g'], LazyEntry)
+    assert lib_symtable.local['g'].resolver
+
+    expect = str(eager_manager.infer_expr('lib', 'g'))
+    assert str(manager.infer_expr('lib', 'g')) == expect
+    assert not lib_symtable.local['g'].resolver
+    # lazy imports are loaded when they are looked up
+    assert str(manager.infer_expr('lib', 'unused.u')) == 'int'
+    assert 'unused' in manager.targets
+
+
+def test_lazy_reexport(tmp_path):
+    (tmp_path / 'lib.pyi').write_text(
+        'import unused\n'
+        'from helper import H\n'
+        'def f(x: int) -> str: ...\n'
+    )
+    (tmp_path / 'helper.pyi').write_text('class H:\n    x: int\n')
+    (tmp_path / 'unused.pyi').write_text('u: int\n')
+    (tmp_path / 'user.py').write_text(
+        'from lib import H\n'
+        'def f(h: H):\n'
+        '    a: str = h.x\n'
+    )
+
+    # H is imported through a lazy import of lib in the same wave
+    _, eager = _check(tmp_path, False)
+    manager, lazy = _check(tmp_path, True)
+    assert len(eager) == 1 and lazy == eager
+    assert 'unused' not in manager.targets
+
+    # and as an attribute of lib
+    (tmp_path / 'user.py').write_text(
+        'import lib\n'
+        'def f(h: lib.H):\n'
+        '    a: str = h.x\n'
+    )
+    _, lazy = _check(tmp_path, True)
+    assert lazy == eager
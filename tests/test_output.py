@@ -0,0 +1,145 @@
+import io
+import sys
+import json
+
+sys.path.extend(['.', '..'])
+
+from pystatic.config import Config
+from pystatic.error.level import Level
+from pystatic.error.message import Message
+from pystatic.manager import Manager
+from pystatic.tool.output import JsonlWriter, SarifWriter
+from pystatic.tool.parallel import check_files, check_files_parallel
+
+
+def _write_project(tmp_path):
+    (tmp_path / 'a.py').write_text('import b\nx: int = "a"\n')
+    (tmp_path / 'b.py').write_text('y: str = 1\n')
+    (tmp_path / 'c.py').write_text('z: int = 1\n')
+    return [str(tmp_path / name) for name in ('a.py', 'b.py', 'c.py')]
+
+
+def test_jsonl_streaming(tmp_path):
+    paths = _write_project(tmp_path)
+    out = io.StringIO()
+    writer = JsonlWriter(out)
+    finished = []
+
+    def on_finish(path, symid, messages):
+        finished.append(symid)
+        writer.write(path, symid, messages)
+
+    messages, _ = check_files(Config({'cwd': str(tmp_path)}), paths, on_finish)
+    assert messages == {}
+    assert finished == ['a', 'b', 'c']
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [record['symid'] for record in records] == ['a', 'b']
+    record = records[0]
+    assert record['path'] == paths[0]
+    assert record['code'] == 'IncompatibleTypeInAssign'
+    assert record['level'] == 'WARN'
+    assert (record['lineno'], record['end_lineno']) == (2, 2)
+    assert (record['col_offset'], record['end_col_offset']) == (9, 12)
+
+
+def test_jsonl_parallel(tmp_path):
+    paths = _write_project(tmp_path)
+    out = io.StringIO()
+    config = Config({'cwd': str(tmp_path)})
+    check_files_parallel(config, paths, 2, JsonlWriter(out).write)
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert sorted(record['symid'] for record in records) == ['a', 'b']
+
+
+def test_sarif(tmp_path):
+    paths = _write_project(tmp_path)
+    out = io.StringIO()
+    writer = SarifWriter(out, str(tmp_path))
+    writer.begin()
+    check_files(Config({'cwd': str(tmp_path)}), paths, writer.write)
+    writer.write('/d.py', 'd', [Message(Level.ERROR, 'e not found', 'ModuleNotFound')])
+    writer.end()
+
+    log = json.loads(out.getvalue())
+    assert log['version'] == '2.1.0'
+    run = log['runs'][0]
+    rules = {rule['id'] for rule in run['tool']['driver']['rules']}
+    assert rules == {'IncompatibleTypeInAssign', 'ModuleNotFound'}
+    results = run['results']
+    assert [result['ruleId'] for result in results] == [
+        'IncompatibleTypeInAssign',
+        'IncompatibleTypeInAssign',
+        'ModuleNotFound',
+    ]
+    location = results[0]['locations'][0]['physicalLocation']
+    assert location['artifactLocation'] == {'uri': 'a.py', 'uriBaseId': 'SRCROOT'}
+    assert location['region'] == {
+        'startLine': 2,
+        'startColumn': 10,
+        'endLine': 2,
+        'endColumn': 13,
+    }
+    assert results[0]['level'] == 'warning'
+    assert results[2]['level'] == 'error'
+    assert results[2]['locations'][0]['physicalLocation'] == {
+        'artifactLocation': {'uri': 'file:///d.py'}
+    }
+
+
+def test_sarif_empty():
+    out = io.StringIO()
+    writer = SarifWriter(out)
+    writer.begin()
+    writer.write('/a.py', 'a', [])
+    writer.end()
+    log = json.loads(out.getvalue())
+    assert log['runs'][0]['results'] == []
+
+
+def test_lazy_message(tmp_path):
+    (tmp_path / 'a.py').write_text('x: int = "a"\nreturn_value = y\n')
+    manager = Manager(Config({'cwd': str(tmp_path)}))
+    manager.add_check_file(str(tmp_path / 'a.py'))
+    manager.preprocess()
+    manager.infer()
+    messages = manager.take_messages(str(tmp_path / 'a.py'))
+    codes = [msg.code for msg in messages]
+    assert codes == ['IncompatibleTypeInAssign', 'SymbolUndefined']
+    # nothing is formatted until the text is used
+    assert all(msg._msg is None for msg in messages)
+    assert messages[0].msg.startswith('Incompatible type in assignment')
+    assert messages[0].pos.lineno == 1
+
+
+def test_error_filter(tmp_path):
+    (tmp_path / 'a.py').write_text('x: int = "a"\nreturn_value = y\n')
+    config = Config(
+        {'cwd': str(tmp_path), 'level': 'warn', 'disable_code': ['SymbolUndefined']}
+    )
+    messages, _ = check_files(config, [str(tmp_path / 'a.py')])
+    assert [msg.code for msg in messages[str(tmp_path / 'a.py')]] == [
+        'IncompatibleTypeInAssign'
+    ]
+
+    config = Config({'cwd': str(tmp_path), 'level': 'error'})
+    messages, _ = check_files(config, [str(tmp_path / 'a.py')])
+    assert messages[str(tmp_path / 'a.py')] == []
+
+
+def test_sarif_columns(tmp_path):
+    (tmp_path / 'a.py').write_text('é = 1; x: int = "a"\n', encoding='utf-8')
+    out = io.StringIO()
+    writer = SarifWriter(out, str(tmp_path))
+    writer.begin()
+    check_files(Config({'cwd': str(tmp_path)}), [str(tmp_path / 'a.py')], writer.write)
+    writer.end()
+
+    result = json.loads(out.getvalue())['runs'][0]['results'][0]
+    # columns count code points, not utf-8 bytes
+    assert result['locations'][0]['physicalLocation']['region'] == {
+        'startLine': 1,
+        'startColumn': 17,
+        'endLine': 1,
+        'endColumn': 20,
+    }
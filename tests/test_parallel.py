@@ -0,0 +1,72 @@
+import sys
+
+sys.path.extend(['.', '..'])
+
+from pystatic.config import Config
+from pystatic.tool.parallel import (
+    check_files,
+    check_files_parallel,
+    split_groups,
+    scan_imports,
+)
+
+
+def _write_project(tmp_path):
+    files = {
+        'a.py': 'import b\nx: int = "a"\n',
+        'b.py': 'from a import x\ny: str = 1\n',
+        'c.py': 'from a import x\nz: int = x\nw: str = 2\n',
+        'd.py': 'd: int = "d"\n',
+        'pkg/__init__.py': 'from .mod import m\n',
+        'pkg/mod.py': 'm: int = "m"\n',
+    }
+    paths = []
+    for name, content in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(content)
+        paths.append(str(path))
+    return paths
+
+
+def test_split_groups(tmp_path):
+    paths = _write_project(tmp_path)
+    a, b, c, d, pkg, mod = paths
+    assert 'pkg.mod' in scan_imports(pkg)
+    assert 'pkg.mod.m' in scan_imports(pkg)
+
+    groups = split_groups(paths, 8)
+    assert sorted(p for group in groups for p in group) == sorted(paths)
+    for group in groups:
+        # modules in a cycle are never split
+        assert (a in group) == (b in group)
+    assert len(split_groups(paths, 1)) == 1
+
+
+def test_parallel_messages(tmp_path):
+    paths = _write_project(tmp_path)
+    config = Config({'cwd': str(tmp_path), 'cache_dir': 'cache'})
+
+    def render(result):
+        messages, _ = result
+        return {path: [str(msg) for msg in msgs] for path, msgs in messages.items()}
+
+    serial = render(check_files(config, paths))
+    assert serial[paths[3]]
+    assert render(check_files_parallel(config, paths, 3)) == serial
+
+
+def test_parallel_result_cache(tmp_path):
+    paths = _write_project(tmp_path)
+    config = Config(
+        {'cwd': str(tmp_path), 'cache_dir': 'cache', 'result_cache': True, 'stats': True}
+    )
+
+    def run():
+        messages, stats = check_files_parallel(config, paths, 2)
+        texts = {path: [str(msg) for msg in msgs] for path, msgs in messages.items()}
+        return texts, stats.cache_hits['result']
+
+    first, hits = run()
+    assert hits == 0 and first[paths[3]]
+    assert run() == (first, len(paths))
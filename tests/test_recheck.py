@@ -0,0 +1,86 @@
+import sys
+
+sys.path.extend(['.', '..'])
+
+from pystatic.config import Config
+from pystatic.manager import Manager
+from pystatic.predefined import int_temp, str_temp
+from pystatic.target import Stage
+
+
+def test_recheck_dependents(tmp_path):
+    (tmp_path / 'lib.py').write_text('x: int = 1\n')
+    (tmp_path / 'user.py').write_text('from lib import x\n')
+    (tmp_path / 'other.py').write_text('z: int = 1\n')
+    lib_path = str(tmp_path / 'lib.py')
+
+    manager = Manager(Config({'cwd': str(tmp_path)}))
+    for name in ('lib.py', 'user.py', 'other.py'):
+        manager.add_check_file(str(tmp_path / name))
+    manager.preprocess()
+    manager.infer()
+    assert manager.module_graph.get_imported_by('lib') == {'user'}
+    assert manager.infer_expr('user', 'x').temp == int_temp
+
+    (tmp_path / 'lib.py').write_text('x: str = "s"\n')
+    assert manager.add_check_file(lib_path, recheck=True).value
+    queued = {target.symid for target in manager.q_preprocess}
+    assert queued == {'lib', 'user'}
+    assert manager.get_target('other').stage == Stage.FINISH
+
+    manager.preprocess()
+    manager.infer()
+    assert manager.infer_expr('user', 'x').temp == str_temp
+    assert manager.module_graph.get_imported_by('lib') == {'user'}
+    assert all(target.stage == Stage.FINISH for target in manager.targets.values())
+
+
+def test_recheck_star_import(tmp_path):
+    (tmp_path / 'lib.py').write_text('x: int = 1\n')
+    (tmp_path / 'user.py').write_text('from lib import *\n')
+    lib_path = str(tmp_path / 'lib.py')
+
+    manager = Manager(Config({'cwd': str(tmp_path)}))
+    manager.add_check_file(str(tmp_path / 'user.py'))
+    manager.preprocess()
+    manager.infer()
+    symtable = manager.get_target('user').symtable
+    assert symtable.legb_lookup('x').temp == int_temp
+    assert symtable.legb_lookup('x') is symtable.legb_lookup('x')
+    assert symtable.legb_lookup('y') is None
+
+    # cached lookups and the merged star import table are dropped on recheck
+    (tmp_path / 'lib.py').write_text('x: str = "s"\ny: int = 1\n')
+    assert manager.add_check_file(lib_path, recheck=True).value
+    manager.preprocess()
+    manager.infer()
+    assert symtable.legb_lookup('x').temp == str_temp
+    assert symtable.legb_lookup('y').temp == int_temp
+
+
+def test_symtable_dependents(tmp_path):
+    from pystatic.predefined import int_ins, str_ins
+    from pystatic.symtable import Entry, TableScope
+
+    (tmp_path / 'lib.py').write_text('x: int = 1\n')
+    (tmp_path / 'user.py').write_text('from lib import *\n')
+    (tmp_path / 'other.py').write_text('z: int = 1\n')
+
+    manager = Manager(Config({'cwd': str(tmp_path)}))
+    for name in ('lib.py', 'user.py', 'other.py'):
+        manager.add_check_file(str(tmp_path / name))
+    manager.preprocess()
+    manager.infer()
+    user = manager.get_target('user').symtable
+    func = user.new_symtable('f', TableScope.FUNC)
+    assert user.legb_lookup('x').temp == int_temp
+    assert func.legb_lookup('x').temp == int_temp
+
+    # changes of unrelated symtables keep the cached lookups
+    manager.get_target('other').symtable.add_entry('w', Entry(int_ins))
+    assert 'x' in user._lookup_cache and 'x' in func._lookup_cache
+
+    # the star imported module is searched by both
+    manager.get_target('lib').symtable.add_entry('y', Entry(str_ins))
+    assert not user._lookup_cache and not func._lookup_cache
+    assert func.legb_lookup('y') is str_ins
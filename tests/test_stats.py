@@ -0,0 +1,45 @@
+import sys
+import time
+
+sys.path.extend(['.', '..'])
+
+from pystatic.config import Config
+from pystatic.manager import Manager
+from pystatic.stats import Stats
+
+
+def _check(tmp_path, stats):
+    (tmp_path / 'lib.py').write_text('class A:\n    x: int = 1\n')
+    (tmp_path / 'mod.py').write_text('from lib import A\na: int = "s"\n')
+    manager = Manager(Config({'cwd': str(tmp_path), 'stats': stats}))
+    manager.add_check_file(str(tmp_path / 'mod.py'))
+    manager.preprocess()
+    manager.infer()
+    return manager
+
+
+def test_stats(tmp_path):
+    begin = time.perf_counter()
+    stats = _check(tmp_path, True).get_stats()
+    elapsed = time.perf_counter() - begin
+
+    assert set(stats.stage_wall) == {'Parse', 'Preprocess', 'Infer'}
+    # time is measured exclusively so stages never add up to more than the run
+    assert sum(stats.stage_wall.values()) <= elapsed
+    assert set(stats.module_time['mod']) == {'Parse', 'Preprocess', 'Infer'}
+    assert 'lib' in stats.module_time and 'builtins' in stats.module_time
+    assert stats.slowest_modules(1)[0][0] in stats.module_time
+    assert stats.visits['InferVisitor'] > 0
+    assert stats.lookups['builtins'] > 0
+    assert stats.find_module_calls > 0
+    assert 'slowest modules' in stats.report(3)
+
+    merged = Stats(True)
+    merged.merge(stats)
+    merged.merge(stats)
+    assert merged.visits['InferVisitor'] == 2 * stats.visits['InferVisitor']
+
+
+def test_stats_disabled(tmp_path):
+    stats = _check(tmp_path, False).get_stats()
+    assert not stats.stage_wall and not stats.module_time and not stats.visits
@@ -34,3 +34,85 @@ def test_eq():
     c4 = container_temp.getins(None).value
     c5 = container_temp.getins([any_ins, any_ins]).value
     assert c4.equiv(c5)
+
+
+def test_intern():
+    from pystatic.predefined import list_temp, dict_temp, int_ins, str_ins
+
+    l1 = list_temp.getins([int_ins]).value
+    l2 = list_temp.getins((int_ins, )).value
+    assert l1 is l2
+    assert isinstance(l1.bindlist, tuple)
+    assert list_temp.getins([str_ins]).value is not l1
+
+    d1 = dict_temp.getins([str_ins, l1]).value
+    d2 = dict_temp.getins([str_ins, list_temp.getins([int_ins]).value]).value
+    assert d1 is d2
+    assert d1.equiv(d2)
+
+    # instances and types with the same bindlist are different
+    assert list_temp.get_interned(TypeType, [int_ins]) is not l1
+    assert not hasattr(l1, '__dict__')
+
+
+def test_intern_weak():
+    import gc
+    from pystatic.predefined import list_temp, int_ins, literal_temp
+
+    ins_temp = ModuleNamedTypeTemp('Weak', 'builtins')
+    ins_list = list_temp.getins([ins_temp.get_default_ins()]).value
+    key = (ins_list.__class__, ins_list.bindlist)
+    assert list_temp._interned[key] is ins_list
+    del ins_list
+    gc.collect()
+    assert key not in list_temp._interned
+
+    # instances equal to interned ones but not the same object are not keys
+    fresh = TypeIns(int_ins.temp, [])
+    l1 = list_temp.getins([fresh]).value
+    assert l1 is not list_temp.getins([fresh]).value
+    assert not l1.is_interned()
+    literal = literal_temp.getins([1]).value
+    assert list_temp.getins([literal]).value is not list_temp.getins([literal]).value
+
+    T = TypeVarIns('T', bound=any_ins)
+    assert list_temp.getins([T]).value is list_temp.getins([T]).value
+
+
+def test_mro_attr_table():
+    from pystatic.predefined import TypeClassTemp, int_ins, str_ins
+    from pystatic.symtable import SymTable, TableScope, Entry
+
+    glob = SymTable('attr_test', None, None, None, None, TableScope.GLOB)
+    glob.glob = glob
+
+    def new_cls(name, bases):
+        temp = TypeClassTemp(name, glob,
+                             glob.new_symtable(name, TableScope.CLASS))
+        temp.baseclass = [base.get_default_ins() for base in bases]
+        temp.get_mro()
+        return temp
+
+    a = new_cls('A', [])
+    b = new_cls('B', [a])
+    c = new_cls('C', [b])
+    a.get_inner_symtable().add_entry('x', Entry(int_ins))
+    assert c.getattribute('x', []) is int_ins
+    assert c.get_mro_attr('x', []) is int_ins
+    assert c.get_mro() is c.get_mro()
+
+    # attributes added later and overridden are found
+    b.get_inner_symtable().add_entry('x', Entry(str_ins))
+    a.get_inner_symtable().add_entry('y', Entry(int_ins))
+    assert c.getattribute('x', []) is str_ins
+    assert c.getattribute('y', []) is int_ins
+    assert c.getattribute('z', []) is None
+
+    # only classes whose attribute tables include the changed class rebuild
+    d = new_cls('D', [])
+    epoch = c._epoch
+    d.get_inner_symtable().add_entry('x', Entry(int_ins))
+    assert c._epoch == epoch
+    b.get_inner_symtable().add_entry('w', Entry(int_ins))
+    assert c._epoch != epoch
+    assert c.getattribute('w', []) is int_ins
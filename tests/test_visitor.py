@@ -0,0 +1,58 @@
+import ast
+import sys
+
+sys.path.extend(['.', '..'])
+
+from pystatic.visitor import BaseVisitor, NoGenVisitor, VisitorMethodNotFound
+
+
+class _Names(BaseVisitor):
+    def __init__(self):
+        self.names = []
+
+    def visit_Name(self, node):
+        self.names.append(node.id)
+
+
+class _Upper(_Names):
+    def visit_Name(self, node):
+        self.names.append(node.id.upper())
+
+
+class _First(NoGenVisitor):
+    def visit_Name(self, node):
+        return node.id
+
+    def visit_Attribute(self, node):
+        return self.visit(node.value)
+
+
+class _FirstOrNone(_First):
+    def visit_missing(self, node, *args, **kwargs):
+        return None
+
+
+def test_dispatch():
+    tree = ast.parse('a.b = c[d]')
+    visitor = _Names()
+    visitor.visit(tree)
+    assert sorted(visitor.names) == ['a', 'c', 'd']
+    # subclasses get their own table
+    visitor = _Upper()
+    visitor.visit(tree)
+    assert sorted(visitor.names) == ['A', 'C', 'D']
+    assert _Names._dispatch[ast.Name] is _Names.visit_Name
+    # nodes without a visit_XXX method are in the table too
+    assert _Names._dispatch[ast.Call] is _Names.visit_missing
+
+
+def test_visit_missing():
+    expr = ast.parse('a.b.c', mode='eval').body
+    assert _First().visit(expr) == 'a'
+    call = ast.parse('f().b', mode='eval').body
+    try:
+        _First().visit(call)
+        assert False
+    except VisitorMethodNotFound:
+        pass
+    assert _FirstOrNone().visit(call) is None
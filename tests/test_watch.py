@@ -0,0 +1,37 @@
+import os
+import sys
+
+sys.path.extend(['.', '..'])
+
+from pystatic.config import Config
+from pystatic.tool.watch import Watcher
+
+
+def _touch(path, content):
+    mtime = os.stat(path).st_mtime_ns + 10 ** 9
+    path.write_text(content)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_watch(tmp_path):
+    a = tmp_path / 'a.py'
+    b = tmp_path / 'b.py'
+    a.write_text('from b import y\nx: int = "a"\ndef f() -> int:\n    return y\n')
+    b.write_text('y: int = 1\n')
+    watcher = Watcher(Config({'cwd': str(tmp_path)}), [str(a), str(b)])
+
+    lines = watcher.check()
+    assert len(lines) == 1 and lines[0].startswith(str(a) + ' line: 2')
+    assert not watcher.wait_changes(interval=0.01, timeout=0.05)
+
+    # only the new message of a is printed
+    _touch(b, 'y: str = "b"\n')
+    assert watcher.wait_changes(interval=0.01, debounce=0.01, timeout=1)
+    lines = watcher.check()
+    assert len(lines) == 1 and lines[0].startswith(f'+ {a} line: 4')
+
+    _touch(a, 'from b import y\n')
+    assert watcher.wait_changes(interval=0.01, debounce=0.01, timeout=1)
+    lines = watcher.check()
+    assert len(lines) == 2 and all(line.startswith(f'- {a}') for line in lines)
+    assert watcher.check() == []